@@ -0,0 +1,185 @@
+"""
+Резервні копії versions.db без зупинки перевірок (SQLite backup API).
+
+sqlite3.Connection.backup копіює БД порціями по pages_per_step сторінок і
+між порціями відпускає блокування (та GIL), тож потік запису, перевірки й
+GUI працюють далі. Копія виконується у фоновому потоці.
+
+У режимі WAL копія робиться з однієї транзакції читання: це знімок БД на
+момент початку, а записи інших з'єднань під час копіювання йдуть у WAL і не
+змушують backup починати спочатку. У режимі DELETE транзакція читання
+блокувала б запис на весь час копії, тому там backup копіює без неї і,
+якщо БД змінилась, SQLite сам починає копію заново.
+
+Копія пишеться у тимчасовий файл і лише потім перейменовується, тож у папці
+не буває недописаних копій. Старі копії понад keep видаляються.
+"""
+
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+# Ім'я копії: versions_20260118_093000.db або .db.gz
+STAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+# 1024 сторінки по 4 КБ - близько 4 МБ за крок
+PAGES_PER_STEP = 1024
+STEP_SLEEP_SECONDS = 0.005
+
+# Після невдалої копії (диск заповнено тощо) автоматична спроба - не раніше ніж через
+RETRY_AFTER_SECONDS = 3600
+
+
+class BackupManager:
+    """Резервні копії БД у папці folder (відносний шлях - поряд з БД)"""
+
+    def __init__(self, db, folder='backups', keep=10, compress=False,
+                 pages_per_step=PAGES_PER_STEP, sleep=STEP_SLEEP_SECONDS):
+        self.db = db
+        if not os.path.isabs(folder):
+            folder = os.path.join(os.path.dirname(os.path.abspath(db.db_path)), folder)
+        self.folder = folder
+        self.keep = keep
+        self.compress = compress
+        self.pages_per_step = pages_per_step
+        self.sleep = sleep
+        self.prefix = os.path.splitext(os.path.basename(db.db_path))[0]
+        self._pattern = re.compile(rf"^{re.escape(self.prefix)}_(\d{{8}}_\d{{6}})\.db(\.gz)?$")
+        self.failed_at = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, db, config):
+        database = config.get('database', {})
+        return cls(db, database.get('backup_folder', 'backups') or 'backups',
+                   keep=database.get('backup_keep', 10),
+                   compress=database.get('backup_compress', False))
+
+    def list_backups(self):
+        """Наявні копії від найновішої: [(datetime, шлях)]"""
+        if not os.path.isdir(self.folder):
+            return []
+        backups = []
+        for name in os.listdir(self.folder):
+            match = self._pattern.match(name)
+            if match:
+                stamp = datetime.strptime(match.group(1), STAMP_FORMAT)
+                backups.append((stamp, os.path.join(self.folder, name)))
+        return sorted(backups, reverse=True)
+
+    def last_backup_time(self):
+        backups = self.list_backups()
+        return backups[0][0] if backups else None
+
+    def is_due(self, interval_days, now=None):
+        """Чи настав час автоматичної копії (interval_days з останньої)"""
+        now = now or datetime.now()
+        if self.failed_at and (now - self.failed_at).total_seconds() < RETRY_AFTER_SECONDS:
+            return False
+        last = self.last_backup_time()
+        return last is None or (now - last).total_seconds() >= interval_days * 86400
+
+    def backup(self, progress=None, now=None):
+        """
+        Зробити копію (у поточному потоці); повертає шлях до файлу.
+        progress(remaining, total) - після кожного кроку, у сторінках.
+        """
+        with self._lock:
+            stamp = (now or datetime.now()).strftime(STAMP_FORMAT)
+            path = os.path.join(self.folder, f"{self.prefix}_{stamp}.db")
+            if self.compress:
+                path += ".gz"
+            temp_db = os.path.join(self.folder, f".{self.prefix}_{stamp}.tmp")
+            started = time.perf_counter()
+            # Записи, що вже стоять у черзі потоку запису, теж потрапляють у копію
+            self.db.flush()
+            try:
+                os.makedirs(self.folder, exist_ok=True)
+                self.copy_database(temp_db, progress)
+                if self.compress:
+                    temp_gz = temp_db + ".gz"
+                    with open(temp_db, 'rb') as source, gzip.open(temp_gz, 'wb', compresslevel=6) as target:
+                        shutil.copyfileobj(source, target, 1024 * 1024)
+                    os.remove(temp_db)
+                    temp_db = temp_gz
+                os.replace(temp_db, path)
+            except Exception:
+                self.failed_at = datetime.now()
+                raise
+            finally:
+                for leftover in (temp_db, temp_db + ".gz"):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+
+            self.failed_at = None
+            removed = self.rotate()
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            print(f"💾 Резервна копія {os.path.basename(path)}: {size_mb:.1f} МБ за "
+                  f"{time.perf_counter() - started:.1f} с" + (f", видалено старих: {removed}" if removed else ""))
+            return path
+
+    def copy_database(self, target_path, progress=None):
+        source = sqlite3.connect(self.db.db_path, isolation_level=None)
+        target = sqlite3.connect(target_path)
+        try:
+            if self.db.journal_mode == 'WAL':
+                # Знімок на час копії: записи інших з'єднань не перезапускають backup
+                source.execute("BEGIN")
+                source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+
+            def report(status, remaining, total):
+                if progress:
+                    progress(remaining, total)
+
+            source.backup(target, pages=self.pages_per_step, progress=report, sleep=self.sleep)
+            # Копія - самостійний файл без -wal
+            target.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            target.close()
+            if source.in_transaction:
+                source.execute("COMMIT")
+            source.close()
+
+    def rotate(self):
+        """Видалити копії понад keep найновіших; повертає кількість видалених"""
+        if not self.keep or self.keep < 1:
+            return 0
+        removed = 0
+        for _, path in self.list_backups()[self.keep:]:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError as e:
+                print(f"⚠️ Не вдалося видалити стару копію {path}: {e}")
+        return removed
+
+    def start(self):
+        """Зробити копію у фоновому потоці; False - копія вже виконується"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+
+            def run():
+                try:
+                    self.backup()
+                except Exception as e:
+                    print(f"❌ Помилка резервного копіювання: {e}")
+
+            self._thread = threading.Thread(target=run, name="db-backup", daemon=True)
+            self._thread.start()
+            return True
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        """Дочекатися фонової копії (під час виходу з програми)"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Мікробенчмарк пошуку версій: попередні реалізації (список шаблонів на кожен
+виклик, re.search / re.findall по черзі) проти version_patterns.
+
+Запуск:
+    python benchmarks/bench_extract.py [--size-kb 512] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from version_patterns import (TEXT_PATTERNS, PAGE_PATTERNS,
+                              TEXT_VERSION_ENGINE, PAGE_VERSION_ENGINE)
+
+
+def legacy_extract_version_from_text(text):
+    """Реалізація extract_version_from_text до version_patterns"""
+    patterns = list(TEXT_PATTERNS)
+    for pattern in patterns:
+        match = re.search(pattern, text)
+        if match:
+            return match.group(1)
+    return None
+
+
+def legacy_page_version(page_text):
+    """Пошук у тексті сторінки з get_version_from_website до version_patterns"""
+    patterns = list(PAGE_PATTERNS)
+    for pattern in patterns:
+        matches = re.findall(pattern, page_text, re.IGNORECASE)
+        if matches:
+            for match in matches:
+                if len(match) > 2:
+                    return match
+    return None
+
+
+def make_page_text(size_kb, seed=42):
+    """Текст "сторінки завантажень": меню, changelog з версіями, таблиці"""
+    rng = random.Random(seed)
+    words = ["download", "release", "notes", "support", "firmware", "latest",
+             "windows", "linux", "macos", "installer", "checksum", "mirror",
+             "Завантажити", "оновлення", "прошивка", "для", "пристрою"]
+    parts = []
+    size = 0
+    while size < size_kb * 1024:
+        line = " ".join(rng.choice(words) for _ in range(rng.randint(5, 15)))
+        if rng.random() < 0.3:
+            line += f" {rng.randint(0, 20)}.{rng.randint(0, 99)}.{rng.randint(0, 999)}"
+        if rng.random() < 0.1:
+            line += f" ({rng.randint(1, 28)}.{rng.randint(1, 12)}.20{rng.randint(10, 25)})"
+        parts.append(line)
+        size += len(line) + 1
+    return "\n".join(parts)
+
+
+def bench(label, func, arg, repeat):
+    seconds = min(timeit.repeat(lambda: func(arg), number=1, repeat=repeat))
+    print(f"  {label:<32} {seconds * 1000:10.3f} мс")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-kb", type=int, default=512, help="розмір тексту сторінки, КБ")
+    parser.add_argument("--repeat", type=int, default=20, help="кількість повторів")
+    args = parser.parse_args()
+
+    page_text = make_page_text(args.size_kb)
+    # Найгірший випадок для старого коду: префіксна версія в самому кінці
+    prefixed_text = page_text + "\nLatest release: v4.2.1"
+
+    cases = [
+        ("Текст сторінки (PAGE_PATTERNS)", legacy_page_version, PAGE_VERSION_ENGINE.extract, page_text),
+        ("Великий текст (TEXT_PATTERNS)", legacy_extract_version_from_text, TEXT_VERSION_ENGINE.extract, page_text),
+        ("Префікс у кінці (TEXT_PATTERNS)", legacy_extract_version_from_text, TEXT_VERSION_ENGINE.extract, prefixed_text),
+        ("Комірка таблиці (TEXT_PATTERNS)", legacy_extract_version_from_text, TEXT_VERSION_ENGINE.extract, "Firmware 1.0.7.79 (stable)"),
+    ]
+
+    print(f"📏 Розмір тексту: {len(page_text) // 1024} КБ, повторів: {args.repeat}")
+    for title, legacy, engine, text in cases:
+        assert legacy(text) == engine(text), title
+        print(f"\n🔬 {title} -> {engine(text)}")
+        repeat = args.repeat if len(text) > 1000 else args.repeat * 1000
+        old = bench("старий (re.findall/re.search)", legacy, text, repeat)
+        new = bench("version_patterns", engine, text, repeat)
+        print(f"  {'прискорення':<32} {old / new:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк VersionParser на збережених сторінках без доступу до інтернету.
+
+Сторінки з benchmarks/corpus віддає локальний HTTP-сервер, тому
+get_version_from_website проходить увесь шлях: запит, потокове читання,
+розбір HTML і пошук версії. corpus/manifest.json містить для кожної
+сторінки селектор та очікувану версію, а для сторінки прошивок
+Grandstream - моделі з очікуваними прошивками.
+
+Для кожного випадку виводиться пропускна здатність (викликів/с),
+затримка одного виклику (p50 / p90 / p99, мс) та пік виділеної пам'яті
+(tracemalloc, окремий прохід, щоб не впливати на час).
+
+Запуск:
+    python benchmarks/bench_parser.py [--repeat 50] [--backend auto] [--no-streaming]
+    python benchmarks/bench_parser.py --latency-ms 20      # затримка сервера
+    python benchmarks/bench_parser.py --record NAME URL    # зберегти сторінку в корпус
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parser as parser_module  # noqa: E402
+from parser import VersionParser  # noqa: E402
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+MANIFEST = os.path.join(CORPUS_DIR, "manifest.json")
+
+
+class CorpusHandler(SimpleHTTPRequestHandler):
+    """Файли корпусу з необов'язковою затримкою відповіді"""
+    # keep-alive, як у справжніх сайтів: з'єднання перевикористовується сесією
+    protocol_version = "HTTP/1.1"
+    # Заголовки й тіло пишуться окремо - без TCP_NODELAY кожна відповідь чекає ACK ~40 мс
+    disable_nagle_algorithm = True
+    latency = 0.0
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CorpusServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Потокове читання закриває з'єднання, щойно знайдено версію
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_server(latency_ms=0):
+    """Запустити сервер корпусу у фоновому потоці; повертає (server, base_url)"""
+    handler = type("Handler", (CorpusHandler,), {"latency": latency_ms / 1000})
+    server = CorpusServer(("127.0.0.1", 0), functools.partial(handler, directory=CORPUS_DIR))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def load_manifest():
+    with open(MANIFEST, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_page(name):
+    with open(os.path.join(CORPUS_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def percentile(sorted_values, percent):
+    """Перцентиль за найближчим рангом"""
+    index = max(0, -(-len(sorted_values) * percent // 100) - 1)
+    return sorted_values[int(index)]
+
+
+def measure(func, repeat, warmup):
+    """Затримки викликів (мс) і результат останнього виклику"""
+    # Парсер друкує кожен запит - у звіті це лише шум
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            func()
+        latencies = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies, result
+
+
+def peak_memory(func, calls=3):
+    """Пік пам'яті (байти), виділеної під час кількох викликів"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        try:
+            for _ in range(calls):
+                func()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def run_case(title, func, expected, args, results):
+    latencies, result = measure(func, args.repeat, args.warmup)
+    latencies.sort()
+    total = sum(latencies)
+    row = {
+        "case": title,
+        "calls_per_second": len(latencies) * 1000 / total if total else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p90_ms": percentile(latencies, 90),
+        "p99_ms": percentile(latencies, 99),
+        "peak_kb": peak_memory(func) / 1024,
+        "result": result,
+        "ok": result == expected,
+    }
+    results.append(row)
+    if not args.json:
+        mark = "✅" if row["ok"] else f"❌ очікувалось {expected}"
+        print(f"  {title:<44} {row['calls_per_second']:9.1f} {row['p50_ms']:8.2f} {row['p90_ms']:8.2f} "
+              f"{row['p99_ms']:8.2f} {row['peak_kb']:9.0f}  {result} {mark}")
+
+
+def print_header(title, args):
+    if not args.json:
+        print(f"\n🔬 {title}")
+        print(f"  {'випадок':<44} {'викл./с':>9} {'p50, мс':>8} {'p90, мс':>8} {'p99, мс':>8} {'пік, КБ':>9}  версія")
+
+
+def record_page(name, url):
+    """Завантажити сторінку в корпус (селектор і версію додайте в manifest.json)"""
+    version_parser = VersionParser()
+    response = version_parser.session.get(url, timeout=30)
+    response.raise_for_status()
+    path = os.path.join(CORPUS_DIR, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(response.text)
+    print(f"💾 {url} -> {path} ({len(response.content) // 1024} КБ)")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--repeat", type=int, default=50, help="викликів на випадок")
+    arg_parser.add_argument("--warmup", type=int, default=3, help="викликів для прогріву")
+    arg_parser.add_argument("--backend", default="auto", help="HTML-бекенд (як parsing.html_backend)")
+    arg_parser.add_argument("--no-streaming", action="store_true", help="читати сторінку повністю")
+    arg_parser.add_argument("--latency-ms", type=float, default=0, help="затримка відповіді сервера")
+    arg_parser.add_argument("--json", action="store_true", help="результати у форматі JSON")
+    arg_parser.add_argument("--record", nargs=2, metavar=("NAME", "URL"), help="зберегти сторінку в корпус")
+    args = arg_parser.parse_args()
+
+    if args.record:
+        record_page(*args.record)
+        return 0
+
+    manifest = load_manifest()
+    server, base_url = start_server(args.latency_ms)
+    version_parser = VersionParser(config={
+        "parsing": {"html_backend": args.backend, "streaming": not args.no_streaming},
+        "checking": {"retry_attempts": 1},
+    })
+    backend = version_parser.html_backend
+    results = []
+    if not args.json:
+        print(f"📦 Корпус: {len(manifest['pages']) + 1} сторінок, бекенд: {getattr(backend, 'name', backend)}, "
+              f"потокове читання: {'ні' if args.no_streaming else 'так'}, повторів: {args.repeat}")
+
+    try:
+        print_header("extract_version_from_text (текст за селектором або вся сторінка)", args)
+        for page in manifest["pages"]:
+            html = read_page(page["file"])
+            selector = page["selector"]
+            text = backend.select_text(html, selector) if selector else backend.parse(html).page_text()
+            run_case(f"{page['file']} ({len(text)} символів)",
+                     functools.partial(version_parser.extract_version_from_text, text),
+                     page["expected"], args, results)
+
+        print_header("get_version_from_website (локальний сервер)", args)
+        for page in manifest["pages"]:
+            size = os.path.getsize(os.path.join(CORPUS_DIR, page["file"]))
+            run_case(f"{page['file']} ({size // 1024} КБ)",
+                     functools.partial(version_parser.get_version_from_website,
+                                       base_url + page["file"], page["selector"] or None),
+                     page["expected"], args, results)
+
+        print_header("get_grandstream_version", args)
+        grandstream = manifest["grandstream"]
+        parser_module.GRANDSTREAM_FIRMWARE_URL = base_url + grandstream["file"]
+        models = list(grandstream["models"].items())
+        for model, expected in models:
+            run_case(f"{model} (індекс уже побудовано)",
+                     functools.partial(version_parser.get_grandstream_version, model),
+                     expected, args, results)
+
+        def cold_lookup():
+            # Нова перевірка: сторінка завантажується й індекс будується заново
+            version_parser._grandstream_index = None
+            return version_parser.get_grandstream_version(models[0][0])
+
+        run_case(f"{models[0][0]} (завантаження + індекс)", cold_lookup, models[0][1], args, results)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    failed = [row["case"] for row in results if not row["ok"]]
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    elif failed:
+        print(f"\n❌ Неочікувана версія: {', '.join(failed)}")
+    else:
+        print("\n✅ Усі версії збігаються з manifest.json")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
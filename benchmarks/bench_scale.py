@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Навантажувальний прогін усього конвеєра на синтетичному каталозі.
+
+Тимчасова versions.db заповнюється N програмами, сторінки яких віддають
+локальні HTTP-сервери-заглушки (окремий процес, щоб не ділити з ним GIL і
+пам'ять). Кожен "хост" - окремий порт, тому ліміти на хост і запобіжник
+працюють так само, як із різними сайтами. Затримка, частка помилок (HTTP 503)
+та розмір сторінки налаштовуються.
+
+Виконується повна перевірка всіх активних програм - без GUI (VersionChecker,
+як у консольному режимі) або, з --gui, через MainWindow на платформі
+offscreen: потік перевірки, сигнали та оновлення таблиці.
+
+Звіт: час заповнення й завантаження БД, загальний час перевірки,
+перевірок/с, пік RSS процесу та затримка запису в БД (від постановки в
+чергу до коміту).
+
+Запуск:
+    python benchmarks/bench_scale.py [--programs 10000] [--hosts 20] [--latency-ms 20]
+    python benchmarks/bench_scale.py --error-rate 0.05 --page-kb 256 --version-at start
+    python benchmarks/bench_scale.py --programs 2000 --gui
+"""
+
+import argparse
+import contextlib
+import copy
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DEFAULT_CONFIG  # noqa: E402
+from database import Database  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CATEGORIES = ("Програма", "Прошивка", "Драйвер")
+FILLER_WORDS = ("download", "release", "notes", "support", "firmware", "latest", "windows",
+                "linux", "installer", "checksum", "mirror", "Завантажити", "оновлення", "прошивка")
+
+
+# --- сервер-заглушка (дочірній процес) ---
+
+def make_filler(size_kb, seed):
+    """Текст сторінки без чисел, схожих на версії"""
+    rng = random.Random(seed)
+    lines = []
+    size = 0
+    while size < size_kb * 1024:
+        line = "<p>" + " ".join(rng.choice(FILLER_WORDS) for _ in range(12)) + "</p>\n"
+        lines.append(line)
+        size += len(line.encode())
+    return "".join(lines)
+
+
+def served_version(program_index):
+    return f"2.{program_index % 100}.{program_index % 7}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/p/<номер> - сторінка програми з версією в <span class="version">"""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    options = None
+    filler = ""
+    rng = None
+    rng_lock = threading.Lock()
+
+    def do_GET(self):
+        options = self.options
+        with self.rng_lock:
+            delay = options["latency_ms"] * self.rng.uniform(0.5, 1.5) / 1000
+            failed = self.rng.random() < options["error_rate"]
+        if delay:
+            time.sleep(delay)
+
+        if failed:
+            self.send_body(503, b"Service Unavailable")
+            return
+        try:
+            index = int(self.path.rsplit("/", 1)[1])
+        except ValueError:
+            self.send_body(404, b"Not Found")
+            return
+
+        version = f'<div>Latest release: <span class="version">{served_version(index)}</span></div>\n'
+        head = f"<html><head><title>Program {index}</title></head><body>\n<h1>Program {index}</h1>\n"
+        if options["version_at"] == "start":
+            html = head + version + self.filler + "</body></html>"
+        else:
+            html = head + self.filler + version + "</body></html>"
+        self.send_body(200, html.encode())
+
+    def send_body(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Потокове читання закриває з'єднання, щойно знайдено версію
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def serve_stubs(hosts, options, ports_queue):
+    """Точка входу дочірнього процесу: hosts серверів на 127.0.0.1"""
+    handler = type("Handler", (StubHandler,), {
+        "options": options,
+        "filler": make_filler(options["page_kb"], options["seed"]),
+        "rng": random.Random(options["seed"]),
+    })
+    ports = []
+    for _ in range(hosts):
+        server = StubServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        ports.append(server.server_address[1])
+    ports_queue.put(ports)
+    threading.Event().wait()
+
+
+def start_stubs(hosts, options):
+    """Запустити сервери в окремому процесі; повертає (процес, порти)"""
+    ports_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve_stubs, args=(hosts, options, ports_queue), daemon=True)
+    process.start()
+    return process, ports_queue.get(timeout=30)
+
+
+# --- вимірювання ---
+
+def time_writes(db, latencies):
+    """Записувати затримку кожного запису БД: від постановки в чергу до коміту"""
+    execute_write = db.execute_write
+
+    def timed_execute_write(func, wait=True):
+        started = time.perf_counter()
+        future = execute_write(func, wait=False)
+        future.add_done_callback(lambda _: latencies.append((time.perf_counter() - started) * 1000))
+        return future.result() if wait else future
+
+    db.execute_write = timed_execute_write
+
+
+def peak_rss_mb():
+    """Пік RSS процесу, МБ (None, якщо модуль resource недоступний)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux повертає кілобайти, macOS - байти
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def percentile(sorted_values, percent):
+    """Перцентиль за найближчим рангом"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, -(-len(sorted_values) * percent // 100) - 1)
+    return sorted_values[int(index)]
+
+
+def fill_database(db, count, ports, inactive_share):
+    """Додати count синтетичних програм однією транзакцією"""
+    rows = []
+    for index in range(count):
+        port = ports[index % len(ports)]
+        rows.append((
+            f"Програма {index:05d}",
+            CATEGORIES[index % len(CATEGORIES)],
+            f"http://127.0.0.1:{port}/p/{index}",
+            "1.0.0",
+            # Половина - з селектором, половина - пошук у тексті сторінки
+            ".version" if index % 2 == 0 else "",
+            0 if index < count * inactive_share else 1,
+        ))
+
+    def write(cursor):
+        cursor.executemany('''
+            INSERT INTO programs (name, category, url, installed_version, version_selector, is_active)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', rows)
+
+    db.execute_write(write)
+
+
+def make_config(args):
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config["checking"].update({
+        "auto_check_interval_minutes": 0,
+        "max_concurrent_checks": args.workers,
+        "max_checks_per_host": args.per_host,
+        "retry_attempts": args.retries,
+        "retry_base_delay": args.retry_delay,
+        "timeout_seconds": args.timeout,
+    })
+    config["database"]["auto_backup"] = False
+    return config
+
+
+def count_statuses(db, run_id):
+    """Підсумок запуску з check_runs (парсер сам перехоплює мережеві помилки)"""
+    _, cursor = db.get_connection()
+    cursor.execute('SELECT status, COUNT(*) FROM check_runs WHERE run_id = ? GROUP BY status', (run_id,))
+    counts = dict(cursor.fetchall())
+    return {"found": counts.get("ok", 0), "not_found": counts.get("not_found", 0),
+            "errors": counts.get("error", 0)}
+
+
+# --- прогони ---
+
+def run_headless(db_path, config, report):
+    from checker import VersionChecker
+    from repository import ProgramRepository
+
+    latencies = []
+    db = Database(db_path)
+    time_writes(db, latencies)
+    repository = ProgramRepository(db)
+
+    started = time.perf_counter()
+    programs = repository.get_active_programs()
+    report["load_ms"] = (time.perf_counter() - started) * 1000
+
+    checker = VersionChecker(repository, config, pool_size=config["checking"]["max_concurrent_checks"])
+    started = time.perf_counter()
+    for _ in checker.check_programs(programs):
+        pass
+    report["check_s"] = time.perf_counter() - started
+    report["checked"] = len(programs)
+    report.update(count_statuses(db, checker.run_id))
+    db.close_all_connections()
+    return latencies
+
+
+def run_gui(work_dir, config, report):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication, QMessageBox
+    import main as gui
+
+    # Без користувача модальні діалоги зупинили б цикл подій
+    for name in ("information", "warning", "critical"):
+        setattr(QMessageBox, name, staticmethod(lambda *args, **kwargs: QMessageBox.Ok))
+
+    with open(os.path.join(work_dir, "config.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False)
+
+    app = QApplication.instance() or QApplication([])
+    started = time.perf_counter()
+    window = gui.MainWindow()  # config.json і versions.db - з поточної папки
+    report["load_ms"] = (time.perf_counter() - started) * 1000
+    latencies = []
+    time_writes(window.db, latencies)
+
+    # Найдовша пауза між тактами таймера - наскільки "зависав" інтерфейс
+    ticks = {"last": time.perf_counter(), "max_gap": 0.0}
+
+    def tick():
+        now = time.perf_counter()
+        ticks["max_gap"] = max(ticks["max_gap"], now - ticks["last"])
+        ticks["last"] = now
+
+    timer = QTimer()
+    timer.timeout.connect(tick)
+    timer.start(10)
+
+    started = time.perf_counter()
+    window.check_all_programs()
+    thread = window.check_thread
+    # Обробники MainWindow підключені раніше, тому виконуються до виходу
+    thread.finished.connect(app.quit)
+    thread.error.connect(lambda message: app.quit())
+    app.exec_()
+    report["check_s"] = time.perf_counter() - started
+    timer.stop()
+
+    report["checked"] = len(thread.programs)
+    report.update(count_statuses(window.db, thread.checker.run_id))
+    report["max_ui_stall_ms"] = ticks["max_gap"] * 1000
+    report["rows"] = window.program_model.rowCount()
+    window.close()
+    return latencies
+
+
+def print_report(report):
+    print(f"\n🗄️ Заповнення БД: {report['fill_s']:.2f} с, завантаження програм: {report['load_ms']:.0f} мс")
+    print(f"🔍 Перевірено {report['checked']} програм за {report['check_s']:.2f} с "
+          f"({report['checks_per_second']:.1f} перевірок/с)")
+    print(f"   версію знайдено: {report['found']}, не знайдено: {report['not_found']}, "
+          f"помилок: {report['errors']}")
+    writes = report["db_writes"]
+    print(f"💾 Записів у БД: {writes['count']}, затримка до коміту: p50 {writes['p50_ms']:.1f} мс, "
+          f"p99 {writes['p99_ms']:.1f} мс, макс. {writes['max_ms']:.1f} мс")
+    if report["peak_rss_mb"] is not None:
+        print(f"🧠 Пік RSS: {report['peak_rss_mb']:.0f} МБ")
+    if "max_ui_stall_ms" in report:
+        print(f"🖥️ Рядків у таблиці: {report['rows']}, найдовша пауза циклу подій: "
+              f"{report['max_ui_stall_ms']:.0f} мс")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--programs", type=int, default=10000, help="кількість програм")
+    arg_parser.add_argument("--hosts", type=int, default=20, help="кількість серверів-заглушок")
+    arg_parser.add_argument("--inactive", type=float, default=0.0, help="частка неактивних програм")
+    arg_parser.add_argument("--latency-ms", type=float, default=20, help="середня затримка відповіді")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="частка відповідей HTTP 503")
+    arg_parser.add_argument("--page-kb", type=int, default=64, help="розмір сторінки, КБ")
+    arg_parser.add_argument("--version-at", choices=("start", "end"), default="end",
+                            help="де на сторінці версія (end - сторінка читається повністю)")
+    arg_parser.add_argument("--workers", type=int, default=DEFAULT_CONFIG["checking"]["max_concurrent_checks"])
+    arg_parser.add_argument("--per-host", type=int, default=DEFAULT_CONFIG["checking"]["max_checks_per_host"])
+    arg_parser.add_argument("--retries", type=int, default=1, help="retry_attempts")
+    arg_parser.add_argument("--retry-delay", type=float, default=0.1, help="retry_base_delay, с")
+    arg_parser.add_argument("--timeout", type=float, default=10, help="timeout_seconds")
+    arg_parser.add_argument("--seed", type=int, default=42)
+    arg_parser.add_argument("--gui", action="store_true", help="перевірка через MainWindow (offscreen)")
+    arg_parser.add_argument("--verbose", action="store_true", help="не приховувати вивід парсера")
+    arg_parser.add_argument("--json", action="store_true", help="звіт у форматі JSON")
+    args = arg_parser.parse_args()
+
+    options = {"latency_ms": args.latency_ms, "error_rate": args.error_rate, "page_kb": args.page_kb,
+               "version_at": args.version_at, "seed": args.seed}
+    stub_process, ports = start_stubs(args.hosts, options)
+    config = make_config(args)
+    report = {"programs": args.programs, "hosts": args.hosts, "mode": "gui" if args.gui else "headless",
+              "options": options}
+    if not args.json:
+        print(f"📦 Програм: {args.programs}, хостів: {args.hosts}, сторінка: {args.page_kb} КБ, "
+              f"затримка: {args.latency_ms:.0f} мс, помилок: {args.error_rate:.0%}, "
+              f"режим: {'GUI' if args.gui else 'без GUI'}")
+
+    previous_dir = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench-scale-") as work_dir:
+            os.chdir(work_dir)
+            db_path = os.path.join(work_dir, "versions.db")
+            db = Database(db_path)
+            started = time.perf_counter()
+            fill_database(db, args.programs, ports, args.inactive)
+            report["fill_s"] = time.perf_counter() - started
+            db.close_all_connections()
+
+            # Парсер друкує рядок на кожну програму
+            with open(os.devnull, "w", encoding="utf-8") as devnull, \
+                    (contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(devnull)):
+                if args.gui:
+                    latencies = run_gui(work_dir, config, report)
+                else:
+                    latencies = run_headless(db_path, config, report)
+            # Тимчасову папку не можна видалити, поки вона поточна (Windows)
+            os.chdir(previous_dir)
+    finally:
+        os.chdir(previous_dir)
+        stub_process.terminate()
+
+    latencies.sort()
+    report["checks_per_second"] = report["checked"] / report["check_s"] if report["check_s"] else 0.0
+    report["db_writes"] = {
+        "count": len(latencies),
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": latencies[-1] if latencies else 0.0,
+    }
+    report["peak_rss_mb"] = peak_rss_mb()
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
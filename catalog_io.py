@@ -0,0 +1,329 @@
+"""
+Масовий імпорт та експорт каталогу програм і історії версій (CSV, JSON, JSONL).
+
+Файл читається й пишеться потоково: в пам'яті лише пачка з CHUNK_SIZE рядків,
+тож каталог на сотні тисяч програм не потребує більше пам'яті, ніж на десять.
+
+Імпорт виконується однією транзакцією в потоці запису: рядки пачками
+(executemany) потрапляють у тимчасову таблицю, а звідти двома запитами
+оновлюють наявні програми та додають нові. Помилка будь-де - і БД лишається
+такою, як до імпорту. Програма визначається парою (name, url): повторний
+імпорт того самого файлу не створює дублікатів, а з однаковою парою у файлі
+перемагає останній рядок. Порожні поля не затирають наявні значення.
+
+Експорт читає БД курсором через fetchmany і одразу пише у файл.
+"""
+
+import csv
+import json
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+CHUNK_SIZE = 1000
+
+FORMATS = ('csv', 'json', 'jsonl')
+
+# Колонки файлу для кожної таблиці; програма в історії - пара (name, url)
+PROGRAM_EXPORT_FIELDS = ('name', 'category', 'url', 'current_version', 'installed_version',
+                         'version_selector', 'check_interval', 'is_active', 'last_check')
+HISTORY_EXPORT_FIELDS = ('name', 'url', 'version', 'check_date')
+TABLES = ('programs', 'history')
+
+TRUE_VALUES = {'1', 'true', 'yes', 'так', 'y', 'on'}
+FALSE_VALUES = {'0', 'false', 'no', 'ні', 'n', 'off'}
+
+
+def detect_format(path, fmt=None):
+    """Формат за параметром або розширенням файлу (.csv, .json, .jsonl / .ndjson)"""
+    if fmt:
+        fmt = fmt.lower()
+    else:
+        extension = os.path.splitext(path)[1].lower().lstrip('.')
+        fmt = 'jsonl' if extension == 'ndjson' else extension
+    if fmt not in FORMATS:
+        raise ValueError(f"невідомий формат файлу '{path}': вкажіть один з {', '.join(FORMATS)}")
+    return fmt
+
+
+@contextmanager
+def open_stream(path, mode, fmt):
+    """Відкрити файл (або stdin / stdout для '-') у текстовому режимі"""
+    if path == '-':
+        yield sys.stdin if mode == 'r' else sys.stdout
+        return
+    # BOM у CSV - щоб Excel правильно показав кирилицю; utf-8-sig при читанні його пропускає
+    encoding = 'utf-8-sig' if fmt == 'csv' else 'utf-8'
+    with open(path, mode, encoding=encoding, newline='' if fmt == 'csv' else None) as stream:
+        yield stream
+
+
+def iter_json_array(stream, read_size=64 * 1024):
+    """Потоково розібрати JSON-масив об'єктів, не читаючи файл цілком"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    eof = False
+
+    while True:
+        # Пропускаємо пробіли та роздільники між елементами
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position < len(buffer):
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError("JSON-файл має містити масив об'єктів")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Елемент обірвано на межі прочитаного - дочитуємо
+                if eof:
+                    raise
+            else:
+                position = end
+                yield item
+                continue
+        elif eof:
+            raise ValueError("JSON-масив не завершено")
+
+        chunk = stream.read(read_size)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def read_rows(stream, fmt):
+    """Рядки файлу як словники"""
+    if fmt == 'csv':
+        return csv.DictReader(stream)
+    if fmt == 'jsonl':
+        return (json.loads(line) for line in stream if line.strip())
+    return iter_json_array(stream)
+
+
+def text(value):
+    """Порожнє значення - None (поле не змінюється)"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def parse_flag(value):
+    if isinstance(value, bool):
+        return int(value)
+    value = text(value)
+    if value is None:
+        return None
+    if value.lower() in TRUE_VALUES:
+        return 1
+    if value.lower() in FALSE_VALUES:
+        return 0
+    raise ValueError(f"невірне значення is_active: {value!r}")
+
+
+def parse_interval(value):
+    value = text(value)
+    return None if value is None else int(float(value))
+
+
+def program_params(row):
+    """Параметри тимчасової таблиці для рядка програми; None - рядок пропускається"""
+    try:
+        name, url = text(row.get('name')), text(row.get('url'))
+        if not name or not url:
+            return None
+        return (name, url, text(row.get('category')), text(row.get('current_version')),
+                text(row.get('installed_version')),
+                # "selector" - як у діалозі додавання програми
+                text(row.get('version_selector', row.get('selector'))),
+                parse_interval(row.get('check_interval')), parse_flag(row.get('is_active')),
+                text(row.get('last_check')))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def history_params(row):
+    try:
+        name, url, version = text(row.get('name')), text(row.get('url')), text(row.get('version'))
+        if not name or not url or not version:
+            return None
+        return (name, url, version, text(row.get('check_date')))
+    except (AttributeError, TypeError):
+        return None
+
+
+def stage(cursor, rows, to_params, insert_sql):
+    """Записати рядки пачками в тимчасову таблицю; повертає (прочитано, пропущено)"""
+    read = skipped = 0
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, CHUNK_SIZE))
+        if not chunk:
+            return read, skipped
+        read += len(chunk)
+        params = [p for p in map(to_params, chunk) if p is not None]
+        skipped += len(chunk) - len(params)
+        cursor.executemany(insert_sql, params)
+
+
+def import_programs(cursor, rows):
+    now = datetime.now().strftime(DATE_FORMAT)
+    cursor.execute('DROP TABLE IF EXISTS temp.import_programs')
+    cursor.execute('''
+        CREATE TEMP TABLE import_programs (
+            name TEXT NOT NULL, url TEXT NOT NULL, category TEXT, current_version TEXT,
+            installed_version TEXT, version_selector TEXT, check_interval INTEGER,
+            is_active INTEGER, last_check TEXT,
+            UNIQUE (name, url) ON CONFLICT REPLACE
+        )
+    ''')
+    try:
+        read, skipped = stage(cursor, rows, program_params,
+                              'INSERT INTO import_programs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)')
+        cursor.execute('''
+            UPDATE programs SET
+                category = COALESCE(s.category, programs.category),
+                current_version = COALESCE(s.current_version, programs.current_version),
+                installed_version = COALESCE(s.installed_version, programs.installed_version),
+                version_selector = COALESCE(s.version_selector, programs.version_selector),
+                check_interval = COALESCE(s.check_interval, programs.check_interval),
+                is_active = COALESCE(s.is_active, programs.is_active),
+                last_check = COALESCE(s.last_check, programs.last_check),
+                updated_at = ?
+            FROM import_programs AS s
+            WHERE programs.name = s.name AND programs.url = s.url
+        ''', (now,))
+        updated = cursor.rowcount
+        cursor.execute('''
+            INSERT INTO programs (name, category, url, current_version, installed_version,
+                                  version_selector, check_interval, is_active, last_check,
+                                  created_at, updated_at)
+            SELECT s.name, COALESCE(s.category, 'Програма'), s.url, s.current_version,
+                   COALESCE(s.installed_version, ''), COALESCE(s.version_selector, ''),
+                   COALESCE(s.check_interval, 24), COALESCE(s.is_active, 1), s.last_check, ?, ?
+            FROM import_programs AS s
+            WHERE NOT EXISTS (SELECT 1 FROM programs p WHERE p.name = s.name AND p.url = s.url)
+        ''', (now, now))
+        inserted = cursor.rowcount
+    finally:
+        cursor.execute('DROP TABLE IF EXISTS temp.import_programs')
+    return {'read': read, 'inserted': inserted, 'updated': updated, 'skipped': skipped}
+
+
+def import_history(cursor, rows):
+    now = datetime.now().strftime(DATE_FORMAT)
+    cursor.execute('DROP TABLE IF EXISTS temp.import_history')
+    cursor.execute('''
+        CREATE TEMP TABLE import_history (
+            name TEXT NOT NULL, url TEXT NOT NULL, version TEXT NOT NULL, check_date TEXT
+        )
+    ''')
+    try:
+        read, skipped = stage(cursor, rows, history_params,
+                              'INSERT INTO import_history VALUES (?, ?, ?, ?)')
+        # Записи невідомих програм і вже наявні записи пропускаються
+        cursor.execute('''
+            INSERT INTO version_history (program_id, version, check_date)
+            SELECT p.id, s.version, COALESCE(s.check_date, ?)
+            FROM import_history AS s
+            JOIN programs AS p ON p.name = s.name AND p.url = s.url
+            WHERE NOT EXISTS (
+                SELECT 1 FROM version_history h
+                WHERE h.program_id = p.id AND h.version = s.version
+                  AND h.check_date = COALESCE(s.check_date, ?)
+            )
+        ''', (now, now))
+        inserted = cursor.rowcount
+    finally:
+        cursor.execute('DROP TABLE IF EXISTS temp.import_history')
+    return {'read': read, 'inserted': inserted, 'updated': 0,
+            'skipped': read - inserted}
+
+
+def import_rows(db, rows, table='programs'):
+    """
+    Імпортувати рядки (словники) однією транзакцією.
+    Повертає {'read', 'inserted', 'updated', 'skipped'}.
+    """
+    if table not in TABLES:
+        raise ValueError(f"невідома таблиця '{table}': {', '.join(TABLES)}")
+    importer = import_programs if table == 'programs' else import_history
+    return db.execute_write(lambda cursor: importer(cursor, rows))
+
+
+def import_catalog(db, path, table='programs', fmt=None):
+    """Імпортувати файл (path='-' - stdin); формат за розширенням або fmt"""
+    fmt = detect_format(path, fmt)
+    with open_stream(path, 'r', fmt) as stream:
+        stats = import_rows(db, read_rows(stream, fmt), table)
+    print(f"📥 Імпорт {path}: прочитано {stats['read']}, додано {stats['inserted']}, "
+          f"оновлено {stats['updated']}, пропущено {stats['skipped']}", file=sys.stderr)
+    return stats
+
+
+def iter_export_rows(db, table='programs', batch_size=CHUNK_SIZE):
+    """Рядки таблиці як словники, курсором пачками по batch_size"""
+    if table not in TABLES:
+        raise ValueError(f"невідома таблиця '{table}': {', '.join(TABLES)}")
+    connection, _ = db.get_connection()
+    # Окремий курсор: спільний курсор потоку може знадобитися, поки йде експорт
+    cursor = connection.cursor()
+    if table == 'programs':
+        fields = PROGRAM_EXPORT_FIELDS
+        cursor.execute(f'SELECT {", ".join(fields)} FROM programs ORDER BY id')
+    else:
+        fields = HISTORY_EXPORT_FIELDS
+        cursor.execute('''
+            SELECT p.name, p.url, h.version, h.check_date
+            FROM version_history h JOIN programs p ON p.id = h.program_id
+            ORDER BY h.id
+        ''')
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield dict(zip(fields, row))
+    finally:
+        cursor.close()
+
+
+def write_rows(stream, rows, fmt, fields):
+    """Записати рядки у файл; повертає їх кількість"""
+    count = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=fields)
+        writer.writeheader()
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row)
+    elif fmt == 'jsonl':
+        for count, row in enumerate(rows, 1):
+            stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+    else:
+        stream.write("[")
+        for count, row in enumerate(rows, 1):
+            stream.write(("\n  " if count == 1 else ",\n  ") + json.dumps(row, ensure_ascii=False))
+        stream.write("\n]\n" if count else "]\n")
+    return count
+
+
+def export_catalog(db, path, table='programs', fmt=None):
+    """Експортувати таблицю у файл (path='-' - stdout); повертає кількість рядків"""
+    fmt = detect_format(path, fmt)
+    fields = PROGRAM_EXPORT_FIELDS if table == 'programs' else HISTORY_EXPORT_FIELDS
+    with open_stream(path, 'w', fmt) as stream:
+        count = write_rows(stream, iter_export_rows(db, table), fmt, fields)
+    print(f"📤 Експорт {path}: {count} рядків", file=sys.stderr)
+    return count
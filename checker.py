@@ -0,0 +1,249 @@
+"""
+Рушій паралельної перевірки версій.
+Не залежить від PyQt5, тому може використовуватись як з GUI, так і без нього.
+"""
+
+import threading
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from urllib.parse import urlparse
+
+from metrics import CheckTrace, new_run_id, tracing
+from parser import VersionParser
+from resilience import RateLimited
+
+# Скільки програм (на потік) тримати прочитаними наперед; програми читаються
+# з ітератора (БД) в міру перевірки, а не всі одразу
+BUFFER_PER_WORKER = 32
+# Скільки програм за раз передавати парсеру (спільні ресурси, пакетні запити API)
+RUN_CHUNK_SIZE = 100
+_END = object()
+
+
+def get_host(url):
+    """Отримати ключ хоста для обмеження паралельності"""
+    return urlparse(url or "").netloc.lower()
+
+
+class CheckResult:
+    """Результат перевірки однієї програми"""
+    __slots__ = ('program', 'version', 'error')
+
+    def __init__(self, program, version=None, error=None):
+        self.program = program
+        self.version = version
+        self.error = error
+
+
+class CheckEngine:
+    """
+    Паралельна перевірка програм з глобальним лімітом та лімітом на хост.
+
+    Завдання групуються в черги за хостом. Нове завдання відправляється в пул
+    тільки тоді, коли є вільний потік і хост не перевищив свій ліміт, тому
+    потоки ніколи не простоюють в очікуванні "зайнятого" хоста.
+
+    Програми читаються з ітератора поступово: у чергах не більше buffer_size
+    програм. Якщо всі хости буфера зайняті, а потоки вільні, читаються
+    наступні програми (до 4 x buffer_size), щоб знайти вільний хост.
+    """
+
+    def __init__(self, check_func, max_workers=8, per_host_limit=2, buffer_size=None):
+        self.check_func = check_func
+        self.max_workers = max(1, int(max_workers))
+        self.per_host_limit = max(1, int(per_host_limit))
+        self.buffer_size = max(self.max_workers, int(buffer_size or self.max_workers * BUFFER_PER_WORKER))
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """Зупинити відправку нових завдань"""
+        self._stop_event.set()
+
+    @property
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def run(self, programs, get_url=lambda program: program.url):
+        """
+        Перевірити програми (будь-який ітерабельний, зокрема генератор з БД)
+        та повертати результати в міру готовності.
+
+        Генератор виконується в потоці, що його викликав: саме там зручно
+        записувати результати в БД та відправляти сигнали.
+        """
+        programs = iter(programs)
+        queues = OrderedDict()  # хост -> deque програм
+        buffered = 0
+        exhausted = False
+
+        def read(limit):
+            nonlocal buffered, exhausted
+            while not exhausted and buffered < limit and not self.stopped:
+                program = next(programs, _END)
+                if program is _END:
+                    exhausted = True
+                    break
+                queues.setdefault(get_host(get_url(program)), deque()).append(program)
+                buffered += 1
+
+        active = {}  # хост -> кількість запущених перевірок
+        futures = {}  # future -> (хост, програма)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="version-check") as pool:
+
+            def submit_ready():
+                nonlocal buffered
+                # Обходимо хости по колу, щоб один великий хост не забрав усі потоки
+                while len(futures) < self.max_workers and not self.stopped:
+                    read(self.buffer_size)
+                    submitted = False
+                    for host in list(queues):
+                        if len(futures) >= self.max_workers:
+                            break
+                        if active.get(host, 0) >= self.per_host_limit:
+                            continue
+                        program = queues[host].popleft()
+                        if not queues[host]:
+                            del queues[host]
+                        buffered -= 1
+                        active[host] = active.get(host, 0) + 1
+                        futures[pool.submit(self.check_func, program)] = (host, program)
+                        submitted = True
+                    if not submitted:
+                        # Усі хости буфера на ліміті - шукаємо далі програму вільного хоста
+                        if exhausted or buffered >= self.buffer_size * 4:
+                            break
+                        read(buffered + 1)
+
+            submit_ready()
+            while futures:
+                done, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+                for future in done:
+                    host, program = futures.pop(future)
+                    active[host] -= 1
+                    try:
+                        yield CheckResult(program, version=future.result())
+                    except Exception as e:
+                        yield CheckResult(program, error=e)
+                submit_ready()
+
+
+class VersionChecker:
+    """Клас для перевірки версій (не успадковує QThread)"""
+    def __init__(self, db, config=None, pool_size=10):
+        self.db = db
+        self.config = config or {}
+        self.parser = VersionParser(pool_size=pool_size, db=db, config=config)
+        # program_id -> CheckTrace останньої перевірки (пишуть потоки пулу)
+        self.traces = {}
+        self.run_id = None  # ID останнього запуску check_programs
+        # program_id -> timestamp: перевірки, відкладені через ліміт запитів API
+        self.deferred = {}
+        self.stats_enabled = self.config.get('checking', {}).get('collect_stats', True)
+    
+    def fetch_version(self, program):
+        """Отримати версію програми з сайту (без запису в БД, потокобезпечно)"""
+        trace = CheckTrace(program.id, get_host(program.url))
+        self.traces[program.id] = trace
+        with tracing(trace):
+            # Екстрактор вибирається за хостом (див. extractors.py)
+            return self.parser.get_version(program)
+    
+    def apply_result(self, program, version, error=None, run_id=None):
+        """Записати результат перевірки в БД та повернути його опис"""
+        program_id = program.id
+        installed_version = program.installed_version
+        
+        result = {
+            'program_id': program_id,
+            'name': program.name,
+            'version': version,
+            'installed_version': installed_version,
+            'success': version is not None,
+            'updated': False,
+            'update_available': False
+        }
+        if isinstance(error, RateLimited):
+            # Не помилка: програму треба перевірити після скидання ліміту
+            result['deferred_until'] = error.retry_at
+            self.deferred[program_id] = error.retry_at
+        elif error is not None:
+            result['error'] = str(error)
+        
+        if version:
+            # Перевіряємо, чи змінилася версія
+            current_version = program.current_version
+            if version != current_version:
+                # update_version також оновлює час останньої перевірки;
+                # не чекаємо коміту - потік запису об'єднає записи в пачку
+                self.db.update_version(program_id, version, wait=False)
+                result['updated'] = True
+                result['old_version'] = current_version
+            else:
+                # Оновлюємо час останньої перевірки
+                self.db.update_last_check(program_id, wait=False)
+            result['update_available'] = bool(installed_version) and version != installed_version
+        
+        self.save_trace(program, result, run_id)
+        return result
+    
+    def save_trace(self, program, result, run_id=None):
+        """Зберегти вимірювання перевірки в check_runs"""
+        trace = self.traces.pop(program.id, None)
+        if trace is None or not self.stats_enabled:
+            return
+        # Парсер перехоплює мережеві помилки сам і записує їх у trace
+        error = result.get('error') or trace.error
+        if 'deferred_until' in result:
+            status = 'deferred'
+        elif error:
+            status = 'error'
+        else:
+            status = 'ok' if result['success'] else 'not_found'
+        self.db.save_check_run(run_id or new_run_id(), trace.finish(), status, error, wait=False)
+    
+    def check_program(self, program):
+        """Перевірити одну програму"""
+        return self.apply_result(program, self.fetch_version(program))
+    
+    def feed_programs(self, programs):
+        """Програми для рушія, частинами передані парсеру (begin_run)"""
+        programs = iter(programs)
+        while True:
+            chunk = list(islice(programs, RUN_CHUNK_SIZE))
+            if not chunk:
+                return
+            self.parser.add_run_programs(chunk)
+            yield from chunk
+    
+    def check_programs(self, programs, engine=None):
+        """
+        Перевірити програми паралельно, повертаючи результати в міру готовності.
+        programs читаються поступово, тож можна передати db.iter_programs():
+        перша перевірка починається одразу, а пам'ять не залежить від розміру каталогу.
+        Запис у БД виконується в потоці, що викликав генератор.
+        """
+        if engine is None:
+            checking = self.config.get('checking', {})
+            engine = CheckEngine(
+                self.fetch_version,
+                max_workers=checking.get('max_concurrent_checks', 8),
+                per_host_limit=checking.get('max_checks_per_host', 2)
+            )
+        run_id = self.run_id = new_run_id()
+        self.deferred = {}
+        # Спільні запити для однакових адрес і пакетні запити до API (GitHub GraphQL)
+        self.parser.begin_run()
+        try:
+            for check in engine.run(self.feed_programs(programs)):
+                self.parser.finish_run_program(check.program)
+                yield self.apply_result(check.program, check.version, check.error, run_id)
+        finally:
+            self.parser.end_run()
+            if self.stats_enabled:
+                keep_days = self.config.get('checking', {}).get('stats_keep_days', 30)
+                self.db.prune_check_runs(keep_days, wait=False)
+            # Після перевірки всі результати вже в БД
+            self.db.flush()
@@ -0,0 +1,395 @@
+"""
+Консольний (headless) режим Version Checker.
+Не імпортує PyQt5 - підходить для cron / systemd на серверах.
+
+Приклади:
+    python launcher.py check --all
+    python launcher.py check --category "Прошивка" --json
+    python launcher.py check --id 3 --id 7
+    python launcher.py check --due               (лише ті, кого час перевіряти)
+    python launcher.py schedule                  (постійна робота за розкладом)
+    python launcher.py worker                    (один з кількох процесів, черга в БД)
+    python launcher.py worker --once             (перевірити все, що в черзі, і вийти)
+    python launcher.py stats --runs 5            (найповільніші хости та програми)
+    python launcher.py import devices.csv        (додати / оновити програми з файлу)
+    python launcher.py export history.jsonl --table history
+    python launcher.py backup --compress         (резервна копія БД у папку backups)
+
+Коди виходу:
+    0 - перевірка пройшла, оновлень немає
+    1 - помилка запуску (БД, аргументи тощо)
+    2 - є програми, для яких доступне оновлення
+    3 - оновлень немає, але для деяких програм версію не знайдено
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+import catalog_io
+from backup import BackupManager
+from checker import CheckEngine, VersionChecker
+from config import load_config
+from database import Database
+from metrics import format_summary
+from scheduler import CheckScheduler
+from work_queue import WorkQueue, check_leased
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_UPDATES_AVAILABLE = 2
+EXIT_CHECK_FAILED = 3
+
+def app_dir():
+    """Папка програми: поряд з EXE або з цим файлом (як у launcher.py)"""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def build_arg_parser():
+    # Спільні параметри для всіх команд
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", default=os.path.join(app_dir(), "config.json"),
+                        help="шлях до config.json")
+    common.add_argument("--db", help="шлях до бази даних (за замовчуванням з config.json)")
+
+    parser = argparse.ArgumentParser(
+        prog="launcher.py",
+        description="Version Checker - перевірка версій без графічного інтерфейсу"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    check = subparsers.add_parser("check", parents=[common], help="перевірити версії програм")
+    scope = check.add_mutually_exclusive_group()
+    scope.add_argument("--all", action="store_true",
+                       help="перевірити всі програми, включно з неактивними")
+    scope.add_argument("--id", type=int, action="append", dest="ids", metavar="ID",
+                       help="перевірити програму за ID (можна кілька разів)")
+    scope.add_argument("--due", action="store_true",
+                       help="лише програми, час перевірки яких настав (для cron)")
+    check.add_argument("--category", help="лише програми з цієї категорії")
+    check.add_argument("--json", action="store_true", help="вивести результати у форматі JSON")
+    check.add_argument("--workers", type=int, help="загальний ліміт паралельних перевірок")
+    check.add_argument("--per-host", type=int, help="ліміт паралельних перевірок на хост")
+
+    subparsers.add_parser("schedule", parents=[common],
+                          help="працювати постійно, перевіряючи програми за розкладом")
+    
+    worker = subparsers.add_parser("worker", parents=[common],
+                                   help="перевіряти програми з черги в БД разом з іншими процесами")
+    worker.add_argument("--once", action="store_true",
+                        help="перевірити програми, що вже в черзі чи на черзі, і завершитись")
+    worker.add_argument("--batch", type=int, help="скільки програм брати з черги за раз")
+    worker.add_argument("--workers", type=int, help="загальний ліміт паралельних перевірок")
+    worker.add_argument("--per-host", type=int, help="ліміт паралельних перевірок на хост")
+    
+    stats = subparsers.add_parser("stats", parents=[common],
+                                  help="найповільніші хости та програми за останніми перевірками")
+    stats.add_argument("--run", help="лише запуск з цим ID (run_id з check --json)")
+    stats.add_argument("--runs", type=int, default=10, help="скільки останніх запусків врахувати")
+    stats.add_argument("--limit", type=int, default=10, help="скільки хостів і програм показати")
+    stats.add_argument("--json", action="store_true", help="вивести підсумок у форматі JSON")
+
+    for name, help_text in (("import", "імпортувати програми або історію версій з файлу"),
+                            ("export", "експортувати програми або історію версій у файл")):
+        command = subparsers.add_parser(name, parents=[common], help=help_text)
+        command.add_argument("file", help="файл CSV / JSON / JSONL ('-' - stdin / stdout)")
+        command.add_argument("--table", choices=catalog_io.TABLES, default="programs",
+                             help="програми (за замовчуванням) або історія версій")
+        command.add_argument("--format", choices=catalog_io.FORMATS,
+                             help="формат файлу (за замовчуванням - за розширенням)")
+
+    backup = subparsers.add_parser("backup", parents=[common],
+                                   help="зробити резервну копію БД (не зупиняючи інші процеси)")
+    backup.add_argument("--folder", help="папка для копій (за замовчуванням з config.json)")
+    backup.add_argument("--keep", type=int, help="скільки останніх копій зберігати")
+    backup.add_argument("--compress", action="store_true", help="стиснути копію (gzip)")
+    backup.add_argument("--due", action="store_true",
+                        help="лише якщо минуло backup_interval_days з останньої копії (для cron)")
+    backup.add_argument("--list", action="store_true", help="показати наявні копії")
+    return parser
+
+
+def open_database(args, config):
+    """Відкрити БД: --db або ім'я з config.json поряд з програмою"""
+    database = config.get('database', {})
+    db_path = args.db or os.path.join(app_dir(), database.get('name', 'versions.db'))
+    return Database(db_path, journal_mode=database.get('journal_mode', 'wal'))
+
+
+def select_programs(db, args, config):
+    """Обрати програми для перевірки за аргументами командного рядка"""
+    if args.ids:
+        programs = [db.get_program_by_id(program_id) for program_id in args.ids]
+        missing = [pid for pid, program in zip(args.ids, programs) if program is None]
+        if missing:
+            raise ValueError(f"програми з ID {', '.join(map(str, missing))} не знайдено")
+        if args.category:
+            programs = [p for p in programs if p.category == args.category]
+        return programs
+    if args.due:
+        scheduler = make_scheduler(db, config)
+        programs = [db.get_program_by_id(program_id) for program_id in scheduler.pop_due()]
+        return [p for p in programs if p and (not args.category or p.category == args.category)]
+    # Каталог читається сторінками в міру перевірки, а не весь одразу
+    return db.iter_programs(active_only=not args.all, category=args.category)
+
+
+def make_scheduler(db, config):
+    """Планувальник з налаштуваннями з config.json, відновлений з БД"""
+    checking = config.get('checking', {})
+    scheduler = CheckScheduler(
+        db,
+        default_interval_minutes=checking.get('auto_check_interval_minutes', 1440) or 1440,
+        jitter_seconds=checking.get('scheduler_jitter_seconds', 300)
+    )
+    scheduler.rebuild()
+    return scheduler
+
+
+def make_checker(db, config, workers=None, per_host=None):
+    """VersionChecker та CheckEngine з лімітами з config.json"""
+    checking = config.get('checking', {})
+    workers = workers or checking.get('max_concurrent_checks', 8)
+    per_host = per_host or checking.get('max_checks_per_host', 2)
+    parsing = config.get('parsing', {})
+    if parsing.get('parse_processes') == 'auto':
+        # Процеси розбору потрібні, щоб не "підвисало" вікно; у консолі запуск
+        # пулу коштує більше, ніж дає для кількох програм. Число в config.json
+        # вмикає пул і тут
+        config = {**config, 'parsing': {**parsing, 'parse_processes': 0}}
+    checker = VersionChecker(db, config, pool_size=workers)
+    return checker, CheckEngine(checker.fetch_version, workers, per_host)
+
+
+def print_text_report(results):
+    for result in results:
+        if 'deferred_until' in result:
+            until = time.strftime('%H:%M:%S', time.localtime(result['deferred_until']))
+            status = f"⏸️ ліміт запитів, перевірку відкладено до {until}"
+        elif result.get('error'):
+            status = f"❌ помилка: {result['error']}"
+        elif not result['success']:
+            status = "⚠️ версію не знайдено"
+        elif result['update_available']:
+            status = f"⬆️ доступне оновлення (встановлено {result['installed_version']})"
+        else:
+            status = "✅"
+        print(f"[{result['program_id']}] {result['name']}: {result['version'] or '-'} {status}")
+
+
+def exit_code_for(results):
+    if any(result['update_available'] for result in results):
+        return EXIT_UPDATES_AVAILABLE
+    # Відкладені через ліміт запитів не вважаються невдалими
+    if any(not result['success'] and 'deferred_until' not in result for result in results):
+        return EXIT_CHECK_FAILED
+    return EXIT_OK
+
+
+def command_check(args, config, db):
+    programs = select_programs(db, args, config)
+    checker, engine = make_checker(db, config, args.workers, args.per_host)
+
+    # Повідомлення парсера йдуть у stderr, щоб stdout містив лише результат
+    with contextlib.redirect_stdout(sys.stderr):
+        results = list(checker.check_programs(programs, engine))
+    results.sort(key=lambda result: result['program_id'])
+
+    if args.json:
+        summary = {
+            'run_id': checker.run_id,
+            'checked': len(results),
+            'found': sum(1 for r in results if r['success']),
+            'updated': sum(1 for r in results if r['updated']),
+            'updates_available': sum(1 for r in results if r['update_available']),
+            'deferred': sum(1 for r in results if 'deferred_until' in r),
+        }
+        json.dump({'summary': summary, 'results': results}, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print_text_report(results)
+    return exit_code_for(results)
+
+
+def command_schedule(args, config, db):
+    """Постійна робота: перевіряти програми, коли настає їх час"""
+    tick = config.get('checking', {}).get('scheduler_tick_seconds', 60)
+    scheduler = make_scheduler(db, config)
+    backups = make_backups(db, config)
+    print(f"⏰ Планувальник запущено: {len(scheduler)} програм у черзі", file=sys.stderr)
+
+    try:
+        while True:
+            start_due_backup(backups, config)
+            due_ids = scheduler.pop_due()
+            programs = [db.get_program_by_id(program_id) for program_id in due_ids]
+            programs = [program for program in programs if program]
+            if programs:
+                # Новий перевіряльник на кожен прохід: свіжа сесія та індекс Grandstream
+                checker, engine = make_checker(db, config)
+                with contextlib.redirect_stdout(sys.stderr):
+                    results = list(checker.check_programs(programs, engine))
+                print_text_report(results)
+                sys.stdout.flush()
+                checked_at = time.time()
+                for program in programs:
+                    if program.id in checker.deferred:
+                        scheduler.defer(program.id, checker.deferred[program.id])
+                    else:
+                        scheduler.reschedule(program.id, checked_at)
+
+            next_due = scheduler.next_due()
+            # Нові програми з GUI потрапляють у чергу при наступному rebuild
+            if next_due is None or next_due - time.time() > tick:
+                time.sleep(tick)
+                scheduler.rebuild()
+            else:
+                time.sleep(max(0.0, next_due - time.time()))
+    except KeyboardInterrupt:
+        print("⏹️ Планувальник зупинено", file=sys.stderr)
+    backups.wait()
+    return EXIT_OK
+
+
+def command_worker(args, config, db):
+    """
+    Один з кількох процесів перевірки зі спільною БД: програми, час яких
+    настав, ставляться в чергу work_queue і беруться звідти в оренду.
+    Час перевірки визначає БД (last_check + інтервал), тому процесам не
+    потрібен власний планувальник; відкладені через ліміт запитів API
+    чекають у черзі до скидання ліміту.
+    """
+    checking = config.get('checking', {})
+    tick = checking.get('scheduler_tick_seconds', 60)
+    batch = args.batch or checking.get('worker_batch_size', 50)
+    interval = checking.get('auto_check_interval_minutes', 1440) or 1440
+    queue = WorkQueue(db, lease_seconds=checking.get('lease_seconds', 300))
+    stats = queue.stats()
+    print(f"👷 Процес {queue.owner}: у черзі {stats['queued']}, в оренді {stats['leased']} "
+          f"(процесів: {stats['owners']})", file=sys.stderr)
+
+    all_results = []
+    try:
+        while True:
+            # Програми, час яких настав, ставить у чергу той процес, що помітить першим
+            queue.enqueue(None, default_interval_minutes=interval)
+            while True:
+                program_ids = queue.claim(batch)
+                if not program_ids:
+                    break
+                programs = [program for program in map(db.get_program_by_id, program_ids) if program]
+                checker, engine = make_checker(db, config, args.workers, args.per_host)
+                with contextlib.redirect_stdout(sys.stderr):
+                    results = list(check_leased(queue, checker, programs, engine))
+                print_text_report(results)
+                sys.stdout.flush()
+                if args.once:
+                    all_results.extend(results)
+            if args.once:
+                return exit_code_for(all_results)
+            time.sleep(tick)
+    except KeyboardInterrupt:
+        queue.release()
+        print("⏹️ Процес перевірки зупинено, програми повернуто в чергу", file=sys.stderr)
+    return EXIT_OK
+
+
+def command_stats(args, config, db):
+    """Підсумок вимірювань з таблиці check_runs"""
+    summary = db.get_check_run_summary(args.run, runs=args.runs, limit=args.limit)
+    if args.json:
+        json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print(format_summary(summary))
+    return EXIT_OK
+
+
+def command_import(args, config, db):
+    """Масовий імпорт програм / історії однією транзакцією (catalog_io)"""
+    catalog_io.import_catalog(db, args.file, args.table, args.format)
+    return EXIT_OK
+
+
+def command_export(args, config, db):
+    """Потоковий експорт програм / історії (stdout для '-')"""
+    catalog_io.export_catalog(db, args.file, args.table, args.format)
+    return EXIT_OK
+
+
+def make_backups(db, config, args=None):
+    """BackupManager з config.json; аргументи командного рядка мають пріоритет"""
+    backups = BackupManager.from_config(db, config)
+    if args is not None:
+        if args.folder:
+            backups = BackupManager(db, args.folder, backups.keep, backups.compress)
+        if args.keep is not None:
+            backups.keep = args.keep
+        if args.compress:
+            backups.compress = True
+    return backups
+
+
+def start_due_backup(backups, config):
+    """Для постійної роботи: фонова копія, якщо настав її час"""
+    database = config.get('database', {})
+    if database.get('auto_backup') and backups.is_due(database.get('backup_interval_days', 7)):
+        backups.start()
+
+
+def command_backup(args, config, db):
+    """Резервна копія БД через SQLite backup API"""
+    backups = make_backups(db, config, args)
+    if args.list:
+        for stamp, path in backups.list_backups():
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            print(f"{stamp:%Y-%m-%d %H:%M:%S}  {size_mb:8.1f} МБ  {path}")
+        return EXIT_OK
+    if args.due and not backups.is_due(config.get('database', {}).get('backup_interval_days', 7)):
+        print("💾 Резервна копія ще не потрібна", file=sys.stderr)
+        return EXIT_OK
+    with contextlib.redirect_stdout(sys.stderr):
+        path = backups.backup()
+    print(path)
+    return EXIT_OK
+
+
+def run_cli(argv):
+    """Точка входу консольного режиму; повертає код виходу"""
+    try:
+        args = build_arg_parser().parse_args(argv)
+    except SystemExit as e:
+        # argparse завершується з кодом 2, а він у нас означає "є оновлення"
+        return EXIT_OK if e.code == 0 else EXIT_ERROR
+    config = load_config(args.config)
+    db = open_database(args, config)
+    try:
+        if args.command == 'check':
+            return command_check(args, config, db)
+        if args.command == 'schedule':
+            return command_schedule(args, config, db)
+        if args.command == 'worker':
+            return command_worker(args, config, db)
+        if args.command == 'stats':
+            return command_stats(args, config, db)
+        if args.command == 'import':
+            return command_import(args, config, db)
+        if args.command == 'export':
+            return command_export(args, config, db)
+        if args.command == 'backup':
+            return command_backup(args, config, db)
+    except Exception as e:
+        print(f"❌ Помилка: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    finally:
+        db.close_all_connections()
+    return EXIT_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(run_cli(sys.argv[1:]))
@@ -0,0 +1,83 @@
+"""
+Об'єднання однакових запитів у межах однієї перевірки.
+
+Багато програм дивляться на ту саму сторінку (портал завантажень виробника,
+один репозиторій GitHub з різними селекторами). Парсер рахує, скільки
+програм перевірки завантажують кожен ресурс - URL сторінки або API.
+Ресурс, потрібний кільком програмам, завантажується один раз: перший потік
+виконує запит, решта чекають на його результат (або помилку).
+
+Програми додаються (add) в міру того, як перевірка читає їх з БД, і
+звільняються (done), коли їх перевірку завершено, тож облік займає пам'ять
+лише для програм у роботі. Результат тримається, доки не завершаться всі
+програми ресурсу, потім звільняється.
+"""
+
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Один виклик на ключ для всіх програм, яким потрібен цей ключ"""
+
+    def __init__(self, counts=None):
+        # ключ -> скільки програм з цим ключем ще не завершили перевірку
+        self._remaining = {}
+        self._results = {}
+        self._lock = threading.Lock()
+        self.saved = 0  # запитів, яких вдалося уникнути
+        for key, count in (counts or {}).items():
+            self._remaining[key] = count
+
+    def add(self, keys):
+        """Врахувати програми перевірки з цими ключами (None - без ресурсу)"""
+        with self._lock:
+            for key in keys:
+                if key is not None:
+                    self._remaining[key] = self._remaining.get(key, 0) + 1
+
+    def shared(self, key):
+        """Чи потрібен ключ кільком програмам, які ще не завершили перевірку"""
+        with self._lock:
+            return self._remaining.get(key, 0) > 1 or key in self._results
+
+    def pending(self, key):
+        """Скільки програм з ключем ще не завершили перевірку"""
+        with self._lock:
+            return self._remaining.get(key, 0)
+
+    def do(self, key, func):
+        """
+        Результат func() для ключа, спільний для всіх його програм.
+        Повертає (результат, loaded); loaded = False, якщо результат отримав
+        інший потік. Помилка func() передається кожній програмі ключа.
+        """
+        with self._lock:
+            future = self._results.get(key)
+            leader = False
+            if future is not None:
+                self.saved += 1
+            elif self._remaining.get(key, 0) > 1:
+                future = self._results[key] = Future()
+                leader = True
+
+        if future is None:
+            return func(), True
+        if leader:
+            try:
+                future.set_result(func())
+            except BaseException as e:
+                future.set_exception(e)
+        return future.result(), leader
+
+    def done(self, key):
+        """Програма з ключем завершила перевірку (після останньої результат звільняється)"""
+        with self._lock:
+            remaining = self._remaining.get(key)
+            if remaining is None:
+                return
+            if remaining > 1:
+                self._remaining[key] = remaining - 1
+            else:
+                del self._remaining[key]
+                self._results.pop(key, None)
@@ -0,0 +1,68 @@
+"""
+Завантаження config.json з значеннями за замовчуванням.
+Не залежить від PyQt5 (використовується і GUI, і консольним режимом).
+"""
+
+import copy
+import json
+import os
+
+DEFAULT_CONFIG = {
+    "database": {
+        "name": "versions.db",
+        "backup_folder": "backups",
+        "auto_backup": True,
+        "backup_interval_days": 7,
+        "backup_keep": 10,
+        "backup_compress": False,
+        "journal_mode": "wal"
+    },
+    "checking": {
+        "auto_check_interval_minutes": 1440,
+        "retry_attempts": 3,
+        "timeout_seconds": 30,
+        "delay_between_checks": 2,
+        "max_concurrent_checks": 8,
+        "max_checks_per_host": 2,
+        "scheduler_tick_seconds": 60,
+        "scheduler_jitter_seconds": 300,
+        "retry_base_delay": 2,
+        "retry_max_delay_seconds": 30,
+        "circuit_breaker_threshold": 3,
+        "circuit_breaker_reset_seconds": 300,
+        "collect_stats": True,
+        "stats_keep_days": 30,
+        "github_token": "",
+        "lease_seconds": 300,
+        "worker_batch_size": 50
+    },
+    "parsing": {
+        "html_backend": "auto",
+        "streaming": True,
+        "stream_max_bytes": 2 * 1024 * 1024,
+        "stream_probe_bytes": 64 * 1024,
+        "parse_processes": "auto"
+    },
+    "appearance": {
+        "theme": "default",
+        "font_size": 12,
+        "show_notifications": True
+    }
+}
+
+
+def load_config(path='config.json'):
+    """Прочитати конфігурацію; відсутні ключі беруться з DEFAULT_CONFIG"""
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    try:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                user_config = json.load(f)
+            for section, values in user_config.items():
+                if isinstance(values, dict) and isinstance(config.get(section), dict):
+                    config[section].update(values)
+                else:
+                    config[section] = values
+    except Exception as e:
+        print(f"⚠️ Не вдалося прочитати {path}: {e}")
+    return config
@@ -0,0 +1,26 @@
+# conftest.py
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+
+@pytest.fixture
+def http_server():
+    """
+    Локальний HTTP-сервер для тестів: http_server(Handler) запускає сервер
+    з обробником Handler і повертає базову адресу "http://127.0.0.1:<порт>".
+    Після тесту всі запущені сервери зупиняються й закривають сокет.
+    """
+    servers = []
+
+    def serve(handler):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        servers.append(server)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
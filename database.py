@@ -1,12 +1,203 @@
 import sqlite3
 import json
 import os
+import queue
 import sys
 import threading
+from collections import namedtuple
+from concurrent.futures import Future
 from datetime import datetime
 
+from metrics import PHASES
+from migrations import migrate
+
+# Скільки чекати на блокування БД іншим процесом, мс
+BUSY_TIMEOUT_MS = 5000
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+PROGRAM_FIELDS = ('id', 'name', 'category', 'url', 'current_version', 'installed_version',
+                  'version_selector', 'last_check', 'check_interval', 'is_active',
+                  'created_at', 'updated_at')
+# Явний список колонок: нові колонки з міграцій не зсувають поля запису
+PROGRAM_COLUMNS = ", ".join(PROGRAM_FIELDS)
+# Колонки, потрібні перевірці (checker, extractors, work_queue)
+CHECK_FIELDS = ('id', 'name', 'category', 'url', 'current_version', 'installed_version',
+                'version_selector', 'is_active')
+
+
+class ProgramRecord(namedtuple('ProgramRecord', PROGRAM_FIELDS,
+                               defaults=(None, None, "", None, 24, 1, None, None))):
+    """
+    Рядок таблиці programs.
+    
+    Звичайний кортеж без __dict__ (компактний і незмінний), тому його
+    можна безпечно віддавати з кешу в будь-який потік.
+    """
+    __slots__ = ()
+
+
+class CheckRecord(namedtuple('CheckRecord', CHECK_FIELDS)):
+    """
+    Програма з колонками перевірки (Database.iter_programs).
+    
+    Поля, яких немає у вибірці (last_check, check_interval тощо), не
+    підставляються значеннями за замовчуванням: звернення до них -
+    AttributeError, а не правдоподібне, але вигадане значення.
+    """
+    __slots__ = ()
+
+
+def record_factory(columns):
+    """
+    Функція рядок -> запис з полями columns: ProgramRecord для всіх колонок,
+    CheckRecord для колонок перевірки, інакше - namedtuple саме з цих полів.
+    """
+    columns = tuple(columns)
+    if columns == PROGRAM_FIELDS:
+        return ProgramRecord._make
+    if columns == CHECK_FIELDS:
+        return CheckRecord._make
+    return namedtuple('PartialProgramRecord', columns)._make
+
+
+class DatabaseWriter(threading.Thread):
+    """
+    Єдиний потік запису в БД.
+    
+    Записи з усіх потоків ставляться в чергу й виконуються тут. Усе, що
+    накопичилось у черзі, поки йшов попередній запис, виконується однією
+    транзакцією (до batch_size операцій), тому під час масової перевірки
+    на сотні результатів припадає кілька комітів замість сотень.
+    """
+    
+    def __init__(self, db_path, batch_size=200, journal_mode='WAL'):
+        super().__init__(name="db-writer", daemon=True)
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.journal_mode = journal_mode
+        self.queue = queue.Queue()
+        self.connection = None
+        # Помилка, що зупинила потік: наступні записи одразу її отримують
+        self.error = None
+        self._lock = threading.Lock()
+    
+    def open(self):
+        """
+        Відкрити з'єднання запису в потоці, що запускає writer (до start):
+        невірний або недоступний шлях - виняток тут, а не в потоці запису
+        """
+        connection = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        try:
+            cursor = connection.cursor()
+            cursor.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+            if self.journal_mode == 'WAL':
+                # У режимі WAL NORMAL не робить fsync на кожен коміт, лише на checkpoint
+                cursor.execute("PRAGMA synchronous = NORMAL")
+            cursor.execute("PRAGMA foreign_keys = ON")
+            cursor.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        except Exception:
+            connection.close()
+            raise
+        self.connection = connection
+    
+    def submit(self, func):
+        """Поставити запис у чергу; func(cursor) виконується в потоці запису"""
+        future = Future()
+        with self._lock:
+            if self.error is not None:
+                future.set_exception(self.error)
+            else:
+                self.queue.put((func, future))
+        return future
+    
+    def stop(self):
+        """Дописати чергу та зупинити потік"""
+        self.queue.put(None)
+        self.join()
+    
+    def run(self):
+        if self.connection is None:
+            self.open()
+        cursor = self.connection.cursor()
+        batch = []
+        try:
+            running = True
+            while running:
+                batch = [self.queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if None in batch:
+                    running = False
+                    batch = [item for item in batch if item is not None]
+                if batch:
+                    self.write_batch(cursor, batch)
+        except BaseException as e:
+            # Напр., не вдався ROLLBACK: без цього потоки, що чекають на запис, зависли б
+            print(f"❌ Потік запису в БД зупинено: {e}")
+            self.fail_pending(batch, e)
+        finally:
+            self.connection.close()
+    
+    def fail_pending(self, batch, error):
+        """Передати помилку поточній пачці, усім записам у черзі та наступним"""
+        with self._lock:
+            self.error = error
+            pending = list(batch)
+            while True:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    pending.append(item)
+        for func, future in pending:
+            if not future.done():
+                future.set_exception(error)
+    
+    def write_batch(self, cursor, batch):
+        """Виконати пачку записів однією транзакцією"""
+        results = []
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for func, future in batch:
+                # Точка збереження: помилка одного запису не скасовує інші
+                cursor.execute("SAVEPOINT write_item")
+                try:
+                    results.append((future, func(cursor), None))
+                    cursor.execute("RELEASE write_item")
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO write_item")
+                    cursor.execute("RELEASE write_item")
+                    results.append((future, None, e))
+            cursor.execute("COMMIT")
+        except Exception as e:
+            print(f"❌ Помилка запису в БД: {e}")
+            if self.connection.in_transaction:
+                cursor.execute("ROLLBACK")
+            for func, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for future, result, error in results:
+            if error is not None:
+                print(f"❌ Помилка запису в БД: {error}")
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+# WAL потребує спільної пам'яті, тобто всіх процесів на одному комп'ютері;
+# для БД на мережевому диску, спільній для кількох комп'ютерів, - DELETE
+JOURNAL_MODES = ('WAL', 'DELETE', 'TRUNCATE')
+
+
 class Database:
-    def __init__(self, db_name='versions.db'):
+    def __init__(self, db_name='versions.db', journal_mode='WAL'):
         """Ініціалізація бази даних"""
         # Використовуємо правильний шлях
         if getattr(sys, 'frozen', False):
@@ -17,216 +208,378 @@ class Database:
             db_path = db_name
             
         self.db_path = db_path
+        self.journal_mode = (journal_mode or 'WAL').upper()
+        if self.journal_mode not in JOURNAL_MODES:
+            raise ValueError(f"Невідомий journal_mode: {journal_mode} (можливі: {', '.join(JOURNAL_MODES)})")
         self.local_storage = threading.local()  # Для потокобезпечних з'єднань
         
+        # Усі відкриті з'єднання читання (з будь-яких потоків) та потік запису
+        self._lock = threading.Lock()
+        self._connections = []
+        self._generation = 0
+        self.writer = None
+        
+    def start_writer(self):
+        """Запустити потік запису та застосувати міграції схеми (один раз)"""
+        with self._lock:
+            if self.writer is not None:
+                return self.writer
+            writer = DatabaseWriter(self.db_path, journal_mode=self.journal_mode)
+            writer.open()
+            writer.start()
+            # Міграції стають у чергу першими, до записів інших потоків
+            migrated = writer.submit(migrate)
+            self.writer = writer
+        try:
+            migrated.result()
+        except Exception:
+            with self._lock:
+                self.writer = None
+            writer.stop()
+            raise
+        return writer
+    
+    def execute_write(self, func, wait=True):
+        """
+        Виконати запис func(cursor) у потоці запису.
+        wait=True - дочекатися коміту й повернути результат func;
+        wait=False - повернути Future (запис потрапить у найближчу пачку).
+        """
+        writer = self.writer or self.start_writer()
+        future = writer.submit(func)
+        return future.result() if wait else future
+    
+    def flush(self):
+        """Дочекатися, поки всі поставлені в чергу записи будуть закомічені"""
+        if self.writer is not None:
+            self.execute_write(lambda cursor: None)
+    
     def get_connection(self):
-        """Отримати з'єднання з БД для поточного потоку"""
-        if not hasattr(self.local_storage, 'connection'):
-            self.local_storage.connection = sqlite3.connect(self.db_path)
-            self.local_storage.cursor = self.local_storage.connection.cursor()
+        """Отримати з'єднання для читання для поточного потоку"""
+        if getattr(self.local_storage, 'generation', None) != self._generation:
+            # Таблиці створює потік запису, тому спочатку запускаємо його
+            if self.writer is None:
+                self.start_writer()
+            # check_same_thread=False - щоб close_all_connections міг закрити
+            # з'єднання інших потоків; кожен потік і далі користується лише своїм
+            connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            cursor = connection.cursor()
+            cursor.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
             # Увімкнути підтримку зовнішніх ключів
-            self.local_storage.cursor.execute("PRAGMA foreign_keys = ON")
+            cursor.execute("PRAGMA foreign_keys = ON")
             
-            # Створити таблиці, якщо потрібно
-            self.create_tables()
+            with self._lock:
+                self._connections.append(connection)
+            self.local_storage.connection = connection
+            self.local_storage.cursor = cursor
+            self.local_storage.generation = self._generation
             
         return self.local_storage.connection, self.local_storage.cursor
     
-    def create_tables(self):
-        """Створення таблиць, якщо їх немає"""
-        conn, cursor = self.get_connection()
-        
-        # Таблиця програм
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS programs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                category TEXT NOT NULL,
-                url TEXT NOT NULL,
-                current_version TEXT,
-                installed_version TEXT,
-                version_selector TEXT,
-                last_check TEXT,
-                check_interval INTEGER DEFAULT 24,
-                is_active INTEGER DEFAULT 1,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Таблиця історії версій
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS version_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                program_id INTEGER,
-                version TEXT,
-                check_date TEXT,
-                FOREIGN KEY (program_id) REFERENCES programs (id)
-            )
-        ''')
-        
-        conn.commit()
-    
     def add_program(self, name, category, url, installed_version="", selector="", is_active=1):
         """Додати нову програму до моніторингу"""
-        conn, cursor = self.get_connection()
+        def write(cursor):
+            cursor.execute('''
+                INSERT INTO programs (name, category, url, installed_version, version_selector, is_active)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (name, category, url, installed_version, selector, is_active))
+            return cursor.lastrowid
         
-        cursor.execute('''
-            INSERT INTO programs (name, category, url, installed_version, version_selector, is_active)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (name, category, url, installed_version, selector, is_active))
-        conn.commit()
-        return cursor.lastrowid
-    
-    def get_all_programs(self):
-        """Отримати всі програми"""
+        return self.execute_write(write)
+    
+    def get_all_programs(self, category=None):
+        """Отримати всі програми (за потреби - лише з однієї категорії)"""
         _, cursor = self.get_connection()
         
-        cursor.execute('''
-            SELECT * FROM programs ORDER BY name
-        ''')
-        return cursor.fetchall()
+        if category:
+            cursor.execute(f'''
+                SELECT {PROGRAM_COLUMNS} FROM programs WHERE category = ? ORDER BY name
+            ''', (category,))
+        else:
+            cursor.execute(f'''
+                SELECT {PROGRAM_COLUMNS} FROM programs ORDER BY name
+            ''')
+        return list(map(ProgramRecord._make, cursor.fetchall()))
     
-    def get_active_programs(self):
-        """Отримати всі активні програми"""
+    def get_active_programs(self, category=None):
+        """Отримати всі активні програми (за потреби - лише з однієї категорії)"""
         _, cursor = self.get_connection()
         
-        cursor.execute('''
-            SELECT * FROM programs WHERE is_active = 1
-        ''')
-        return cursor.fetchall()
+        if category:
+            cursor.execute(f'''
+                SELECT {PROGRAM_COLUMNS} FROM programs WHERE is_active = 1 AND category = ?
+            ''', (category,))
+        else:
+            cursor.execute(f'''
+                SELECT {PROGRAM_COLUMNS} FROM programs WHERE is_active = 1
+            ''')
+        return list(map(ProgramRecord._make, cursor.fetchall()))
     
+    def iter_programs(self, active_only=True, category=None, batch_size=500, columns=CHECK_FIELDS):
+        """
+        Програми по одній, сторінками по batch_size за первинним ключем
+        (WHERE id > останній ORDER BY id LIMIT), лише з колонками columns.
+        
+        У пам'яті - не більше однієї сторінки, а транзакція читання не
+        тримається між сторінками, тож запис у БД не чекає на перевірку.
+        """
+        unknown = set(columns) - set(PROGRAM_FIELDS)
+        if unknown:
+            raise ValueError(f"Невідомі колонки programs: {', '.join(sorted(unknown))}")
+        # id - перша колонка: ключ наступної сторінки
+        columns = ('id',) + tuple(column for column in columns if column != 'id')
+        make_record = record_factory(columns)
+        
+        conditions = ["id > ?"]
+        params = []
+        if active_only:
+            conditions.append("is_active = 1")
+        if category:
+            conditions.append("category = ?")
+            params.append(category)
+        query = f'''
+            SELECT {", ".join(columns)} FROM programs
+            WHERE {" AND ".join(conditions)} ORDER BY id LIMIT ?
+        '''
+        
+        last_id = 0
+        while True:
+            _, cursor = self.get_connection()
+            cursor.execute(query, (last_id, *params, batch_size))
+            rows = cursor.fetchall()
+            for row in rows:
+                yield make_record(row)
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+        
     def get_program_by_id(self, program_id):
         """Отримати програму за ID"""
         _, cursor = self.get_connection()
         
-        cursor.execute('SELECT * FROM programs WHERE id = ?', (program_id,))
-        return cursor.fetchone()
+        cursor.execute(f'SELECT {PROGRAM_COLUMNS} FROM programs WHERE id = ?', (program_id,))
+        row = cursor.fetchone()
+        return ProgramRecord._make(row) if row else None
     
     def update_program(self, program_id, name, category, url, installed_version, selector, is_active):
         """Оновити всі параметри програми"""
-        conn, cursor = self.get_connection()
+        def write(cursor):
+            cursor.execute('''
+                UPDATE programs 
+                SET name = ?, category = ?, url = ?, 
+                    installed_version = ?, version_selector = ?, is_active = ?,
+                    updated_at = ?
+                WHERE id = ?
+            ''', (name, category, url, installed_version, selector, is_active,
+                  datetime.now().strftime("%Y-%m-%d %H:%M:%S"), program_id))
+            return True
         
-        cursor.execute('''
-            UPDATE programs 
-            SET name = ?, category = ?, url = ?, 
-                installed_version = ?, version_selector = ?, is_active = ?,
-                updated_at = ?
-            WHERE id = ?
-        ''', (name, category, url, installed_version, selector, is_active,
-              datetime.now().strftime("%Y-%m-%d %H:%M:%S"), program_id))
-        conn.commit()
-        return True
-    
-    def update_version(self, program_id, new_version):
-        """Оновити версію програми"""
-        conn, cursor = self.get_connection()
+        return self.execute_write(write)
+    
+    def update_version(self, program_id, new_version, wait=True, checked_at=None):
+        """Оновити версію програми (checked_at - рядок дати, за замовчуванням зараз)"""
+        now = checked_at or datetime.now().strftime(DATE_FORMAT)
         
-        cursor.execute('''
-            UPDATE programs 
-            SET current_version = ?, last_check = ?, updated_at = ?
-            WHERE id = ?
-        ''', (new_version, 
-              datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-              datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 
-              program_id))
-        
-        # Додаємо запис в історію
-        cursor.execute('''
-            INSERT INTO version_history (program_id, version, check_date)
-            VALUES (?, ?, ?)
-        ''', (program_id, new_version, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        def write(cursor):
+            cursor.execute('''
+                UPDATE programs 
+                SET current_version = ?, last_check = ?, updated_at = ?
+                WHERE id = ?
+            ''', (new_version, now, now, program_id))
+            
+            # Додаємо запис в історію
+            cursor.execute('''
+                INSERT INTO version_history (program_id, version, check_date)
+                VALUES (?, ?, ?)
+            ''', (program_id, new_version, now))
         
-        conn.commit()
+        return self.execute_write(write, wait)
     
-    def update_installed_version(self, program_id, installed_version):
+    def update_installed_version(self, program_id, installed_version, wait=True):
         """Оновити встановлену версію"""
-        conn, cursor = self.get_connection()
+        def write(cursor):
+            cursor.execute('''
+                UPDATE programs 
+                SET installed_version = ?, updated_at = ?
+                WHERE id = ?
+            ''', (installed_version, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), program_id))
         
-        cursor.execute('''
-            UPDATE programs 
-            SET installed_version = ?, updated_at = ?
-            WHERE id = ?
-        ''', (installed_version, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), program_id))
-        conn.commit()
+        return self.execute_write(write, wait)
     
-    def set_program_active(self, program_id, is_active):
+    def set_program_active(self, program_id, is_active, wait=True):
         """Змінити статус активності програми"""
-        conn, cursor = self.get_connection()
+        def write(cursor):
+            cursor.execute('''
+                UPDATE programs 
+                SET is_active = ?, updated_at = ?
+                WHERE id = ?
+            ''', (is_active, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), program_id))
         
-        cursor.execute('''
-            UPDATE programs 
-            SET is_active = ?, updated_at = ?
-            WHERE id = ?
-        ''', (is_active, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), program_id))
-        conn.commit()
+        return self.execute_write(write, wait)
     
-    def update_last_check(self, program_id):
+    def update_last_check(self, program_id, wait=True, checked_at=None):
         """Оновити час останньої перевірки"""
-        conn, cursor = self.get_connection()
+        now = checked_at or datetime.now().strftime(DATE_FORMAT)
+        
+        def write(cursor):
+            cursor.execute('''
+                UPDATE programs 
+                SET last_check = ?, updated_at = ?
+                WHERE id = ?
+            ''', (now, now, program_id))
+        
+        return self.execute_write(write, wait)
+    
+    def get_http_cache(self, url, selector=""):
+        """Отримати збережені валідатори для URL: (etag, last_modified, version)"""
+        _, cursor = self.get_connection()
         
         cursor.execute('''
-            UPDATE programs 
-            SET last_check = ?, updated_at = ?
-            WHERE id = ?
-        ''', (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 
-              datetime.now().strftime("%Y-%m-%d %H:%M:%S"), program_id))
-        conn.commit()
-    
-      # Таблиця історії версій з CASCADE
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS version_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                program_id INTEGER,
-                version TEXT,
-                check_date TEXT,
-                FOREIGN KEY (program_id) REFERENCES programs (id) ON DELETE CASCADE
-            )
-        ''')
-        
-        conn.commit()
-        
-        # Створюємо індекси
+            SELECT etag, last_modified, version FROM http_cache
+            WHERE url = ? AND selector = ?
+        ''', (url, selector or ""))
+        return cursor.fetchone()
+    
+    def get_http_cache_entries(self, url):
+        """Валідатори URL для всіх селекторів: {selector: (etag, last_modified, version)}"""
+        _, cursor = self.get_connection()
+        
         cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_version_history_program_id 
-            ON version_history (program_id)
-        ''')
+            SELECT selector, etag, last_modified, version FROM http_cache
+            WHERE url = ?
+        ''', (url,))
+        return {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+    
+    def save_http_cache(self, url, selector, etag, last_modified, version, wait=True):
+        """Зберегти валідатори відповіді та знайдену версію"""
+        def write(cursor):
+            cursor.execute('''
+                INSERT OR REPLACE INTO http_cache (url, selector, etag, last_modified, version, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (url, selector or "", etag, last_modified, version,
+                  datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        
+        return self.execute_write(write, wait)
+    
+    def save_check_run(self, run_id, trace, status, error=None, wait=True):
+        """Зберегти вимірювання однієї перевірки (metrics.CheckTrace)"""
+        phases = trace.phases
+        
+        def write(cursor):
+            cursor.execute('''
+                INSERT INTO check_runs (run_id, program_id, host, checked_at, status, http_status,
+                                        cache_hit, extractor, bytes, request_ms, download_ms,
+                                        parse_ms, extract_ms, total_ms, error)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (run_id, trace.program_id, trace.host, datetime.now().strftime(DATE_FORMAT),
+                  status, trace.http_status, int(trace.cache_hit), trace.extractor, trace.bytes,
+                  phases['request'], phases['download'], phases['parse'], phases['extract'],
+                  trace.total_ms, error))
+        
+        return self.execute_write(write, wait)
+    
+    def prune_check_runs(self, keep_days, wait=True):
+        """Видалити вимірювання, старші за keep_days днів"""
+        def write(cursor):
+            cursor.execute('''
+                DELETE FROM check_runs WHERE checked_at < datetime('now', 'localtime', ?)
+            ''', (f"-{int(keep_days)} days",))
+        
+        return self.execute_write(write, wait)
+    
+    def get_check_run_summary(self, run_id=None, runs=10, limit=10):
+        """
+        Підсумок вимірювань за запуском run_id або за останніми runs запусками:
+        {'runs': [...], 'phases': {...}, 'hosts': [...], 'programs': [...]}
+        """
+        _, cursor = self.get_connection()
+        
+        if run_id:
+            run_ids = [run_id]
+        else:
+            cursor.execute('''
+                SELECT run_id FROM check_runs GROUP BY run_id ORDER BY MAX(id) DESC LIMIT ?
+            ''', (runs,))
+            run_ids = [row[0] for row in cursor.fetchall()]
+        summary = {'runs': run_ids, 'phases': dict.fromkeys(PHASES, 0.0), 'hosts': [], 'programs': []}
+        if not run_ids:
+            return summary
+        
+        placeholders = ", ".join("?" * len(run_ids))
+        cursor.execute(f'''
+            SELECT {", ".join(f"COALESCE(SUM({name}_ms), 0)" for name in PHASES)}
+            FROM check_runs WHERE run_id IN ({placeholders})
+        ''', run_ids)
+        summary['phases'] = dict(zip(PHASES, cursor.fetchone()))
+        
+        cursor.execute(f'''
+            SELECT host, COUNT(*), AVG(total_ms), MAX(total_ms),
+                   SUM(status = 'error'), SUM(cache_hit), SUM(bytes)
+            FROM check_runs WHERE run_id IN ({placeholders})
+            GROUP BY host ORDER BY AVG(total_ms) DESC LIMIT ?
+        ''', run_ids + [limit])
+        summary['hosts'] = [
+            dict(zip(('host', 'checks', 'avg_ms', 'max_ms', 'errors', 'cache_hits', 'bytes'), row))
+            for row in cursor.fetchall()
+        ]
         
-        conn.commit()
+        # Екстрактор та HTTP-статус - з останньої перевірки програми
+        cursor.execute(f'''
+            SELECT g.program_id, p.name, g.host, g.checks, g.avg_ms,
+                   {", ".join(f"g.{name}_ms" for name in PHASES)},
+                   last.extractor, last.http_status
+            FROM (
+                SELECT program_id, host, COUNT(*) AS checks, AVG(total_ms) AS avg_ms,
+                       {", ".join(f"AVG({name}_ms) AS {name}_ms" for name in PHASES)},
+                       MAX(id) AS last_id
+                FROM check_runs WHERE run_id IN ({placeholders})
+                GROUP BY program_id
+            ) g
+            JOIN check_runs last ON last.id = g.last_id
+            LEFT JOIN programs p ON p.id = g.program_id
+            ORDER BY g.avg_ms DESC LIMIT ?
+        ''', run_ids + [limit])
+        keys = ('program_id', 'name', 'host', 'checks', 'avg_ms') + \
+            tuple(f"{name}_ms" for name in PHASES) + ('extractor', 'http_status')
+        summary['programs'] = [dict(zip(keys, row)) for row in cursor.fetchall()]
+        return summary
     
     def delete_program(self, program_id):
         """Видалити програму"""
-        conn, cursor = self.get_connection()
-        
-        try:
+        def write(cursor):
             # Спочатку видаляємо історію версій
             cursor.execute('DELETE FROM version_history WHERE program_id = ?', (program_id,))
             # Потім видаляємо програму
             cursor.execute('DELETE FROM programs WHERE id = ?', (program_id,))
-            conn.commit()
             return True
+        
+        try:
+            return self.execute_write(write)
         except Exception as e:
             print(f"❌ Помилка при видаленні програми {program_id}: {e}")
-            conn.rollback()
-            # Альтернативний спосіб: спробуємо без foreign key
-            try:
-                # Тимчасово вимкнути foreign keys
-                cursor.execute("PRAGMA foreign_keys = OFF")
-                cursor.execute('DELETE FROM version_history WHERE program_id = ?', (program_id,))
-                cursor.execute('DELETE FROM programs WHERE id = ?', (program_id,))
-                cursor.execute("PRAGMA foreign_keys = ON")
-                conn.commit()
-                return True
-            except Exception as e2:
-                print(f"❌ Критична помилка при видаленні: {e2}")
-                return False
+            return False
     
     def close_all_connections(self):
-        """Закрити всі з'єднання з БД"""
-        if hasattr(self.local_storage, 'connection'):
-            self.local_storage.connection.close()
-            del self.local_storage.connection
-            del self.local_storage.cursor
+        """Дописати чергу запису та закрити всі з'єднання з БД"""
+        with self._lock:
+            writer, self.writer = self.writer, None
+        if writer is not None:
+            writer.stop()
+        
+        with self._lock:
+            connections, self._connections = self._connections, []
+            # З'єднання інших потоків стають недійсними - при наступному
+            # зверненні вони відкриють нові
+            self._generation += 1
+        for connection in connections:
+            try:
+                connection.close()
+            except sqlite3.Error:
+                pass
+        
+        for name in ('connection', 'cursor', 'generation'):
+            if hasattr(self.local_storage, name):
+                delattr(self.local_storage, name)
 
 # Для тестування
 if __name__ == "__main__":
@@ -246,7 +599,7 @@ if __name__ == "__main__":
         
         print("✅ Додані тестові програми:")
         for program in db.get_all_programs():
-            print(f"ID: {program[0]}, Назва: {program[1]}")
+            print(f"ID: {program.id}, Назва: {program.name}")
         
     except Exception as e:
         print(f"❌ Помилка: {e}")
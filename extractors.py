@@ -0,0 +1,412 @@
+"""
+Реєстр екстракторів версій за хостом сайту.
+
+Екстрактор знає, як для свого сайту отримати сторінку (або API) і знайти
+в ній версію: GitHub, Docker Hub та PyPI перевіряються через JSON API,
+Grandstream - за таблицею прошивок. Реєстр вибирає екстрактор за хостом URL програми звичайним
+пошуком у словнику: спочатку повний хост, потім без першої мітки
+("www.grandstream.com" -> "grandstream.com" -> "com"). Якщо для сайту
+нічого не зареєстровано, використовується загальний розбір HTML.
+
+Спеціальний екстрактор береться лише для програм, які він розуміє
+(handles); якщо він не зміг визначити версію і fallback = True, програма
+перевіряється ще й загальним розбором HTML.
+
+resource - адреса, яку завантажує перевірка програми: програми з однаковою
+адресою в межах перевірки отримують один спільний запит (див. coalescing.py).
+"""
+
+import os
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+from metrics import current_trace
+from resilience import RateLimited, rate_limit_reset
+
+
+def host_of(url):
+    """Хост URL без порту, користувача та крапки в кінці"""
+    return (urlparse(url or "").hostname or "").rstrip('.')
+
+
+class Extractor:
+    """Базовий екстрактор; hosts - домени, для яких він зареєстрований"""
+    name = None
+    hosts = ()
+    fallback = True  # чи перевіряти розбором HTML, якщо версію не знайдено
+
+    def handles(self, program):
+        """Чи підходить екстрактор для цієї програми"""
+        return True
+
+    def resource(self, program):
+        """Адреса, яку завантажує перевірка програми; None - без об'єднання запитів"""
+        return None
+
+    def begin_run(self):
+        """Нова перевірка: забути дані попередньої"""
+
+    def prefetch(self, parser, programs):
+        """Підготуватися до перевірки програм (пакетний запит), якщо API дозволяє"""
+
+    def fetch_version(self, parser, program):
+        """Версія програми (ProgramRecord) або None"""
+        raise NotImplementedError
+
+
+class HtmlExtractor(Extractor):
+    """Загальний розбір HTML: селектор або пошук у тексті сторінки"""
+    name = 'html'
+
+    def resource(self, program):
+        return program.url
+
+    def fetch_version(self, parser, program):
+        return parser.get_version_from_website(program.url, program.version_selector)
+
+
+class GrandstreamExtractor(Extractor):
+    """Прошивка моделі з назви програми за таблицею прошивок Grandstream"""
+    name = 'grandstream'
+    hosts = ('grandstream.com',)
+    # Сторінка прошивок містить версії всіх моделей - загальний розбір
+    # повернув би чужу прошивку
+    fallback = False
+    MODEL_PATTERN = re.compile(r'Grandstream\s+([A-Z0-9]+(?:\s+v\d+)?)')
+
+    def handles(self, program):
+        # Без моделі в назві - звичайна сторінка на сайті Grandstream
+        return self.MODEL_PATTERN.search(program.name or "") is not None
+
+    def fetch_version(self, parser, program):
+        model = self.MODEL_PATTERN.search(program.name or "").group(1)
+        return parser.get_grandstream_version(model)
+
+
+class JsonApiExtractor(Extractor):
+    """
+    Екстрактор JSON API: кеш ETag через conditional_get та ліміти запитів.
+
+    Після відповіді з вичерпаним лімітом (429, 403 з X-RateLimit-Remaining: 0)
+    запити до API не надсилаються до часу скидання, а перевірки програм
+    завершуються RateLimited - їх треба відкласти, а не рахувати невдалими.
+    """
+    api_url = None
+
+    def __init__(self, api_url=None):
+        self.api_url = (api_url or self.api_url).rstrip('/')
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0
+
+    def check_blocked(self):
+        with self._lock:
+            if self._blocked_until > time.time():
+                raise RateLimited(host_of(self.api_url), self._blocked_until)
+
+    def note_rate_limit(self, response):
+        """Запам'ятати скидання ліміту; для відмови через ліміт - RateLimited"""
+        reset = rate_limit_reset(response)
+        if reset is None:
+            return
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, reset)
+        if response.status_code in (403, 429):
+            raise RateLimited(host_of(self.api_url), reset)
+
+    def headers(self, parser):
+        return {'Accept': 'application/json'}
+
+    def get_json(self, parser, url):
+        """
+        GET JSON з кешем валідаторів.
+        Повертає (response, data, cached_version); data = None, якщо сервер
+        відповів 304 або помилкою.
+        """
+        self.check_blocked()
+        trace = current_trace()
+        with trace.phase('request'):
+            response, cached_version = parser.conditional_get(url, timeout=10, headers=self.headers(parser))
+        trace.http_status = response.status_code
+        self.note_rate_limit(response)
+        if cached_version:
+            trace.cache_hit = True
+            trace.extractor = 'http_cache'
+            return response, None, cached_version
+        if response.status_code != 200:
+            return response, None, None
+        with trace.phase('download'):
+            data = response.json()
+        trace.bytes = len(response.content)
+        return response, data, None
+
+    def fetch_json_version(self, parser, url, version_of):
+        """Версія з JSON за url (один запит на всі програми перевірки з цим url)"""
+        version, loaded = parser.coalesce(url, lambda: self.load_json_version(parser, url, version_of))
+        if not loaded:
+            trace = current_trace()
+            trace.cache_hit = True
+            trace.extractor = self.name if version else None
+        return version
+
+    def load_json_version(self, parser, url, version_of):
+        """Версія з JSON за url: version_of(data) -> версія або None"""
+        response, data, cached_version = self.get_json(parser, url)
+        if cached_version or data is None:
+            return cached_version
+        with current_trace().phase('extract'):
+            version = version_of(data)
+        if version:
+            current_trace().extractor = self.name
+            parser.remember_validators(url, None, response, version)
+        return version
+
+
+class GitHubExtractor(JsonApiExtractor):
+    """
+    Останній випуск репозиторію GitHub.
+
+    З токеном (checking.github_token або змінна GITHUB_TOKEN) усі
+    репозиторії перевірки запитуються одним GraphQL-запитом на кожні
+    GRAPHQL_BATCH штук (prefetch). Без токена - REST releases/latest
+    для кожного репозиторію з ETag: відповіді 304 не витрачають ліміт.
+    """
+    name = 'github'
+    hosts = ('github.com', 'www.github.com')
+    api_url = 'https://api.github.com'
+    GRAPHQL_BATCH = 50
+
+    def __init__(self, api_url=None):
+        super().__init__(api_url)
+        self._prefetched = {}  # 'owner/repo' (нижній регістр) -> тег або None
+
+    @staticmethod
+    def repository(url):
+        """'owner/repo' з URL репозиторію (або його сторінки) або None"""
+        parts = [part for part in urlparse(url).path.split('/') if part]
+        return f"{parts[0]}/{parts[1]}" if len(parts) >= 2 else None
+
+    def handles(self, program):
+        return self.repository(program.url) is not None
+
+    @staticmethod
+    def token(parser):
+        return parser.config.get('checking', {}).get('github_token') or os.environ.get('GITHUB_TOKEN')
+
+    def headers(self, parser):
+        headers = {'Accept': 'application/vnd.github+json'}
+        token = self.token(parser)
+        if token:
+            headers['Authorization'] = f"Bearer {token}"
+        return headers
+
+    def begin_run(self):
+        self._prefetched = {}
+
+    def prefetch(self, parser, programs):
+        """
+        Запитати останні випуски репозиторіїв пачками через GraphQL.
+        Перевірка викликає prefetch для кожної прочитаної частини програм.
+        """
+        if not self.token(parser):
+            return
+        repositories = sorted({self.repository(program.url).lower() for program in programs}
+                              - self._prefetched.keys())
+        for start in range(0, len(repositories), self.GRAPHQL_BATCH):
+            batch = repositories[start:start + self.GRAPHQL_BATCH]
+            self._prefetched.update(self.query_latest_releases(parser, batch))
+
+    def query_latest_releases(self, parser, repositories):
+        """{'owner/repo': тег або None} для пачки репозиторіїв одним запитом"""
+        self.check_blocked()
+        params = []
+        fields = []
+        variables = {}
+        for index, repository in enumerate(repositories):
+            owner, name = repository.split('/', 1)
+            params.append(f"$o{index}: String!, $n{index}: String!")
+            fields.append(f"r{index}: repository(owner: $o{index}, name: $n{index}) "
+                          f"{{ latestRelease {{ tagName }} }}")
+            variables[f"o{index}"] = owner
+            variables[f"n{index}"] = name
+        query = f"query({', '.join(params)}) {{ {' '.join(fields)} }}"
+
+        response = parser.fetcher.post(f"{self.api_url}/graphql", timeout=30, headers=self.headers(parser),
+                                       json={'query': query, 'variables': variables})
+        self.note_rate_limit(response)
+        response.raise_for_status()
+        payload = response.json()
+        if any(error.get('type') == 'RATE_LIMITED' for error in payload.get('errors') or ()):
+            raise RateLimited(host_of(self.api_url), rate_limit_reset(response) or time.time() + 3600)
+
+        data = payload.get('data') or {}
+        releases = {}
+        for index, repository in enumerate(repositories):
+            node = data.get(f"r{index}")
+            # Репозиторій не знайдено (помилка NOT_FOUND) - перевіримо через REST
+            if node is not None:
+                releases[repository] = (node.get('latestRelease') or {}).get('tagName')
+        print(f"📦 GitHub GraphQL: {len(releases)} з {len(repositories)} репозиторіїв одним запитом")
+        return releases
+
+    def resource(self, program):
+        return f"{self.api_url}/repos/{self.repository(program.url)}/releases/latest"
+
+    def fetch_version(self, parser, program):
+        repository = self.repository(program.url)
+        if repository.lower() in self._prefetched:
+            tag = self._prefetched[repository.lower()]
+            with current_trace().phase('extract'):
+                version = parser.extract_version_from_text(tag or "")
+            if version:
+                current_trace().extractor = 'github_graphql'
+            return version
+        return self.fetch_json_version(
+            parser, self.resource(program),
+            lambda data: parser.extract_version_from_text(data.get('tag_name') or ""))
+
+
+# Тег випуску: "1.25.3", "v2.0" (без "latest", "1.25-alpine" тощо)
+RELEASE_TAG = re.compile(r'v?(\d+(?:\.\d+)+)')
+
+
+def best_release_tag(tags):
+    """Найвища версія серед тегів-випусків або None"""
+    versions = [match.group(1) for match in map(RELEASE_TAG.fullmatch, tags) if match]
+    if not versions:
+        return None
+    return max(versions, key=lambda version: tuple(int(part) for part in version.split('.')))
+
+
+class DockerHubExtractor(JsonApiExtractor):
+    """
+    Найвищий тег-випуск образу через API Docker Hub.
+
+    Теги читаються однією сторінкою (останні оновлені), тому запит на
+    образ один; пакетних запитів API не має.
+    """
+    name = 'dockerhub'
+    hosts = ('hub.docker.com',)
+    api_url = 'https://hub.docker.com'
+
+    @staticmethod
+    def repository(url):
+        """'namespace/repo': /_/nginx -> library/nginx, /r/bitnami/redis/tags -> bitnami/redis"""
+        parts = [part for part in urlparse(url).path.split('/') if part]
+        if len(parts) >= 2 and parts[0] == '_':
+            return f"library/{parts[1]}"
+        if len(parts) >= 3 and parts[0] in ('r', 'repository'):
+            return f"{parts[1]}/{parts[2]}"
+        return None
+
+    def handles(self, program):
+        return self.repository(program.url) is not None
+
+    def resource(self, program):
+        return (f"{self.api_url}/v2/repositories/{self.repository(program.url)}/tags"
+                f"?page_size=100&ordering=last_updated")
+
+    def fetch_version(self, parser, program):
+        return self.fetch_json_version(
+            parser, self.resource(program), lambda data: best_release_tag(tag.get('name', '') for tag in data.get('results') or ()))
+
+
+class PyPIExtractor(JsonApiExtractor):
+    """Поточна версія пакета з JSON API PyPI (пакетних запитів API не має)"""
+    name = 'pypi'
+    hosts = ('pypi.org', 'pypi.python.org')
+    api_url = 'https://pypi.org'
+
+    @staticmethod
+    def project(url):
+        """Назва пакета з /project/<назва>/ або /pypi/<назва>/"""
+        parts = [part for part in urlparse(url).path.split('/') if part]
+        if len(parts) >= 2 and parts[0] in ('project', 'pypi'):
+            return parts[1]
+        return None
+
+    def handles(self, program):
+        return self.project(program.url) is not None
+
+    def resource(self, program):
+        return f"{self.api_url}/pypi/{self.project(program.url)}/json"
+
+    def fetch_version(self, parser, program):
+        return self.fetch_json_version(
+            parser, self.resource(program),
+            lambda data: (data.get('info') or {}).get('version'))
+
+
+class ExtractorRegistry:
+    """Екстрактори за хостом; default - для сайтів без спеціального екстрактора"""
+
+    def __init__(self, default=None):
+        self.default = default or HtmlExtractor()
+        self._by_host = {}
+
+    def register(self, extractor):
+        for host in extractor.hosts:
+            self._by_host[host.lower()] = extractor
+        return extractor
+
+    def resolve(self, url):
+        """Екстрактор для URL: найдовший зареєстрований суфікс хоста"""
+        host = host_of(url)
+        while host:
+            extractor = self._by_host.get(host)
+            if extractor is not None:
+                return extractor
+            host = host.partition('.')[2]
+        return self.default
+
+    def extractor_for(self, program):
+        extractor = self.resolve(program.url)
+        return extractor if extractor.handles(program) else self.default
+
+    def resource_for(self, program):
+        """Адреса, яку завантажить перевірка програми (для об'єднання запитів)"""
+        return self.extractor_for(program).resource(program)
+
+    def begin_run(self):
+        for extractor in {self.default, *self._by_host.values()}:
+            extractor.begin_run()
+
+    def prefetch(self, parser, programs):
+        """Пакетні запити екстракторів, що їх підтримують, перед перевіркою"""
+        groups = {}
+        for program in programs:
+            extractor = self.extractor_for(program)
+            if extractor is not self.default:
+                groups.setdefault(extractor, []).append(program)
+        for extractor, group in groups.items():
+            try:
+                extractor.prefetch(parser, group)
+            except Exception as e:
+                # Програми перевіряться поодинці (або отримають RateLimited)
+                print(f"⚠️ Пакетний запит {extractor.name}: {e}")
+
+    def fetch_version(self, parser, program):
+        """Перевірити програму її екстрактором (за потреби - з відкатом на HTML)"""
+        extractor = self.extractor_for(program)
+        if extractor is self.default:
+            return extractor.fetch_version(parser, program)
+        try:
+            version = extractor.fetch_version(parser, program)
+        except RateLimited:
+            # Сторінку теж не розбираємо: програму буде перевірено пізніше
+            raise
+        except Exception as e:
+            print(f"⚠️ Екстрактор {extractor.name} для {program.url}: {e}")
+            version = None
+        if version or not extractor.fallback:
+            return version
+        return self.default.fetch_version(parser, program)
+
+
+def default_registry():
+    """Реєстр із вбудованими екстракторами"""
+    registry = ExtractorRegistry()
+    for extractor in (GrandstreamExtractor(), GitHubExtractor(), DockerHubExtractor(), PyPIExtractor()):
+        registry.register(extractor)
+    return registry
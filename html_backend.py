@@ -0,0 +1,163 @@
+"""
+Бекенди розбору HTML для VersionParser.
+
+Підтримуються (від найшвидшого): selectolax (lexbor), lxml, html.parser.
+Бекенд обирається в config.json ("parsing" -> "html_backend"). Якщо обраний
+бекенд не встановлено, використовується наступний доступний, аж до
+вбудованого html.parser.
+"""
+
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+        HAS_SELECTOLAX = True
+    except ImportError:
+        HAS_SELECTOLAX = False
+
+# Перший складений селектор: tag, #id, .class та їх комбінації ("div#main.version")
+SIMPLE_COMPOUND = re.compile(r'^([a-zA-Z][\w-]*)?((?:[#.][\w-]+)*)$')
+
+
+class SoupDocument:
+    """Повністю розібраний документ BeautifulSoup"""
+
+    def __init__(self, soup):
+        self.soup = soup
+
+    def select_text(self, selector):
+        element = self.soup.select_one(selector)
+        return element.get_text(strip=True) if element else None
+
+    def page_text(self):
+        return self.soup.get_text()
+
+
+class BeautifulSoupBackend:
+    """BeautifulSoup з парсером html.parser або lxml"""
+
+    # Скоупінг розбору може пропустити елемент, тоді селектор варто
+    # повторити на повному дереві
+    scoped = True
+
+    def __init__(self, features='html.parser'):
+        self.name = features
+        self.features = features
+
+    def make_soup(self, html, parse_only=None):
+        return BeautifulSoup(html, self.features, parse_only=parse_only)
+
+    def parse(self, html):
+        return SoupDocument(self.make_soup(html))
+
+    @staticmethod
+    def strainer_for(selector):
+        """
+        SoupStrainer для першого складеного селектора або None.
+
+        Розбираються лише елементи, що відповідають першій частині селектора,
+        разом з нащадками, тому нащадкові (".a .b") та дочірні (".a > .b")
+        комбінатори працюють. Групи, сусідні комбінатори та псевдокласи
+        залежать від решти дерева - для них повертається None.
+        """
+        if any(char in selector for char in ',+~:['):
+            return None
+        first = re.split(r'\s*>\s*|\s+', selector.strip())[0]
+        match = SIMPLE_COMPOUND.match(first)
+        if not match or not first:
+            return None
+        name, qualifiers = match.groups()
+        if name and name.lower() in ('html', 'body'):
+            return None
+
+        attrs = {}
+        for prefix, value in re.findall(r'([#.])([\w-]+)', qualifiers):
+            if prefix == '#':
+                attrs['id'] = value
+            elif 'class' not in attrs:
+                # Під час розбору class ще рядок ("a b"), тому перевіряємо
+                # входження класу; решту класів перевірить select_one
+                attrs['class'] = lambda classes, value=value: bool(classes) and value in (
+                    classes.split() if isinstance(classes, str) else classes)
+        return SoupStrainer(name or True, attrs=attrs)
+
+    def select_text(self, html, selector):
+        """Текст першого елемента за селектором (розбір лише потрібної частини)"""
+        strainer = self.strainer_for(selector)
+        return SoupDocument(self.make_soup(html, parse_only=strainer)).select_text(selector)
+
+
+class SelectolaxDocument:
+    """Документ, розібраний selectolax"""
+
+    def __init__(self, tree):
+        self.tree = tree
+
+    def select_text(self, selector):
+        node = self.tree.css_first(selector)
+        return node.text(strip=True) if node else None
+
+    def page_text(self):
+        # Як і BeautifulSoup.get_text(), без вмісту скриптів і стилів (текст
+        # <noscript> лишається). strip_tags змінює дерево, тому - на копії:
+        # селектори після page_text() бачать документ повністю
+        tree = self.tree.clone()
+        tree.strip_tags(['script', 'style'])
+        return tree.root.text() if tree.root else ''
+
+
+class SelectolaxBackend:
+    """selectolax: дерево будується на C, CSS-селектори виконуються там само"""
+
+    name = 'selectolax'
+    scoped = False
+
+    def __init__(self):
+        # Для коду, якому потрібен саме BeautifulSoup (таблиці Grandstream тощо)
+        self.soup_backend = BeautifulSoupBackend('lxml' if HAS_LXML else 'html.parser')
+
+    def make_soup(self, html, parse_only=None):
+        return self.soup_backend.make_soup(html, parse_only)
+
+    def parse(self, html):
+        return SelectolaxDocument(SelectolaxParser(html))
+
+    def select_text(self, html, selector):
+        return self.parse(html).select_text(selector)
+
+
+def available_backends():
+    """Назви встановлених бекендів, від найшвидшого"""
+    names = []
+    if HAS_SELECTOLAX:
+        names.append('selectolax')
+    if HAS_LXML:
+        names.append('lxml')
+    names.append('html.parser')
+    return names
+
+
+def get_backend(name='auto'):
+    """Створити бекенд за назвою, з відкатом на доступний"""
+    available = available_backends()
+    if not name or name == 'auto':
+        name = available[0]
+    elif name not in available:
+        fallback = 'lxml' if name == 'selectolax' and HAS_LXML else 'html.parser'
+        print(f"⚠️ HTML-бекенд '{name}' не встановлено, використовую '{fallback}'")
+        name = fallback
+
+    if name == 'selectolax':
+        return SelectolaxBackend()
+    return BeautifulSoupBackend(name)
@@ -7,6 +7,7 @@ LAUNCHER для Version Checker
 
 import sys
 import os
+import multiprocessing
 import traceback
 from datetime import datetime
 
@@ -58,25 +59,8 @@ def setup_data_files(base_path, is_frozen):
 
 def create_default_config():
     """Створити конфігураційний файл за замовчуванням"""
-    default_config = {
-        "database": {
-            "name": "versions.db",
-            "backup_folder": "backups",
-            "auto_backup": True,
-            "backup_interval_days": 7
-        },
-        "checking": {
-            "auto_check_interval_minutes": 1440,
-            "retry_attempts": 3,
-            "timeout_seconds": 30,
-            "delay_between_checks": 2
-        },
-        "appearance": {
-            "theme": "default",
-            "font_size": 12,
-            "show_notifications": True
-        }
-    }
+    from config import DEFAULT_CONFIG
+    default_config = DEFAULT_CONFIG
     
     import json
     with open('config.json', 'w', encoding='utf-8') as f:
@@ -117,6 +101,11 @@ def handle_exception(exc_type, exc_value, exc_traceback):
 def main():
     """Головна функція запускача"""
     
+    # Консольний режим: без PyQt5, без діалогів та очікування Enter
+    if len(sys.argv) > 1:
+        from cli import run_cli
+        sys.exit(run_cli(sys.argv[1:]))
+    
     # Налаштовуємо обробник винятків
     sys.excepthook = handle_exception
     
@@ -167,4 +156,6 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Процеси розбору HTML (parse_worker) в EXE запускають цей самий файл
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
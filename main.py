@@ -6,26 +6,36 @@ os.environ["QT_LOGGING_RULES"] = "qt5ct.debug=false"  # Вимкнути дея
 
 import json
 import re
+import time
 from datetime import datetime
 import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                             QHBoxLayout, QTableWidget, QTableWidgetItem, 
+                             QHBoxLayout, QTableView, QAbstractItemView,
                              QPushButton, QLabel, QLineEdit, QTextEdit,
                              QComboBox, QMessageBox, QGroupBox, QFormLayout,
                              QHeaderView, QTabWidget, QInputDialog, QDialog,
-                             QDialogButtonBox)
+                             QDialogButtonBox, QFileDialog)
 from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
-from PyQt5.QtGui import QIcon, QColor
+from PyQt5.QtGui import QIcon
 from database import Database
-from parser import VersionParser
+import catalog_io
+from backup import BackupManager
+from checker import CheckEngine, VersionChecker
+from config import load_config
+from metrics import format_summary
+from program_model import ProgramTableModel, COL_NAME
+from repository import ProgramRepository
+from scheduler import CheckScheduler
+import parse_worker
+from work_queue import PRIORITY_NOW, WorkQueue, check_leased
 
 class EditProgramDialog(QDialog):
     """Діалогове вікно для редагування всіх параметрів програми"""
     def __init__(self, parent=None, program_data=None):
         super().__init__(parent)
         self.parent = parent
-        self.program_data = program_data  # (id, name, category, url, current_version, installed_version, selector, last_check)
+        self.program_data = program_data  # ProgramRecord
         self.init_ui()
         
     def init_ui(self):
@@ -41,7 +51,7 @@ class EditProgramDialog(QDialog):
         # Назва програми
         self.name_input = QLineEdit()
         if self.program_data:
-            self.name_input.setText(self.program_data[1])
+            self.name_input.setText(self.program_data.name)
         self.name_input.setPlaceholderText("Наприклад: Grandstream GXP1625")
         form_layout.addRow("Назва програми:", self.name_input)
         
@@ -56,7 +66,7 @@ class EditProgramDialog(QDialog):
             "Інше"
         ])
         if self.program_data:
-            index = self.category_combo.findText(self.program_data[2])
+            index = self.category_combo.findText(self.program_data.category)
             if index >= 0:
                 self.category_combo.setCurrentIndex(index)
         form_layout.addRow("Категорія:", self.category_combo)
@@ -64,40 +74,42 @@ class EditProgramDialog(QDialog):
         # URL
         self.url_input = QLineEdit()
         if self.program_data:
-            self.url_input.setText(self.program_data[3])
+            self.url_input.setText(self.program_data.url)
         self.url_input.setPlaceholderText("https://приклад.com/завантаження")
         form_layout.addRow("URL сторінки завантаження:", self.url_input)
         
         # Поточна версія (тільки для перегляду)
         current_version_label = QLabel()
         if self.program_data:
-            current_version_label.setText(self.program_data[4] or "Не перевірено")
+            current_version_label.setText(self.program_data.current_version or "Не перевірено")
         form_layout.addRow("Поточна версія (автоматично):", current_version_label)
         
         # Встановлена версія
         self.installed_version_input = QLineEdit()
         if self.program_data:
-            self.installed_version_input.setText(self.program_data[5] or "")
+            self.installed_version_input.setText(self.program_data.installed_version or "")
         self.installed_version_input.setPlaceholderText("Наприклад: 1.2.3")
         form_layout.addRow("Встановлена версія:", self.installed_version_input)
         
         # Селектор
         self.selector_input = QLineEdit()
         if self.program_data:
-            self.selector_input.setText(self.program_data[6] or "")
+            self.selector_input.setText(self.program_data.version_selector or "")
         self.selector_input.setPlaceholderText("CSS селектор (необов'язково)")
         form_layout.addRow("Селектор версії:", self.selector_input)
         
         # Остання перевірка (тільки для перегляду)
         last_check_label = QLabel()
         if self.program_data:
-            last_check = self.program_data[7] or "Ніколи"
+            last_check = self.program_data.last_check or "Ніколи"
             last_check_label.setText(last_check)
         form_layout.addRow("Остання перевірка:", last_check_label)
         
         # Статус активності
         self.active_checkbox = QComboBox()
         self.active_checkbox.addItems(["Активна", "Неактивна"])
+        if self.program_data and not self.program_data.is_active:
+            self.active_checkbox.setCurrentText("Неактивна")
         form_layout.addRow("Статус:", self.active_checkbox)
         
         form_group.setLayout(form_layout)
@@ -129,11 +141,16 @@ class VersionCheckThread(QThread):
     error = pyqtSignal(str)
     version_checked = pyqtSignal(int, str, bool)  # program_id, version, is_changed
     
-    def __init__(self, db, programs_to_check):
+    def __init__(self, db, programs_to_check, max_workers=8, per_host_limit=2, config=None, queue=None):
         super().__init__()
         self.db = db
         self.programs = programs_to_check
-        self.parser = VersionParser()
+        self.checker = VersionChecker(db, config, pool_size=max_workers)
+        self.engine = CheckEngine(self.checker.fetch_version, max_workers, per_host_limit)
+        # Черга work_queue: програми перевіряються лише в оренді, тому фонові
+        # процеси ("launcher.py worker") не перевіряють їх одночасно з GUI
+        self.queue = queue
+        self.claimed = set()
         self.running = True
     
     def run(self):
@@ -141,50 +158,45 @@ class VersionCheckThread(QThread):
         try:
             checked = 0
             updated = 0
+            programs = self.programs
+            if self.queue is not None:
+                self.claimed = set(self.queue.claim(len(programs), [program.id for program in programs]))
+                busy = len(programs) - len(self.claimed)
+                if busy:
+                    self.progress.emit(f"⏭️ {busy} програм зараз перевіряє інший процес")
+                programs = [program for program in programs if program.id in self.claimed]
+            total = len(programs)
             
-            for program in self.programs:
-                if not self.running:
-                    break
-                    
-                program_id = program[0]
-                name = program[1]
-                url = program[3]
-                selector = program[6]
-                
-                self.progress.emit(f"Перевіряю {name}...")
-                
-                # СПЕЦІАЛЬНА ОБРОБКА ДЛЯ GRANDSTREAM
-                if 'grandstream.com' in url:
-                    # Вилучаємо модель з назви програми
-                    model_match = re.search(r'Grandstream\s+([A-Z0-9]+(?:\s+v\d+)?)', name)
-                    if model_match:
-                        model = model_match.group(1)
-                        version = self.parser.get_grandstream_version(model)
-                    else:
-                        # Якщо не вдалося вилучити модель, використовуємо стандартний метод
-                        version = self.parser.get_version_from_website(url, selector)
-                else:
-                    # Для інших сайтів - стандартна логіка
-                    version = self.parser.get_version_from_website(url, selector)
+            self.progress.emit(f"Перевіряю {total} програм...")
+            
+            # Мережеві запити виконуються паралельно, а запис у БД та сигнали -
+            # тут, в одному потоці, у міру надходження результатів
+            if self.queue is not None:
+                results = check_leased(self.queue, self.checker, programs, self.engine)
+            else:
+                results = self.checker.check_programs(programs, self.engine)
+            for done, result in enumerate(results, start=1):
+                program_id = result['program_id']
+                name = result['name']
+                version = result['version']
                 
-                if version:
-                    # Перевіряємо, чи змінилася версія
-                    current_version = program[4]
-                    is_changed = version != current_version
-                    
-                    if is_changed:
-                        self.db.update_version(program_id, version)
+                if 'deferred_until' in result:
+                    until = datetime.fromtimestamp(result['deferred_until']).strftime('%H:%M')
+                    self.progress.emit(f"⏸️ [{done}/{total}] {name}: ліміт запитів, перевірку відкладено до {until}")
+                elif 'error' in result:
+                    self.progress.emit(f"⚠️ [{done}/{total}] Помилка для {name}: {result['error']}")
+                elif version:
+                    if result['updated']:
                         updated += 1
-                        self.progress.emit(f"✅ Оновлено {name}: {version}")
+                        self.progress.emit(f"✅ [{done}/{total}] Оновлено {name}: {version}")
+                    else:
+                        self.progress.emit(f"[{done}/{total}] {name}: {version}")
                     
                     # Сигнал для оновлення інтерфейсу
-                    self.version_checked.emit(program_id, version, is_changed)
+                    self.version_checked.emit(program_id, version, result['updated'])
                     checked += 1
                 else:
-                    self.progress.emit(f"⚠️ Не знайдено версію для {name}")
-                
-                # Маленька затримка між запитами
-                self.msleep(1000)
+                    self.progress.emit(f"⚠️ [{done}/{total}] Не знайдено версію для {name}")
             
             self.progress.emit(f"✅ Готово! Перевірено {checked}, оновлено {updated}")
             self.finished.emit()
@@ -195,6 +207,7 @@ class VersionCheckThread(QThread):
     def stop(self):
         """Зупинити потік"""
         self.running = False
+        self.engine.stop()
 
 class AddProgramDialog(QDialog):
     """Діалогове вікно для додавання нової програми"""
@@ -283,10 +296,18 @@ class MainWindow(QMainWindow):
     """Головне вікно програми"""
     def __init__(self):
         super().__init__()
-        self.db = Database()
+        self.load_config()
+        self.db = Database(journal_mode=self.config.get('database', {}).get('journal_mode', 'wal'))
+        # Програми читаються з БД один раз; GUI, планувальник і перевірка
+        # працюють з кешем, який оновлюється при кожному записі
+        self.programs = ProgramRepository(self.db)
         self.check_thread = None
+        self.auto_check_running = False
+        self.work_queue = WorkQueue(
+            self.programs, lease_seconds=self.config.get('checking', {}).get('lease_seconds', 300))
         self.init_ui()
-        self.load_config()
+        self.init_scheduler()
+        self.init_backups()
     
     def init_ui(self):
         self.setWindowTitle("Version Checker v2.0")
@@ -418,6 +439,42 @@ class MainWindow(QMainWindow):
         """)
         self.delete_button.clicked.connect(self.delete_selected)
         
+        self.stats_button = QPushButton("📊 Статистика")
+        self.stats_button.setToolTip("Найповільніші сайти та програми за останніми перевірками")
+        self.stats_button.setStyleSheet("""
+            QPushButton {
+                background-color: #6c757d;
+                color: white;
+                padding: 8px 15px;
+                border-radius: 4px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #5a6268;
+            }
+        """)
+        self.stats_button.clicked.connect(self.show_check_statistics)
+        
+        self.import_button = QPushButton("📥 Імпорт")
+        self.import_button.setToolTip("Додати або оновити програми (чи історію версій) з файлу CSV / JSON")
+        self.export_button = QPushButton("📤 Експорт")
+        self.export_button.setToolTip("Зберегти програми або історію версій у файл CSV / JSON")
+        for button in (self.import_button, self.export_button):
+            button.setStyleSheet("""
+                QPushButton {
+                    background-color: #6c757d;
+                    color: white;
+                    padding: 8px 15px;
+                    border-radius: 4px;
+                    font-weight: bold;
+                }
+                QPushButton:hover {
+                    background-color: #5a6268;
+                }
+            """)
+        self.import_button.clicked.connect(self.import_catalog)
+        self.export_button.clicked.connect(self.export_catalog)
+        
         # Додавання кнопок у layout
         button_layout.addWidget(self.add_button)
         button_layout.addWidget(self.edit_button)
@@ -425,26 +482,34 @@ class MainWindow(QMainWindow):
         button_layout.addWidget(self.check_single_button)
         button_layout.addWidget(self.edit_version_button)
         button_layout.addWidget(self.delete_button)
+        button_layout.addWidget(self.stats_button)
+        button_layout.addWidget(self.import_button)
+        button_layout.addWidget(self.export_button)
         button_layout.addStretch()
         
         main_layout.addLayout(button_layout)
         
         # Створюємо таблицю
-        self.table = QTableWidget()
-        self.table.setColumnCount(9)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Назва", "Категорія", "Поточна версія", 
-            "Встановлена версія", "Остання перевірка", "Статус", "URL", "Активна"
-        ])
+        self.program_model = ProgramTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.program_model)
         
         # Налаштування таблиці
         self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)  # Назва
-        self.table.horizontalHeader().setSectionResizeMode(7, QHeaderView.ResizeToContents)  # URL
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        # ResizeToContents перебирав би всі рядки при кожній зміні - ширина URL фіксована
+        self.table.horizontalHeader().resizeSection(7, 280)  # URL
+        # Фіксована висота рядків: таблиця не вимірює рядки поза екраном
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(30)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        # Сортує сама модель, зберігаючи індекс ID -> рядок
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(COL_NAME, Qt.AscendingOrder)
         self.table.setAlternatingRowColors(True)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 gridline-color: #dee2e6;
                 font-size: 12px;
             }
@@ -454,7 +519,7 @@ class MainWindow(QMainWindow):
                 border: 1px solid #dee2e6;
                 font-weight: bold;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 6px;
             }
         """)
@@ -486,118 +551,121 @@ class MainWindow(QMainWindow):
     
     def load_config(self):
         """Завантажити конфігурацію"""
-        try:
-            if os.path.exists('config.json'):
-                with open('config.json', 'r', encoding='utf-8') as f:
-                    self.config = json.load(f)
+        self.config = load_config()
+    
+    def init_scheduler(self):
+        """Запустити автоматичні перевірки за check_interval кожної програми"""
+        checking = self.config.get('checking', {})
+        interval = checking.get('auto_check_interval_minutes', 1440)
+        
+        self.scheduler = CheckScheduler(
+            self.programs,
+            default_interval_minutes=interval or 1440,
+            jitter_seconds=checking.get('scheduler_jitter_seconds', 300)
+        )
+        self.scheduler.rebuild()
+        
+        self.auto_check_timer = QTimer(self)
+        self.auto_check_timer.timeout.connect(self.run_scheduled_checks)
+        if interval:  # 0 - автоматичну перевірку вимкнено
+            self.auto_check_timer.start(checking.get('scheduler_tick_seconds', 60) * 1000)
+    
+    def init_backups(self):
+        """Автоматичні резервні копії БД раз на backup_interval_days"""
+        self.backups = BackupManager.from_config(self.db, self.config)
+        self.backup_worker = None
+        if not self.config.get('database', {}).get('auto_backup'):
+            return
+        self.backup_timer = QTimer(self)
+        self.backup_timer.timeout.connect(self.run_due_backup)
+        self.backup_timer.start(60 * 60 * 1000)  # Перевірка щогодини
+        # Перша перевірка - після запуску, щоб не затримувати відкриття вікна
+        QTimer.singleShot(60 * 1000, self.run_due_backup)
+    
+    def run_due_backup(self):
+        """Зробити резервну копію у фоні, якщо настав її час"""
+        if self.backup_worker and self.backup_worker.isRunning():
+            return
+        if not self.backups.is_due(self.config.get('database', {}).get('backup_interval_days', 7)):
+            return
+        # Копіювання порціями у фоновому потоці: перевірки та вікно працюють далі
+        self.backup_worker = Worker(self.backups.backup)
+        self.backup_worker.finished.connect(
+            lambda path: self.status_bar.showMessage(f"💾 Резервну копію збережено: {os.path.basename(path)}"))
+        self.backup_worker.error.connect(
+            lambda message: self.status_bar.showMessage(f"❌ Помилка резервного копіювання: {message}"))
+        self.backup_worker.start()
+    
+    def run_scheduled_checks(self):
+        """Перевірити програми, час перевірки яких настав"""
+        if self.check_thread and self.check_thread.isRunning():
+            return
+        
+        programs = [self.programs.get_program_by_id(program_id) for program_id in self.scheduler.pop_due()]
+        programs = [program for program in programs if program]
+        if not programs:
+            return
+        # Програми, які вже перевірив фоновий процес, у чергу не потраплять
+        interval = self.config.get('checking', {}).get('auto_check_interval_minutes', 1440) or 1440
+        self.work_queue.enqueue([program.id for program in programs], default_interval_minutes=interval)
+        
+        self.auto_check_running = True
+        self.check_thread = self.create_check_thread(programs)
+        self.status_label.setText(f"Автоматична перевірка: {len(programs)} програм...")
+        self.check_thread.start()
+    
+    def refresh_checked_programs(self):
+        """Оновити рядки програм щойно завершеної перевірки (час перевірки тощо)"""
+        for program in self.check_thread.programs:
+            self.refresh_program(program.id)
+        self.update_statistics()
+    
+    def reschedule_checked_programs(self):
+        """
+        Перепланувати програми щойно завершеної перевірки.
+        Викликається перед refresh_checked_programs: записи програм, які
+        перевірив інший процес, тут позначаються застарілими в кеші.
+        """
+        checked_at = time.time()
+        deferred = self.check_thread.checker.deferred
+        claimed = self.check_thread.claimed
+        for program in self.check_thread.programs:
+            if program.id in deferred:
+                self.scheduler.defer(program.id, deferred[program.id])
+            elif program.id in claimed:
+                self.scheduler.reschedule(program.id, checked_at)
             else:
-                self.config = {
-                    "auto_check_interval": 1440,
-                    "timeout": 30
-                }
-        except:
-            self.config = {}
+                # Перевіряв інший процес: його запис у БД минув кеш репозиторію,
+                # тож час перевірки та версію перечитуємо з БД
+                self.programs.invalidate(program.id)
+                self.scheduler.reschedule(program.id)
     
     def load_programs(self):
-        """Завантажити програми з БД в таблицю"""
+        """Завантажити програми з БД в таблицю (повністю, при старті)"""
         try:
-            programs = self.db.get_all_programs()
-            
-            self.table.setRowCount(len(programs))
-            
-            need_update_count = 0
-            active_count = 0
-            last_check_time = None
-            
-            for row, program in enumerate(programs):
-                # Заповнюємо комірки
-                self.table.setItem(row, 0, QTableWidgetItem(str(program[0])))  # ID
-                self.table.setItem(row, 1, QTableWidgetItem(program[1]))      # Назва
-                self.table.setItem(row, 2, QTableWidgetItem(program[2]))      # Категорія
-                
-                # Поточна версія
-                current_version_item = QTableWidgetItem(program[4] or "Не перевірено")
-                self.table.setItem(row, 3, current_version_item)
-                
-                # Встановлена версія
-                installed_version_item = QTableWidgetItem(program[5] or "")
-                self.table.setItem(row, 4, installed_version_item)
-                
-                # Остання перевірка
-                last_check = program[7]
-                if last_check:
-                    last_check_time = last_check
-                    try:
-                        dt = datetime.strptime(last_check, "%Y-%m-%d %H:%M:%S")
-                        last_check_str = dt.strftime("%d.%m.%Y %H:%M")
-                    except:
-                        last_check_str = last_check
-                else:
-                    last_check_str = "Ніколи"
-                
-                self.table.setItem(row, 5, QTableWidgetItem(last_check_str))
-                
-                # URL (скорочено)
-                url = program[3]
-                if len(url) > 40:
-                    url_display = url[:37] + "..."
-                else:
-                    url_display = url
-                url_item = QTableWidgetItem(url_display)
-                url_item.setToolTip(url)  # Повний URL при наведенні
-                self.table.setItem(row, 7, url_item)
-                
-                # Активність
-                is_active = program[8] if len(program) > 8 else 1
-                active_item = QTableWidgetItem("Так" if is_active else "Ні")
-                active_item.setTextAlignment(Qt.AlignCenter)
-                if is_active:
-                    active_item.setBackground(QColor(212, 237, 218))
-                    active_item.setForeground(QColor(21, 87, 36))
-                    active_count += 1
-                else:
-                    active_item.setBackground(QColor(220, 220, 220))
-                    active_item.setForeground(QColor(108, 117, 125))
-                self.table.setItem(row, 8, active_item)
-                
-                # Визначаємо статус оновлення
-                current = program[4] or ""
-                installed = program[5] or ""
-                
-                status_item = QTableWidgetItem()
-                if not current:
-                    status_item.setText("Не перевірено")
-                    status_item.setBackground(QColor(Qt.yellow))  # Світло-жовтий
-                    status_item.setForeground(Qt.black)
-                elif not installed:
-                    status_item.setText("Версія не вказана")
-                    status_item.setBackground(QColor(220, 220, 220))  # Сірий
-                    status_item.setForeground(Qt.black)
-                elif current == installed:
-                    status_item.setText("Актуальна")
-                    status_item.setBackground(QColor(212, 237, 218))  # Світло-зелений
-                    status_item.setForeground(QColor(21, 87, 36))
-                else:
-                    status_item.setText("Потрібно оновити")
-                    status_item.setBackground(QColor(248, 215, 218))  # Світло-червоний
-                    status_item.setForeground(QColor(114, 28, 36))
-                    need_update_count += 1
-                
-                self.table.setItem(row, 6, status_item)
-            
-            # Оновлюємо статистику
-            self.total_label.setText(f"Всього програм: {len(programs)}")
-            self.updated_label.setText(f"Потребують оновлення: {need_update_count}")
-            self.active_label.setText(f"Активних: {active_count}")
-            
-            if last_check_time:
-                self.last_check_label.setText(f"Остання перевірка: {last_check_time}")
-            
-            self.status_bar.showMessage(f"Завантажено {len(programs)} програм")
-            
+            self.program_model.set_programs(self.programs.get_all_programs())
+            self.update_statistics()
+            self.status_bar.showMessage(f"Завантажено {self.program_model.rowCount()} програм")
         except Exception as e:
             QMessageBox.critical(self, "Помилка", f"Не вдалося завантажити програми: {str(e)}")
     
+    def refresh_program(self, program_id):
+        """Оновити в таблиці один рядок за даними з БД"""
+        program = self.programs.get_program_by_id(program_id)
+        if program is None:
+            self.program_model.remove_program(program_id)
+        else:
+            self.program_model.upsert_program(program)
+    
+    def update_statistics(self):
+        """Оновити підсумки під таблицею"""
+        total, need_update_count, active_count, last_check_time = self.program_model.statistics()
+        self.total_label.setText(f"Всього програм: {total}")
+        self.updated_label.setText(f"Потребують оновлення: {need_update_count}")
+        self.active_label.setText(f"Активних: {active_count}")
+        if last_check_time:
+            self.last_check_label.setText(f"Остання перевірка: {last_check_time}")
+    
     def get_selected_program_data(self):
         """Отримати дані обраної програми"""
         selected_rows = self.table.selectionModel().selectedRows()
@@ -606,16 +674,9 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Попередження", "Оберіть програму для редагування")
             return None
         
-        row = selected_rows[0].row()
-        program_id = int(self.table.item(row, 0).text())
-        
-        # Знаходимо програму в базі даних
-        programs = self.db.get_all_programs()
-        for program in programs:
-            if program[0] == program_id:
-                return program
-        
-        return None
+        # Актуальні дані за первинним ключем (рядок міг змінитись у фоні)
+        program_id = self.program_model.program_at(selected_rows[0].row()).id
+        return self.programs.get_program_by_id(program_id)
     
     def open_add_dialog(self):
         """Відкрити діалог додавання програми"""
@@ -633,7 +694,7 @@ class MainWindow(QMainWindow):
                 return
             
             # Додаємо програму
-            self.db.add_program(
+            program_id = self.programs.add_program(
                 program_data['name'],
                 program_data['category'],
                 program_data['url'],
@@ -641,9 +702,11 @@ class MainWindow(QMainWindow):
                 program_data['selector'],
                 program_data['is_active']
             )
+            self.scheduler.reschedule(program_id)
+            self.refresh_program(program_id)
+            self.update_statistics()
             
             QMessageBox.information(self, "Успіх", "Програма додана успішно!")
-            self.load_programs()
     
     def edit_selected_program(self):
         """Редагувати всі параметри обраної програми"""
@@ -665,8 +728,8 @@ class MainWindow(QMainWindow):
                 return
             
             # Оновлюємо програму в базі даних
-            self.db.update_program(
-                program_data[0],  # program_id
+            self.programs.update_program(
+                program_data.id,  # program_id
                 updated_data['name'],
                 updated_data['category'],
                 updated_data['url'],
@@ -674,9 +737,11 @@ class MainWindow(QMainWindow):
                 updated_data['selector'],
                 updated_data['is_active']
             )
+            self.scheduler.reschedule(program_data.id)
+            self.refresh_program(program_data.id)
+            self.update_statistics()
             
             QMessageBox.information(self, "Успіх", "Програма оновлена успішно!")
-            self.load_programs()
     
     def edit_installed_version(self):
         """Редагувати тільки встановлену версію"""
@@ -684,22 +749,40 @@ class MainWindow(QMainWindow):
         if not program_data:
             return
         
-        current_version = program_data[5] or ""
+        current_version = program_data.installed_version or ""
         
         # Діалогове вікно для введення версії
         new_version, ok = QInputDialog.getText(
             self,
-            f"Редагування версії - {program_data[1]}",
+            f"Редагування версії - {program_data.name}",
             "Введіть встановлену версію:",
             QLineEdit.Normal,
             current_version
         )
         
         if ok and new_version.strip():
-            self.db.update_installed_version(program_data[0], new_version.strip())
-            self.load_programs()
+            self.programs.update_installed_version(program_data.id, new_version.strip())
+            self.refresh_program(program_data.id)
+            self.update_statistics()
             self.status_bar.showMessage("Версія оновлена")
-            QMessageBox.information(self, "Успіх", f"Версія для {program_data[1]} оновлена!")
+            QMessageBox.information(self, "Успіх", f"Версія для {program_data.name} оновлена!")
+    
+    def create_check_thread(self, programs):
+        """Створити потік перевірки з налаштуваннями паралельності з config.json"""
+        checking = self.config.get('checking', {})
+        thread = VersionCheckThread(
+            self.programs,
+            programs,
+            max_workers=checking.get('max_concurrent_checks', 8),
+            per_host_limit=checking.get('max_checks_per_host', 2),
+            config=self.config,
+            queue=self.work_queue
+        )
+        thread.progress.connect(self.update_status)
+        thread.finished.connect(self.on_check_finished)
+        thread.error.connect(self.on_check_error)
+        thread.version_checked.connect(self.on_version_checked)
+        return thread
     
     def check_all_programs(self):
         """Перевірити версії всіх активних програм"""
@@ -707,17 +790,14 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Увага", "Перевірка вже виконується!")
             return
         
-        programs = self.db.get_active_programs()
+        programs = self.programs.get_active_programs()
         if not programs:
             QMessageBox.information(self, "Інформація", "Немає активних програм для перевірки")
             return
         
-        # Запускаємо перевірку в окремому потоці
-        self.check_thread = VersionCheckThread(self.db, programs)
-        self.check_thread.progress.connect(self.update_status)
-        self.check_thread.finished.connect(self.on_check_finished)
-        self.check_thread.error.connect(self.on_check_error)
-        self.check_thread.version_checked.connect(self.on_version_checked)
+        # Запускаємо перевірку в окремому потоці (через спільну чергу)
+        self.work_queue.enqueue([program.id for program in programs], PRIORITY_NOW)
+        self.check_thread = self.create_check_thread(programs)
         
         self.check_all_button.setEnabled(False)
         self.check_all_button.setText("⏳ Перевірка...")
@@ -736,7 +816,7 @@ class MainWindow(QMainWindow):
             return
         
         # Перевіряємо, чи програма активна
-        is_active = program_data[8] if len(program_data) > 8 else 1
+        is_active = program_data.is_active
         if not is_active:
             reply = QMessageBox.question(
                 self,
@@ -748,15 +828,12 @@ class MainWindow(QMainWindow):
                 return
         
         # Запускаємо перевірку для однієї програми
-        self.check_thread = VersionCheckThread(self.db, [program_data])
-        self.check_thread.progress.connect(self.update_status)
-        self.check_thread.finished.connect(self.on_check_finished)
-        self.check_thread.error.connect(self.on_check_error)
-        self.check_thread.version_checked.connect(self.on_version_checked)
+        self.work_queue.enqueue([program_data.id], PRIORITY_NOW)
+        self.check_thread = self.create_check_thread([program_data])
         
         self.check_single_button.setEnabled(False)
         self.check_single_button.setText("⏳ Перевірка...")
-        self.status_label.setText(f"Перевіряю {program_data[1]}...")
+        self.status_label.setText(f"Перевіряю {program_data.name}...")
         
         self.check_thread.start()
     
@@ -767,37 +844,8 @@ class MainWindow(QMainWindow):
     
     def on_version_checked(self, program_id, version, is_changed):
         """Обробник перевірки окремої версії"""
-        # Оновлюємо відповідний рядок у таблиці
-        for row in range(self.table.rowCount()):
-            if self.table.item(row, 0).text() == str(program_id):
-                # Оновлюємо поточну версію
-                self.table.setItem(row, 3, QTableWidgetItem(version))
-                
-                # Оновлюємо статус
-                current = version
-                installed_item = self.table.item(row, 4)
-                installed = installed_item.text() if installed_item else ""
-                
-                status_item = QTableWidgetItem()
-                if not current:
-                    status_item.setText("Не перевірено")
-                    status_item.setBackground(QColor(255, 255, 204))
-                    status_item.setForeground(Qt.black)
-                elif not installed:
-                    status_item.setText("Версія не вказана")
-                    status_item.setBackground(QColor(220, 220, 220))
-                    status_item.setForeground(Qt.black)
-                elif current == installed:
-                    status_item.setText("Актуальна")
-                    status_item.setBackground(QColor(212, 237, 218))
-                    status_item.setForeground(QColor(21, 87, 36))
-                else:
-                    status_item.setText("Потрібно оновити")
-                    status_item.setBackground(QColor(248, 215, 218))
-                    status_item.setForeground(QColor(114, 28, 36))
-                
-                self.table.setItem(row, 6, status_item)
-                break
+        # Оновлюємо лише рядок цієї програми; статус модель обчислить сама
+        self.program_model.update_version(program_id, version)
     
     def on_check_finished(self):
         """Обробник завершення перевірки"""
@@ -806,12 +854,20 @@ class MainWindow(QMainWindow):
         self.check_single_button.setEnabled(True)
         self.check_single_button.setText("🔎 Обране")
         self.status_label.setText("Перевірка завершена")
-        self.load_programs()  # Оновити всю таблицю
+        self.reschedule_checked_programs()
+        self.refresh_checked_programs()
         
+        # Автоматична перевірка не відволікає користувача діалогом
+        if self.auto_check_running:
+            self.auto_check_running = False
+            return
         QMessageBox.information(self, "Готово", "Перевірка версій завершена!")
     
     def on_check_error(self, error_message):
         """Обробник помилки перевірки"""
+        self.reschedule_checked_programs()
+        self.refresh_checked_programs()
+        self.auto_check_running = False
         self.check_all_button.setEnabled(True)
         self.check_all_button.setText("🔍 Всі")
         self.check_single_button.setEnabled(True)
@@ -830,17 +886,103 @@ class MainWindow(QMainWindow):
             self, 
             "Підтвердження видалення",
             f"Ви впевнені, що хочете видалити програму:\n\n"
-            f"Назва: {program_data[1]}\n"
-            f"Категорія: {program_data[2]}\n\n"
+            f"Назва: {program_data.name}\n"
+            f"Категорія: {program_data.category}\n\n"
             f"Цю дію неможливо скасувати!",
             QMessageBox.Yes | QMessageBox.No,
             QMessageBox.No
         )
         
         if reply == QMessageBox.Yes:
-            self.db.delete_program(program_data[0])
+            self.programs.delete_program(program_data.id)
+            self.scheduler.remove(program_data.id)
+            self.program_model.remove_program(program_data.id)
+            self.update_statistics()
+            self.status_bar.showMessage(f"Програма '{program_data.name}' видалена")
+    
+    def choose_catalog_table(self, action):
+        """Запитати, що імпортувати / експортувати; None - скасовано"""
+        tables = {"Програми": 'programs', "Історія версій": 'history'}
+        choice, ok = QInputDialog.getItem(self, action, "Дані:", list(tables), 0, False)
+        return tables[choice] if ok else None
+    
+    def run_catalog_io(self, func, *args):
+        """Виконати імпорт / експорт у фоновому потоці, щоб вікно не зависало"""
+        self.import_button.setEnabled(False)
+        self.export_button.setEnabled(False)
+        self.catalog_worker = Worker(func, self.db, *args)
+        self.catalog_worker.finished.connect(self.on_catalog_io_finished)
+        self.catalog_worker.error.connect(self.on_catalog_io_error)
+        self.catalog_worker.start()
+    
+    def on_catalog_io_error(self, message):
+        self.import_button.setEnabled(True)
+        self.export_button.setEnabled(True)
+        self.status_bar.showMessage("Помилка імпорту / експорту")
+        QMessageBox.critical(self, "Помилка", f"Не вдалося обробити файл: {message}")
+    
+    def on_catalog_io_finished(self, result):
+        self.import_button.setEnabled(True)
+        self.export_button.setEnabled(True)
+        if isinstance(result, dict):
+            # Імпорт змінив каталог в обхід кешу репозиторію
+            self.programs.invalidate()
             self.load_programs()
-            self.status_bar.showMessage(f"Програма '{program_data[1]}' видалена")
+            self.scheduler.rebuild()
+            self.status_bar.showMessage(
+                f"Імпорт: додано {result['inserted']}, оновлено {result['updated']}, "
+                f"пропущено {result['skipped']}")
+        else:
+            self.status_bar.showMessage(f"Експортовано {result} рядків")
+    
+    def import_catalog(self):
+        """Масовий імпорт програм або історії версій з файлу"""
+        table = self.choose_catalog_table("Імпорт")
+        if table is None:
+            return
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Імпорт", "", "CSV / JSON (*.csv *.json *.jsonl *.ndjson);;Усі файли (*)")
+        if path:
+            self.status_bar.showMessage(f"Імпорт {os.path.basename(path)}...")
+            self.run_catalog_io(catalog_io.import_catalog, path, table)
+    
+    def export_catalog(self):
+        """Експорт програм або історії версій у файл"""
+        table = self.choose_catalog_table("Експорт")
+        if table is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Експорт", f"{table}.csv", "CSV (*.csv);;JSON (*.json);;JSON Lines (*.jsonl)")
+        if path:
+            self.status_bar.showMessage(f"Експорт у {os.path.basename(path)}...")
+            self.run_catalog_io(catalog_io.export_catalog, path, table)
+    
+    def show_check_statistics(self):
+        """Показати підсумок вимірювань перевірок (таблиця check_runs)"""
+        try:
+            summary = self.db.get_check_run_summary()
+        except Exception as e:
+            QMessageBox.critical(self, "Помилка", f"Не вдалося отримати статистику: {str(e)}")
+            return
+        
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Статистика перевірок")
+        dialog.resize(900, 500)
+        layout = QVBoxLayout()
+        
+        text = QTextEdit()
+        text.setReadOnly(True)
+        text.setLineWrapMode(QTextEdit.NoWrap)
+        text.setStyleSheet("font-family: monospace; font-size: 12px;")
+        text.setPlainText(format_summary(summary))
+        layout.addWidget(text)
+        
+        button_box = QDialogButtonBox(QDialogButtonBox.Close)
+        button_box.rejected.connect(dialog.reject)
+        layout.addWidget(button_box)
+        
+        dialog.setLayout(layout)
+        dialog.exec_()
     
     def closeEvent(self, event):
         """Обробник закриття вікна"""
@@ -849,6 +991,13 @@ class MainWindow(QMainWindow):
             self.check_thread.stop()
             self.check_thread.wait(2000)  # Чекаємо до 2 секунд
         
+        # Незавершена резервна копія не повинна обірватися на півдорозі
+        if self.backup_worker and self.backup_worker.isRunning():
+            self.status_bar.showMessage("Завершення резервного копіювання...")
+            self.backup_worker.wait()
+        
+        # Процеси розбору HTML (parse_worker) більше не потрібні
+        parse_worker.shutdown_pool()
         self.db.close_all_connections()  
         event.accept()
 
@@ -884,55 +1033,6 @@ class Worker(QThread):
         except Exception as e:
             self.error.emit(str(e))
 
-class VersionChecker:
-    """Клас для перевірки версій (не успадковує QThread)"""
-    def __init__(self, db):
-        self.db = db
-        self.parser = VersionParser()
-    
-    def check_program(self, program):
-        """Перевірити одну програму"""
-        program_id = program[0]
-        name = program[1]
-        url = program[3]
-        selector = program[6]
-        
-        # СПЕЦІАЛЬНА ОБРОБКА ДЛЯ GRANDSTREAM
-        if 'grandstream.com' in url:
-            # Вилучаємо модель з назви програми
-            model_match = re.search(r'Grandstream\s+([A-Z0-9]+(?:\s+v\d+)?)', name)
-            if model_match:
-                model = model_match.group(1)
-                version = self.parser.get_grandstream_version(model)
-            else:
-                # Якщо не вдалося вилучити модель, використовуємо стандартний метод
-                version = self.parser.get_version_from_website(url, selector)
-        else:
-            # Для інших сайтів - стандартна логіка
-            version = self.parser.get_version_from_website(url, selector)
-        
-        result = {
-            'program_id': program_id,
-            'name': name,
-            'version': version,
-            'success': version is not None
-        }
-        
-        if version:
-            # Перевіряємо, чи змінилася версія
-            current_version = program[4]
-            if version != current_version:
-                self.db.update_version(program_id, version)
-                result['updated'] = True
-                result['old_version'] = current_version
-            else:
-                result['updated'] = False
-            
-            # Оновлюємо час останньої перевірки
-            self.db.update_last_check(program_id)
-        
-        return result
-
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""
+Вимірювання перевірок: час фаз, обсяг даних, HTTP-статус, кеш та екстрактор.
+
+VersionChecker створює CheckTrace для кожної програми і робить його
+поточним для потоку, що виконує перевірку. Парсер доповнює поточний trace
+(current_trace()), не знаючи, хто його створив; без активного trace
+вимірювання просто відкидаються. Результати зберігаються в таблиці
+check_runs, згруповані за run_id.
+
+Фази:
+    request  - від надсилання запиту до заголовків відповіді
+               (DNS, з'єднання, TLS та очікування сервера разом)
+    download - читання тіла відповіді
+    parse    - розбір HTML та CSS-селектори
+    extract  - пошук версії регулярними виразами
+"""
+
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+PHASES = ('request', 'download', 'parse', 'extract')
+
+_local = threading.local()
+
+
+def new_run_id():
+    """Ідентифікатор запуску перевірки: час + випадковий суфікс"""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+class CheckTrace:
+    """Вимірювання однієї перевірки"""
+    __slots__ = ('program_id', 'host', 'started', 'total_ms', 'phases', 'http_status',
+                 'bytes', 'cache_hit', 'extractor', 'error')
+
+    def __init__(self, program_id=None, host=None):
+        self.program_id = program_id
+        self.host = host
+        self.started = time.perf_counter()
+        self.total_ms = None
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.http_status = None
+        self.bytes = 0
+        self.cache_hit = False
+        self.extractor = None
+        self.error = None
+
+    @contextmanager
+    def phase(self, name):
+        """Додати час блоку до фази (фаза може повторюватися)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += (time.perf_counter() - started) * 1000
+
+    def add_phase(self, name, milliseconds):
+        self.phases[name] += milliseconds
+
+    def finish(self):
+        if self.total_ms is None:
+            self.total_ms = (time.perf_counter() - self.started) * 1000
+        return self
+
+
+def current_trace():
+    """Trace поточного потоку; без активного - тимчасовий, що нікуди не пишеться"""
+    trace = getattr(_local, 'trace', None)
+    return trace if trace is not None else CheckTrace()
+
+
+@contextmanager
+def tracing(trace):
+    """Зробити trace поточним для потоку на час блоку"""
+    previous = getattr(_local, 'trace', None)
+    _local.trace = trace
+    try:
+        yield trace
+    finally:
+        trace.finish()
+        _local.trace = previous
+
+
+def format_summary(summary):
+    """Текстовий звіт зі словника Database.get_check_run_summary"""
+    if not summary['runs']:
+        return "Даних про перевірки ще немає"
+
+    lines = [f"Запусків: {len(summary['runs'])} (останній {summary['runs'][0]})"]
+    totals = summary['phases']
+    total = sum(totals.values()) or 1
+    lines.append("Час за фазами: " + ", ".join(
+        f"{name} {totals[name] / 1000:.1f} с ({totals[name] * 100 / total:.0f}%)" for name in PHASES))
+
+    lines.append("")
+    lines.append("Найповільніші хости (середній час, мс):")
+    for row in summary['hosts']:
+        lines.append(
+            f"  {row['host'] or '-'}: {row['avg_ms']:.0f} (макс. {row['max_ms']:.0f}), "
+            f"перевірок {row['checks']}, помилок {row['errors']}, з кешу {row['cache_hits']}, "
+            f"{row['bytes'] / 1024:.0f} КБ")
+
+    lines.append("")
+    lines.append("Найповільніші програми (середній час, мс):")
+    for row in summary['programs']:
+        phases = " / ".join(f"{row[name + '_ms']:.0f}" for name in PHASES)
+        lines.append(
+            f"  [{row['program_id']}] {row['name'] or '-'}: {row['avg_ms']:.0f} "
+            f"({'/'.join(PHASES)}: {phases}), {row['extractor'] or '-'}, HTTP {row['http_status'] or '-'}")
+    return "\n".join(lines)
@@ -0,0 +1,181 @@
+"""
+Версійні міграції схеми versions.db.
+
+Номер застосованої міграції зберігається в PRAGMA user_version. При запуску
+виконуються лише міграції з більшим номером, тому для актуальної БД це одне
+читання заголовка файлу. Усі міграції виконуються в потоці запису однією
+транзакцією: або застосовуються всі, або жодна.
+
+Нова міграція - функція migration(cursor), додана в кінець MIGRATIONS.
+Міграції не можна змінювати чи переставляти після випуску.
+"""
+
+
+def baseline(cursor):
+    """1: початкова схема (IF NOT EXISTS - існуючі БД мають ці таблиці)"""
+    # Таблиця програм
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS programs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            category TEXT NOT NULL,
+            url TEXT NOT NULL,
+            current_version TEXT,
+            installed_version TEXT,
+            version_selector TEXT,
+            last_check TEXT,
+            check_interval INTEGER DEFAULT 24,
+            is_active INTEGER DEFAULT 1,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Таблиця історії версій
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS version_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            program_id INTEGER,
+            version TEXT,
+            check_date TEXT,
+            FOREIGN KEY (program_id) REFERENCES programs (id)
+        )
+    ''')
+
+    # Кеш валідаторів HTTP (ETag / Last-Modified) для умовних запитів
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS http_cache (
+            url TEXT NOT NULL,
+            selector TEXT NOT NULL DEFAULT '',
+            etag TEXT,
+            last_modified TEXT,
+            version TEXT,
+            updated_at TEXT,
+            PRIMARY KEY (url, selector)
+        )
+    ''')
+
+
+def add_program_indexes(cursor):
+    """2: індекси для списку програм та історії версій"""
+    # get_all_programs: ORDER BY name та WHERE category = ? ORDER BY name
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_programs_name ON programs (name)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_programs_category_name ON programs (category, name)')
+    # get_active_programs: WHERE is_active = 1 [AND category = ?]
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_programs_active ON programs (is_active, category)')
+    # Історія та видалення програми
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_version_history_program_id
+        ON version_history (program_id)
+    ''')
+
+
+def cascade_version_history(cursor):
+    """3: ON DELETE CASCADE для version_history (SQLite не вміє ALTER для ключів)"""
+    foreign_keys = cursor.execute("PRAGMA foreign_key_list(version_history)").fetchall()
+    # (id, seq, table, from, to, on_update, on_delete, match)
+    if any(key[2] == 'programs' and key[6] == 'CASCADE' for key in foreign_keys):
+        return
+
+    cursor.execute('''
+        CREATE TABLE version_history_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            program_id INTEGER,
+            version TEXT,
+            check_date TEXT,
+            FOREIGN KEY (program_id) REFERENCES programs (id) ON DELETE CASCADE
+        )
+    ''')
+    # Записи видалених раніше програм не пройдуть перевірку ключа - відкидаємо їх
+    cursor.execute('''
+        INSERT INTO version_history_new (id, program_id, version, check_date)
+        SELECT id, program_id, version, check_date FROM version_history
+        WHERE program_id IS NULL OR program_id IN (SELECT id FROM programs)
+    ''')
+    cursor.execute('DROP TABLE version_history')
+    cursor.execute('ALTER TABLE version_history_new RENAME TO version_history')
+    # Індекс видалено разом зі старою таблицею
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_version_history_program_id
+        ON version_history (program_id)
+    ''')
+
+
+def add_check_runs(cursor):
+    """4: вимірювання перевірок (metrics.CheckTrace), згруповані за run_id"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS check_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT NOT NULL,
+            program_id INTEGER,
+            host TEXT,
+            checked_at TEXT,
+            status TEXT,
+            http_status INTEGER,
+            cache_hit INTEGER DEFAULT 0,
+            extractor TEXT,
+            bytes INTEGER DEFAULT 0,
+            request_ms REAL DEFAULT 0,
+            download_ms REAL DEFAULT 0,
+            parse_ms REAL DEFAULT 0,
+            extract_ms REAL DEFAULT 0,
+            total_ms REAL DEFAULT 0,
+            error TEXT,
+            FOREIGN KEY (program_id) REFERENCES programs (id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_check_runs_run_id ON check_runs (run_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_check_runs_checked_at ON check_runs (checked_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_check_runs_program_id ON check_runs (program_id)')
+
+
+def add_work_queue(cursor):
+    """5: черга перевірок з орендою для кількох процесів (work_queue.py)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS work_queue (
+            program_id INTEGER PRIMARY KEY,
+            priority INTEGER NOT NULL DEFAULT 0,
+            available_at REAL NOT NULL,
+            enqueued_at REAL NOT NULL,
+            lease_owner TEXT,
+            lease_expires REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (program_id) REFERENCES programs (id) ON DELETE CASCADE
+        )
+    ''')
+    # claim: вільні (або з простроченою орендою) за пріоритетом та часом
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_work_queue_ready
+        ON work_queue (priority DESC, available_at)
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_work_queue_owner ON work_queue (lease_owner)')
+
+
+MIGRATIONS = [
+    baseline,
+    add_program_indexes,
+    cascade_version_history,
+    add_check_runs,
+    add_work_queue,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(cursor):
+    return cursor.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(cursor):
+    """Застосувати нові міграції; повертає кількість застосованих"""
+    current = get_schema_version(cursor)
+    if current > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"База даних створена новішою версією програми (схема {current}, "
+            f"підтримується до {SCHEMA_VERSION})")
+
+    for number, migration in enumerate(MIGRATIONS[current:], start=current + 1):
+        migration(cursor)
+        # user_version змінюється в тій самій транзакції, що й схема
+        cursor.execute(f"PRAGMA user_version = {number}")
+    return SCHEMA_VERSION - current
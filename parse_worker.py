@@ -0,0 +1,132 @@
+"""
+Розбір HTML і пошук версії в окремих процесах.
+
+Розбір сторінок і регулярні вирази - чистий Python, тож у потоках перевірки
+вони ділять GIL з циклом подій PyQt, і вікно "підвисає" під час перевірки.
+Коли в config.json задано "parsing" -> "parse_processes", VersionParser
+надсилає процесам пулу байти сторінки (разом з кодуванням та селектором), а
+отримує лише версію і час фаз parse / extract для статистики. Сторінка,
+спільна для кількох програм, розбирається в процесі один раз для всіх їх
+селекторів (extract_many_from_bytes), а таблиця прошивок Grandstream - найбільша
+сторінка - перетворюється на індекс моделей теж у процесі (grandstream_index_from_bytes).
+
+Процеси запускаються методом spawn: fork процесу з потоками й Qt ненадійний.
+Для EXE (PyInstaller) launcher.py викликає multiprocessing.freeze_support().
+Пул один на процес програми і переживає окремі перевірки.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from metrics import CheckTrace, tracing
+
+_lock = threading.Lock()
+_pool = None
+_pool_key = None
+
+# VersionParser процесу пулу (створюється в init_worker)
+_parser = None
+
+
+def process_count(setting):
+    """Кількість процесів за параметром parse_processes: число, "auto" або 0 (вимкнено)"""
+    if setting == 'auto':
+        # Одне ядро лишаємо головному процесу (GUI та мережа)
+        return max(1, min(4, (os.cpu_count() or 2) - 1))
+    try:
+        return max(0, int(setting or 0))
+    except (TypeError, ValueError):
+        print(f"⚠️ Невірне значення parse_processes: {setting!r}, розбір у потоках перевірки")
+        return 0
+
+
+def get_pool(processes, backend_name):
+    """Спільний пул процесів розбору (перестворюється, якщо змінилися параметри)"""
+    global _pool, _pool_key
+    with _lock:
+        if _pool is None or _pool_key != (processes, backend_name):
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker,
+                initargs=(backend_name,)
+            )
+            _pool_key = (processes, backend_name)
+        return _pool
+
+
+def discard_pool(pool):
+    """Забути пул, що зламався (процес завершився аварійно); наступний буде новий"""
+    global _pool, _pool_key
+    with _lock:
+        if _pool is pool:
+            _pool = _pool_key = None
+    pool.shutdown(wait=False)
+
+
+def shutdown_pool():
+    """Зупинити процеси розбору (під час виходу з програми)"""
+    global _pool, _pool_key
+    with _lock:
+        pool, _pool, _pool_key = _pool, None, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def init_worker(backend_name):
+    """Ініціалізація процесу пулу: власний VersionParser з тим самим HTML-бекендом"""
+    global _parser
+    # Імпорт тут: parser імпортує цей модуль
+    from parser import VersionParser
+    _parser = VersionParser(pool_size=1, config={'parsing': {'html_backend': backend_name}})
+
+
+def decode(data, encoding):
+    try:
+        return data.decode(encoding or 'utf-8', errors='replace')
+    except LookupError:
+        return data.decode('utf-8', errors='replace')
+
+
+def extract_from_bytes(data, encoding, selector=None, partial=False):
+    """
+    Знайти версію в байтах сторінки (виконується в процесі пулу).
+    partial=True - початок сторінки під час потокового читання (проба).
+    Повертає (version, {'parse': мс, 'extract': мс}, extractor).
+    """
+    html = decode(data, encoding)
+    trace = CheckTrace()
+    with tracing(trace):
+        if partial:
+            version = _parser.probe_partial_html(html, selector)
+        else:
+            version = _parser.extract_version_from_html(html, selector)
+    return version, {'parse': trace.phases['parse'], 'extract': trace.phases['extract']}, trace.extractor
+
+
+def extract_many_from_bytes(data, encoding, selectors):
+    """
+    Версії для кількох селекторів з одного розбору сторінки (спільна сторінка).
+    Повертає ({selector: (version, extractor)}, {'parse': мс, 'extract': мс}).
+    """
+    html = decode(data, encoding)
+    trace = CheckTrace()
+    with tracing(trace):
+        versions = _parser.extract_versions_from_html(html, selectors)
+    return versions, {'parse': trace.phases['parse'], 'extract': trace.phases['extract']}
+
+
+def grandstream_index_from_bytes(data, encoding):
+    """
+    Індекс модель -> прошивка зі сторінки прошивок Grandstream.
+    Повертає (index, {'parse': мс}).
+    """
+    html = decode(data, encoding)
+    trace = CheckTrace()
+    with tracing(trace), trace.phase('parse'):
+        index = _parser.build_grandstream_index(html)
+    return index, {'parse': trace.phases['parse']}
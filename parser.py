@@ -1,229 +1,695 @@
-from urllib.parse import urlparse
 import requests
+from requests.adapters import HTTPAdapter
 import re
-from bs4 import BeautifulSoup
 from datetime import datetime
+import threading
 import time
+import codecs
+from collections import Counter
+from version_patterns import TEXT_VERSION_ENGINE, PAGE_VERSION_ENGINE
+from html_backend import get_backend
+from metrics import current_trace
+from resilience import ResilientFetcher
+from extractors import default_registry
+from coalescing import SingleFlight
+import parse_worker
+from concurrent.futures.process import BrokenProcessPool
+
+GRANDSTREAM_FIRMWARE_URL = "https://www.grandstream.com/support/firmware"
+# Мітка після обрізаного буфера (символ приватної зони Unicode)
+OPEN_ELEMENT_MARK = "\ue000"
+
+class SharedPage:
+    """Сторінка, завантажена один раз для кількох програм перевірки"""
+    __slots__ = ('response', 'document', 'data', 'cached', 'page_text', 'versions', 'lock')
+    
+    def __init__(self, response, document=None, cached=None, data=None):
+        self.response = response  # заголовки (валідатори) для кешу
+        self.document = document  # розібраний документ (розбір у потоках)
+        self.data = data  # байти сторінки (розбір у процесах parse_worker)
+        self.cached = cached or {}  # selector -> версія з кешу для 304
+        self.page_text = None
+        self.versions = {}  # selector -> (версія, екстрактор) з розбору в процесі
+        self.lock = threading.Lock()
 
 class VersionParser:
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, pool_size=10, db=None, config=None):
+        # БД для кешу валідаторів HTTP (необов'язково)
+        self.db = db
+        self.config = config or {}
+        # Бекенд розбору HTML з config.json (з відкатом на html.parser)
+        parsing = self.config.get('parsing', {})
+        self.html_backend = get_backend(parsing.get('html_backend', 'auto'))
+        # Потокове читання: зупинка після знайденої версії та ліміт розміру
+        self.streaming = parsing.get('streaming', True)
+        self.stream_max_bytes = parsing.get('stream_max_bytes', 2 * 1024 * 1024)
+        self.stream_probe_bytes = parsing.get('stream_probe_bytes', 64 * 1024)
+        # Розбір в окремих процесах (parse_worker.py); 0 - у потоці перевірки
+        self.parse_processes = parse_worker.process_count(parsing.get('parse_processes', 0))
+        session = requests.Session()
+        # Пул з'єднань розрахований на паралельні перевірки (див. checker.CheckEngine)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
         # Додаємо заголовки, щоб сайти думали, що це браузер
-        self.session.headers.update({
+        session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        # Тайм-аут, повторні спроби та запобіжник для хостів з config.json
+        self.fetcher = ResilientFetcher.from_config(session, self.config.get('checking', {}))
+        
+        # Спеціальні екстрактори за хостом (Grandstream, GitHub, Docker Hub)
+        self.extractors = default_registry()
+        
+        # Індекс прошивок Grandstream, спільний для всіх моделей у межах перевірки
+        self._grandstream_index = None
+        self._grandstream_lock = threading.Lock()
+        
+        # Спільні запити програм поточної перевірки (begin_run / end_run)
+        self.flights = None
+        # Ресурс -> селектори програм перевірки (спільна сторінка розбирається
+        # процесом пулу один раз для всіх них)
+        self.run_selectors = {}
+        self._selectors_lock = threading.Lock()
+    
+    @property
+    def parse_pool(self):
+        """Пул процесів розбору або None, якщо розбір виконується в потоці перевірки"""
+        if not self.parse_processes:
+            return None
+        return parse_worker.get_pool(self.parse_processes, self.html_backend.name)
+    
+    @property
+    def session(self):
+        """Сесія requests, через яку ходить fetcher"""
+        return self.fetcher.session
+    
+    @session.setter
+    def session(self, session):
+        self.fetcher.session = session
+    
+    def begin_run(self, programs=()):
+        """
+        Підготуватися до перевірки: однакові сторінки та запити до API
+        завантажуються один раз на всю перевірку. Програми можна передати
+        тут або додавати частинами (add_run_programs) в міру читання з БД.
+        """
+        self.flights = SingleFlight()
+        with self._selectors_lock:
+            self.run_selectors = {}
+        # Таблиця прошивок Grandstream - свіжа для кожної перевірки
+        with self._grandstream_lock:
+            self._grandstream_index = None
+        self.extractors.begin_run()
+        if programs:
+            self.add_run_programs(programs)
+    
+    def add_run_programs(self, programs):
+        """
+        Врахувати програми перевірки: спільні ресурси та пакетні запити
+        до API (GitHub GraphQL) для цієї частини програм
+        """
+        programs = list(programs)
+        if self.flights is not None:
+            resources = [self.extractors.resource_for(program) for program in programs]
+            self.flights.add(resources)
+            if self.parse_processes:
+                with self._selectors_lock:
+                    for resource, program in zip(resources, programs):
+                        if resource is not None:
+                            self.run_selectors.setdefault(resource, set()).add(program.version_selector or "")
+        self.prefetch(programs)
+    
+    def finish_run_program(self, program):
+        """Перевірку програми завершено - її частка спільного ресурсу звільняється"""
+        flights = self.flights
+        if flights is not None:
+            resource = self.extractors.resource_for(program)
+            flights.done(resource)
+            if not flights.pending(resource):
+                with self._selectors_lock:
+                    self.run_selectors.pop(resource, None)
+    
+    def end_run(self):
+        """Звільнити спільні сторінки перевірки"""
+        flights, self.flights = self.flights, None
+        if flights is not None and flights.saved:
+            print(f"🔗 Об'єднано запитів до однакових адрес: {flights.saved}")
+    
+    def prefetch(self, programs):
+        """Пакетні запити до API для програм майбутньої перевірки"""
+        self.extractors.prefetch(self, programs)
+    
+    def coalesce(self, key, load):
+        """
+        load() один раз для всіх програм перевірки з ресурсом key.
+        Повертає (результат, loaded); loaded = False - результат отримано
+        іншою програмою. Поза перевіркою (begin_run) load() викликається завжди.
+        """
+        flights = self.flights
+        if flights is None:
+            return load(), True
+        return flights.do(key, load)
+    
+    def get_version(self, program):
+        """Версія програми (ProgramRecord) через екстрактор її сайту"""
+        return self.extractors.fetch_version(self, program)
     
     def get_version_from_website(self, url, selector=None):
         """Отримати версію з веб-сайту"""
         try:
             print(f"Перевіряю {url}...")
-            
-            # Затримка, щоб не перевантажувати сайти
-            time.sleep(2)
-            
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()  # Перевірка на помилки HTTP
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Якщо задано CSS селектор
-            if selector and selector.strip():
-                element = soup.select_one(selector)
-                if element:
-                    text = element.get_text(strip=True)
-                    version = self.extract_version_from_text(text)
-                    if version:
-                        return version
-            
-            # Автоматичний пошук версії в тексті сторінки
-            # Пошук паттернів версій: v1.2.3, version 2.0, 3.1.4, etc.
-            patterns = [
-                r'\b(\d+(?:\.\d+){1,3})\b',  # 1.2, 1.2.3, 1.2.3.4, 1.0.7.79
-                r'v?(\d+\.\d+\.\d+)',  # 1.2.3
-                r'v?(\d+\.\d+)',       # 1.2
-                r'Version\s*[:]?\s*(\d+\.\d+\.\d+)',
-                r'Версія\s*[:]?\s*(\d+\.\d+\.\d+)',
-                r'(\d{4}\.\d+\.\d+)',  # 2023.1.0
-            ]
-            
-            page_text = soup.get_text()
-            for pattern in patterns:
-                matches = re.findall(pattern, page_text, re.IGNORECASE)
-                if matches:
-                    # Беремо перше знайдене число як найімовірнішу версію
-                    for match in matches:
-                        if len(match) > 2:  # Мінімум 1.2
-                            return match
-            
-            return None
+            flights = self.flights
+            if flights is not None and flights.shared(url):
+                # Сторінка потрібна кільком програмам перевірки
+                return self.get_version_from_shared_page(url, selector)
+            return self.fetch_page_version(url, selector)
             
         except requests.RequestException as e:
             print(f"Помилка при отриманні {url}: {e}")
+            current_trace().error = str(e)
             return None
         except Exception as e:
             print(f"Невідома помилка: {e}")
+            current_trace().error = str(e)
             return None
     
+    def fetch_page_version(self, url, selector=None):
+        """Завантажити сторінку для однієї програми та знайти версію"""
+        trace = current_trace()
+        with trace.phase('request'):
+            response, cached_version = self.conditional_get(url, selector, stream=self.streaming)
+        trace.http_status = response.status_code
+        # Потокова відповідь тримає з'єднання пулу, доки її не закрито
+        try:
+            if cached_version:
+                # 304 Not Modified - сторінка не змінилася, HTML не розбираємо
+                print(f"♻️ {url} не змінився, версія з кешу: {cached_version}")
+                trace.cache_hit = True
+                trace.extractor = 'http_cache'
+                return cached_version
+            response.raise_for_status()  # Перевірка на помилки HTTP
+            
+            if self.parse_processes:
+                data, version = self.read_raw(response, selector)
+                if not version:
+                    version = self.extract_in_worker(data, response.encoding, selector)
+            else:
+                html, version = self.read_body(response, selector)
+                if not version:
+                    version = self.extract_version_from_html(html, selector)
+        finally:
+            response.close()
+        if version:
+            self.remember_validators(url, selector, response, version)
+        return version
+    
+    def get_version_from_shared_page(self, url, selector=None):
+        """Версія за селектором програми зі сторінки, спільної для кількох програм"""
+        page, loaded = self.coalesce(url, lambda: self.load_shared_page(url))
+        trace = current_trace()
+        trace.http_status = page.response.status_code
+        if not loaded:
+            # Сторінку завантажила й розібрала інша програма цієї перевірки
+            trace.cache_hit = True
+        
+        if page.response.status_code == 304:
+            # 304 Not Modified для всієї сторінки
+            version = page.cached.get(selector or "")
+            if not version:
+                # Для цього селектора версії в кеші немає - потрібне тіло сторінки
+                return self.fetch_page_version(url, selector)
+            trace.cache_hit = True
+            trace.extractor = 'http_cache'
+            return version
+        
+        # Документ спільний для потоків, тому вибірки з нього - по черзі
+        with page.lock:
+            if page.data is not None:
+                # Документ не передати між процесами: версії для всіх селекторів
+                # сторінки знайдено під час завантаження одним розбором у пулі;
+                # селектор програми, доданої до перевірки пізніше, - окремим
+                key = selector or ""
+                if key not in page.versions:
+                    page.versions.update(self.extract_versions_in_worker(
+                        page.data, page.response.encoding, [key]))
+                version, extractor = page.versions[key]
+            else:
+                version, extractor = self.version_from_page(page, selector)
+        if extractor:
+            trace.extractor = extractor
+        if version:
+            self.remember_validators(url, selector, page.response, version)
+        return version
+    
+    def load_shared_page(self, url):
+        """
+        Завантажити та розібрати сторінку для кількох програм.
+        
+        Сторінка читається повністю (до stream_max_bytes): рання зупинка за
+        селектором однієї програми не підходить іншим. Якщо всі збережені
+        версії сторінки мають однакові валідатори, запит умовний - відповідь
+        304 віддає кожній програмі її версію з кешу.
+        """
+        trace = current_trace()
+        entries = self.db.get_http_cache_entries(url) if self.db else {}
+        validators = Counter((etag, last_modified) for etag, last_modified, version in entries.values()
+                             if version and (etag or last_modified))
+        headers = {}
+        if len(validators) == 1:
+            etag, last_modified = next(iter(validators))
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        with trace.phase('request'):
+            response = self.fetcher.get(url, headers=headers, stream=self.streaming)
+        trace.http_status = response.status_code
+        if response.status_code == 304 and headers:
+            response.close()
+            print(f"♻️ {url} не змінився, версії з кешу для {len(entries)} селекторів")
+            return SharedPage(response, cached={selector: entry[2] for selector, entry in entries.items()})
+        try:
+            response.raise_for_status()
+        except requests.HTTPError:
+            response.close()
+            raise
+        
+        if self.parse_processes:
+            data, _ = self.read_raw(response, probe=False)
+            page = SharedPage(response, data=data)
+            with self._selectors_lock:
+                selectors = list(self.run_selectors.get(url, ()))
+            if selectors:
+                page.versions = self.extract_versions_in_worker(data, response.encoding, selectors)
+            return page
+        html, _ = self.read_body(response, probe=False)
+        with trace.phase('parse'):
+            document = self.html_backend.parse(html)
+        return SharedPage(response, document)
+    
+    def read_body(self, response, selector=None, probe=True):
+        """
+        Прочитати тіло відповіді частинами.
+        
+        Після кожної "проби" (розмір між пробами подвоюється, тому сумарна
+        робота лінійна) частковий документ перевіряється селектором або
+        шаблонами версій. Якщо версію знайдено, читання припиняється.
+        Читання також зупиняється на stream_max_bytes.
+        probe=False - читати без проб (сторінка потрібна повністю).
+        Повертає (html, version); version = None, якщо рано зупинитися не вдалося.
+        """
+        trace = current_trace()
+        if not self.streaming:
+            with trace.phase('download'):
+                html = response.text
+            trace.bytes = len(response.content)
+            return html, None
+        
+        decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        parts = []
+        size = 0
+        next_probe = self.stream_probe_bytes
+        # Час проб входить у parse / extract, тому з download його віднімаємо
+        started = time.perf_counter()
+        probe_ms = 0.0
+        try:
+            for chunk in response.iter_content(chunk_size=16384):
+                size += len(chunk)
+                parts.append(decoder.decode(chunk))
+                if size >= self.stream_max_bytes:
+                    print(f"✂️ {response.url}: досягнуто ліміту {self.stream_max_bytes} байт")
+                    break
+                if probe and size >= next_probe:
+                    next_probe = size * 2
+                    html = ''.join(parts)
+                    parts = [html]
+                    probe_started = time.perf_counter()
+                    version = self.probe_partial_html(html, selector)
+                    probe_ms += (time.perf_counter() - probe_started) * 1000
+                    if version:
+                        trace.extractor = 'stream_probe'
+                        return html, version
+            else:
+                parts.append(decoder.decode(b'', final=True))
+        finally:
+            response.close()
+            trace.bytes = size
+            trace.add_phase('download', (time.perf_counter() - started) * 1000 - probe_ms)
+        return ''.join(parts), None
+    
+    def read_raw(self, response, selector=None, probe=True):
+        """
+        Як read_body, але тіло залишається байтами для процесів розбору:
+        проби й пошук версії виконуються в пулі (extract_in_worker).
+        Повертає (data, version).
+        """
+        trace = current_trace()
+        if not self.streaming:
+            with trace.phase('download'):
+                data = response.content
+            trace.bytes = len(data)
+            return data, None
+        
+        data = bytearray()
+        next_probe = self.stream_probe_bytes
+        started = time.perf_counter()
+        probe_ms = 0.0
+        try:
+            for chunk in response.iter_content(chunk_size=16384):
+                data += chunk
+                if len(data) >= self.stream_max_bytes:
+                    print(f"✂️ {response.url}: досягнуто ліміту {self.stream_max_bytes} байт")
+                    break
+                if probe and len(data) >= next_probe:
+                    next_probe = len(data) * 2
+                    probe_started = time.perf_counter()
+                    version = self.extract_in_worker(bytes(data), response.encoding, selector, partial=True)
+                    probe_ms += (time.perf_counter() - probe_started) * 1000
+                    if version:
+                        trace.extractor = 'stream_probe'
+                        return bytes(data), version
+        finally:
+            response.close()
+            trace.bytes = len(data)
+            trace.add_phase('download', (time.perf_counter() - started) * 1000 - probe_ms)
+        return bytes(data), None
+    
+    def extract_versions_in_worker(self, data, encoding, selectors):
+        """
+        Версії для кількох селекторів з одного розбору сторінки процесом пулу:
+        {selector: (version, extractor)}. Якщо пул зламався - у поточному потоці.
+        """
+        trace = current_trace()
+        pool = self.parse_pool
+        try:
+            versions, phases = pool.submit(
+                parse_worker.extract_many_from_bytes, data, encoding, selectors).result()
+        except BrokenProcessPool as e:
+            print(f"⚠️ Процес розбору HTML завершився аварійно ({e}), розбираю в потоці перевірки")
+            parse_worker.discard_pool(pool)
+            return self.extract_versions_from_html(parse_worker.decode(data, encoding), selectors)
+        for name, milliseconds in phases.items():
+            trace.add_phase(name, milliseconds)
+        return versions
+    
+    def extract_in_worker(self, data, encoding, selector=None, partial=False):
+        """
+        Знайти версію в байтах сторінки процесом пулу (parse_worker).
+        Якщо пул зламався, версія шукається в поточному потоці.
+        """
+        trace = current_trace()
+        pool = self.parse_pool
+        try:
+            version, phases, extractor = pool.submit(
+                parse_worker.extract_from_bytes, data, encoding, selector, partial).result()
+        except BrokenProcessPool as e:
+            print(f"⚠️ Процес розбору HTML завершився аварійно ({e}), розбираю в потоці перевірки")
+            parse_worker.discard_pool(pool)
+            html = parse_worker.decode(data, encoding)
+            if partial:
+                return self.probe_partial_html(html, selector)
+            return self.extract_version_from_html(html, selector)
+        for name, milliseconds in phases.items():
+            trace.add_phase(name, milliseconds)
+        if extractor and not partial:
+            trace.extractor = extractor
+        return version
+    
+    def probe_partial_html(self, html, selector=None):
+        """Спробувати знайти остаточну версію в початку документа"""
+        # Відкидаємо недочитаний хвіст, щоб не взяти обірване "1.2" замість "1.2.3"
+        html = html[:html.rfind('>') + 1]
+        if not html:
+            return None
+        trace = current_trace()
+        
+        if selector and selector.strip():
+            # Текст після обрізу потрапляє в елементи, ще не закриті в буфері:
+            # якщо він опинився в знайденому елементі, його вміст ще не дочитано
+            with trace.phase('parse'):
+                text = self.html_backend.select_text(html + OPEN_ELEMENT_MARK, selector)
+            if text and OPEN_ELEMENT_MARK in text:
+                return None
+            with trace.phase('extract'):
+                return self.extract_version_from_text(text)
+        
+        # Без селектора: зупиняємось лише на збігу найвищого пріоритету,
+        # після якого ще є текст (його вже не може перебити пізніший збіг)
+        with trace.phase('parse'):
+            page_text = self.html_backend.parse(html).page_text()
+        with trace.phase('extract'):
+            found = PAGE_VERSION_ENGINE.search(page_text)
+        if found and found[0] == 1 and found[2] < len(page_text.rstrip()):
+            return found[1]
+        return None
+    
+    def conditional_get(self, url, selector=None, timeout=None, stream=False, headers=None):
+        """
+        GET з заголовками If-None-Match / If-Modified-Since з кешу в БД.
+        
+        Повертає (response, cached_version). cached_version не порожня лише
+        тоді, коли сервер відповів 304 і в кеші є раніше знайдена версія.
+        headers - додаткові заголовки запиту (наприклад, для API).
+        """
+        cached = self.db.get_http_cache(url, selector) if self.db else None
+        validators = {}
+        if cached and cached[2]:
+            etag, last_modified, _ = cached
+            if etag:
+                validators['If-None-Match'] = etag
+            if last_modified:
+                validators['If-Modified-Since'] = last_modified
+        
+        response = self.fetcher.get(url, timeout=timeout, headers={**(headers or {}), **validators},
+                                    stream=stream)
+        if response.status_code == 304 and validators:
+            return response, cached[2]
+        return response, None
+    
+    def remember_validators(self, url, selector, response, version):
+        """Зберегти ETag / Last-Modified відповіді разом зі знайденою версією"""
+        if not self.db:
+            return
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            self.db.save_http_cache(url, selector, etag, last_modified, version, wait=False)
+    
+    def version_from_page(self, page, selector=None):
+        """
+        Версія за селектором з розібраної спільної сторінки: (version, extractor).
+        Текст сторінки для пошуку без селектора обчислюється один раз.
+        """
+        trace = current_trace()
+        if selector and selector.strip():
+            with trace.phase('parse'):
+                text = page.document.select_text(selector)
+            with trace.phase('extract'):
+                version = self.extract_version_from_text(text)
+            if version:
+                return version, 'selector'
+        if page.page_text is None:
+            with trace.phase('parse'):
+                page.page_text = page.document.page_text()
+        with trace.phase('extract'):
+            version = PAGE_VERSION_ENGINE.extract(page.page_text)
+        return version, 'page_text' if version else None
+    
+    def extract_versions_from_html(self, html, selectors):
+        """Версії для кількох селекторів з одного розбору HTML: {selector: (version, extractor)}"""
+        with current_trace().phase('parse'):
+            page = SharedPage(None, self.html_backend.parse(html))
+        return {selector: self.version_from_page(page, selector) for selector in selectors}
+    
+    def extract_version_from_html(self, html, selector=None):
+        """Знайти версію в HTML: спочатку за селектором, потім у тексті сторінки"""
+        backend = self.html_backend
+        has_selector = bool(selector and selector.strip())
+        trace = current_trace()
+        
+        # Якщо задано CSS селектор - розбираємо лише потрібну частину документа
+        if has_selector:
+            with trace.phase('parse'):
+                text = backend.select_text(html, selector)
+            with trace.phase('extract'):
+                version = self.extract_version_from_text(text)
+            if version:
+                trace.extractor = 'selector'
+                return version
+        
+        with trace.phase('parse'):
+            document = backend.parse(html)
+        if has_selector and backend.scoped:
+            # Частковий розбір міг не знайти елемент - повторюємо на повному дереві
+            with trace.phase('parse'):
+                text = document.select_text(selector)
+            with trace.phase('extract'):
+                version = self.extract_version_from_text(text)
+            if version:
+                trace.extractor = 'selector_full'
+                return version
+        
+        # Автоматичний пошук версії в тексті сторінки
+        # Пошук паттернів версій: v1.2.3, version 2.0, 3.1.4, etc.
+        # (шаблони скомпільовані в version_patterns, пошук за один прохід)
+        with trace.phase('parse'):
+            page_text = document.page_text()
+        with trace.phase('extract'):
+            version = PAGE_VERSION_ENGINE.extract(page_text)
+        if version:
+            trace.extractor = 'page_text'
+        return version
+    
     def get_grandstream_version(self, model_name):
         """
         Спеціальна функція для отримання версії прошивки з сайту Grandstream
         за конкретною моделлю пристрою.
         
+        Сторінка прошивок завантажується один раз за перевірку (на екземпляр
+        парсера), далі кожен пошук - це звернення до словника.
+        
         Приклад використання:
             get_grandstream_version("GXP1625")
             get_grandstream_version("GXW4232")
         """
-        url = "https://www.grandstream.com/support/firmware"
-        print(f"🔍 Отримую дані для моделі {model_name} з {url}")
+        index = self.get_grandstream_index()
+        key = self.normalize_grandstream_model(model_name)
+        current_trace().extractor = 'grandstream_index'
+        
+        version = index.get(key)
+        if version is None:
+            # "GXP1625V2" -> "GXP1625"
+            base_model = re.match(r'[A-Z]+\d+', key)
+            if base_model:
+                version = index.get(base_model.group(0))
         
+        if version:
+            print(f"✅ Знайдено версію для {model_name}: {version}")
+        else:
+            print(f"❌ Модель {model_name} не знайдена на сторінці")
+        return version
+    
+    def get_grandstream_index(self):
+        """Отримати індекс модель -> прошивка (завантажується один раз)"""
+        with self._grandstream_lock:
+            if self._grandstream_index is None:
+                url = GRANDSTREAM_FIRMWARE_URL
+                print(f"🔍 Завантажую таблицю прошивок Grandstream з {url}")
+                trace = current_trace()
+                try:
+                    with trace.phase('request'):
+                        response = self.fetcher.get(url)
+                    trace.http_status = response.status_code
+                    response.raise_for_status()
+                    if self.parse_processes:
+                        # Найбільша сторінка перевірки - розбір у процесі пулу
+                        with trace.phase('download'):
+                            data = response.content
+                        trace.bytes = len(data)
+                        self._grandstream_index = self.grandstream_index_in_worker(data, response.encoding)
+                    else:
+                        with trace.phase('download'):
+                            html = response.text
+                        trace.bytes = len(response.content)
+                        with trace.phase('parse'):
+                            self._grandstream_index = self.build_grandstream_index(html)
+                    print(f"✅ Індекс Grandstream: {len(self._grandstream_index)} моделей")
+                except Exception as e:
+                    print(f"❌ Помилка при парсингу Grandstream: {e}")
+                    trace.error = str(e)
+                    # Не повторюємо запит для кожної моделі в межах цієї перевірки
+                    self._grandstream_index = {}
+            return self._grandstream_index
+    
+    def grandstream_index_in_worker(self, data, encoding):
+        """Індекс Grandstream процесом пулу; якщо пул зламався - у поточному потоці"""
+        trace = current_trace()
+        pool = self.parse_pool
         try:
-            # Завантажуємо сторінку
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
+            index, phases = pool.submit(parse_worker.grandstream_index_from_bytes, data, encoding).result()
+        except BrokenProcessPool as e:
+            print(f"⚠️ Процес розбору HTML завершився аварійно ({e}), розбираю в потоці перевірки")
+            parse_worker.discard_pool(pool)
+            with trace.phase('parse'):
+                return self.build_grandstream_index(parse_worker.decode(data, encoding))
+        for name, milliseconds in phases.items():
+            trace.add_phase(name, milliseconds)
+        return index
+    
+    @staticmethod
+    def normalize_grandstream_model(model_name):
+        """Нормалізувати назву моделі: 'gxp 1625' -> 'GXP1625'"""
+        return re.sub(r'[\s\-]+', '', model_name or '').upper()
+    
+    @staticmethod
+    def expand_grandstream_models(models_text):
+        """
+        Розгорнути запис моделей з таблиці у список окремих моделей.
+        
+        "GXP1620/1625"        -> ["GXP1620", "GXP1625"]
+        "GXW4216/GXW4224"     -> ["GXW4216", "GXW4224"]
+        "GRP2612, GRP2613"    -> ["GRP2612", "GRP2613"]
+        """
+        models = []
+        prefix = None
+        for token in re.split(r'[/,;&]|\s+', models_text.upper()):
+            token = token.strip().replace('-', '')
+            if not token:
+                continue
+            full_model = re.fullmatch(r'([A-Z]+)(\d+[A-Z0-9]*)', token)
+            if full_model:
+                prefix = full_model.group(1)
+                models.append(token)
+            elif prefix and re.fullmatch(r'\d+[A-Z0-9]*', token):
+                # Скорочений запис: "1625" в "GXP1620/1625"
+                models.append(prefix + token)
+        return models
+    
+    def build_grandstream_index(self, html):
+        """Побудувати словник модель -> версія прошивки зі сторінки Grandstream"""
+        soup = self.html_backend.make_soup(html)
+        index = {}
+        
+        for row in soup.find_all('tr'):
+            # Перша комірка в рядку зазвичай містить назви моделей
+            all_cells = row.find_all('td')
+            if not all_cells:
+                continue
             
-            # Знаходимо ВСІ таблиці на сторінці
-            tables = soup.find_all('table')
+            models = self.expand_grandstream_models(all_cells[0].get_text(" ", strip=True))
+            if not models:
+                continue
             
-            # Нормалізуємо назву моделі для пошуку
-            search_model = model_name.upper().replace(" ", "")
+            version = None
+            # Версія зазвичай знаходиться в другій або третій комірці
+            for cell in all_cells[1:]:
+                version = self.extract_version_from_text(cell.get_text(strip=True))
+                if version:
+                    break
             
-            for table in tables:
-                # Шукаємо рядки таблиці
-                rows = table.find_all('tr')
-                
-                for row in rows:
-                    # Перша комірка в рядку зазвичай містить назви моделей
-                    first_cell = row.find('td')
-                    if not first_cell:
-                        continue
-                    
-                    # Отримуємо текст комірки з моделями
-                    models_text = first_cell.get_text(strip=True).upper()
-                    
-                    # Перевіряємо, чи наш пристрій вказаний у цьому списку
-                    # Враховуємо формати запису: "GXP1610/1615", "GXP1620/1625"
-                    # Створюємо список можливих назв для пошуку
-                    possible_names = [search_model]
-                    
-                    # Якщо шукаємо GXP1625, додамо також GXP1620/1625
-                    if "/" not in search_model:
-                        # Додаємо варіант із слешем (для пошуку в рядках типу "GXP1620/1625")
-                        base_model = re.match(r'([A-Z]+)\d+', search_model)
-                        if base_model:
-                            base = base_model.group(1)  # "GXP"
-                            possible_names.append(base)
-                    
-                    # Флаг знаходження моделі
-                    model_found = False
-                    for name in possible_names:
-                        if name and name in models_text:
-                            model_found = True
+            # Якщо в комірках не знайшли чіткої версії, дивимось посилання
+            if not version:
+                for cell in all_cells[1:]:
+                    for link in cell.find_all('a'):
+                        version = self.extract_version_from_text(link.get_text(strip=True))
+                        if version:
                             break
-                    
-                    if model_found:
-                        # Знайшли рядок з нашою моделлю
-                        # Тепер шукаємо версію прошивки в цьому рядку
-                        all_cells = row.find_all('td')
-                        
-                        # Версія зазвичай знаходиться в другій або третій комірці
-                        for i, cell in enumerate(all_cells[1:], start=1):  # Починаємо з другої комірки
-                            cell_text = cell.get_text(strip=True)
-                            
-                            # Шукаємо номер версії в тексті комірки
-                            version = self.extract_version_from_text(cell_text)
-                            if version:
-                                print(f"✅ Знайдено версію для {model_name}: {version}")
-                                return version
-                        
-                        # Якщо в комірках не знайшли чіткої версії, дивимось посилання
-                        for cell in all_cells[1:]:
-                            links = cell.find_all('a')
-                            for link in links:
-                                link_text = link.get_text(strip=True)
-                                version = self.extract_version_from_text(link_text)
-                                if version:
-                                    print(f"✅ Знайдено версію для {model_name} в посиланні: {version}")
-                                    return version
-            
-            # Якщо не знайшли конкретну модель, повертаємо None
-            print(f"❌ Модель {model_name} не знайдена на сторінці")
-            return None
+                    if version:
+                        break
             
-        except Exception as e:
-            print(f"❌ Помилка при парсингу Grandstream: {e}")
-            return None
+            if version:
+                for model in models:
+                    # Як і раніше, перший рядок з моделлю має пріоритет
+                    index.setdefault(model, version)
+        
+        return index
 
     def extract_version_from_text(self, text):
         """Витягнути номер версії з тексту"""
-        patterns = [
-                # 1. Версії з префіксом (v, version, версія)
-                r'(?:v|version|версія|вірсія|release|реліз|build|білд)\s*[:=]?\s*v?(\d+(?:\.\d+)+)',
-                
-                # 2. Версії з 2-6 частинами (1.0, 1.0.7, 1.0.7.79, 1.0.7.79.1)
-                r'\b(\d+(?:\.\d+){1,5})\b',
-                
-                # 3. Версії з датами (2024.01.15.1)
-                r'\b(\d{4}(?:\.\d+){1,3})\b',
-                
-                # 4. Версії в дужках/квадратних дужках
-                r'[\[(]v?(\d+(?:\.\d+)+)[])]',
-                
-                # 5. Версії з буквами (1.0.7a, 2.0-beta, 3.1.4-rc1)
-                r'\b(\d+(?:\.\d+)+[a-zA-Z]*(?:-\w+)?)\b',
-                
-                # 6. Версії з роздільниками _ і -
-                r'\b(\d+(?:[_.-]\d+)+)\b',
-                
-                # 7. Просто числа більше 1000 (може бути версією)
-                r'\b(20\d{2}|\d{4,})\b',  # 2024, 12345
-            ]
-        
-
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(1)
-        
-        return None
-    
-    def check_specific_sites(self, url, name):
-        """Спеціальні правила для популярних сайтів"""
-        domain = urlparse(url).netloc.lower()
-        
-        # Grandstream
-        if 'grandstream.com' in domain:
-            # Тут ми не можемо визначити модель з URL, тому повертаємо None
-            # Конкретна модель буде визначатися в основній програмі
-            return None
-
-        # Для GitHub
-        if 'github.com' in url:
-            try:
-                # Формуємо API URL для GitHub
-                repo_path = url.replace('https://github.com/', '')
-                api_url = f"https://api.github.com/repos/{repo_path}/releases/latest"
-                response = self.session.get(api_url, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    return data.get('tag_name', '').replace('v', '')
-            except:
-                pass
-        
-        # Для Docker Hub
-        elif 'hub.docker.com' in url:
-            try:
-                response = self.session.get(url, timeout=10)
-                soup = BeautifulSoup(response.text, 'html.parser')
-                # Пошук версії на Docker Hub
-                tag_elements = soup.select('.TagList__tag-name')
-                if tag_elements:
-                    return tag_elements[0].text.strip()
-            except:
-                pass
-        
-        return None
+        # Шаблони та їх пріоритети описані в version_patterns.TEXT_PATTERNS
+        return TEXT_VERSION_ENGINE.extract(text)
 
 # Тестування парсера
 if __name__ == "__main__":
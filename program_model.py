@@ -0,0 +1,280 @@
+"""
+Модель таблиці програм для QTableView.
+
+Рядки зберігаються як ProgramRecord. Текст, кольори та статус обчислюються
+в data() лише для комірок, які таблиця показує, тому зміна однієї програми
+оновлює один рядок, а не перебудовує всю таблицю.
+
+Індекс program_id -> рядок підтримується разом із сортуванням, вставками
+та видаленнями, тому пошук рядка за ID (сигнал кожної перевірки) - O(1).
+"""
+
+from datetime import datetime
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QColor
+
+COLUMNS = [
+    "ID", "Назва", "Категорія", "Поточна версія",
+    "Встановлена версія", "Остання перевірка", "Статус", "URL", "Активна"
+]
+
+COL_ID, COL_NAME, COL_CATEGORY, COL_CURRENT, COL_INSTALLED, COL_LAST_CHECK, \
+    COL_STATUS, COL_URL, COL_ACTIVE = range(len(COLUMNS))
+
+# Статус -> (фон, текст)
+STATUS_COLORS = {
+    "Не перевірено": (QColor(Qt.yellow), QColor(Qt.black)),
+    "Версія не вказана": (QColor(220, 220, 220), QColor(Qt.black)),
+    "Актуальна": (QColor(212, 237, 218), QColor(21, 87, 36)),
+    "Потрібно оновити": (QColor(248, 215, 218), QColor(114, 28, 36)),
+}
+ACTIVE_COLORS = (QColor(212, 237, 218), QColor(21, 87, 36))
+INACTIVE_COLORS = (QColor(220, 220, 220), QColor(108, 117, 125))
+
+
+def program_status(program):
+    """Статус оновлення програми"""
+    current = program.current_version or ""
+    installed = program.installed_version or ""
+    if not current:
+        return "Не перевірено"
+    if not installed:
+        return "Версія не вказана"
+    if current == installed:
+        return "Актуальна"
+    return "Потрібно оновити"
+
+
+def format_last_check(last_check):
+    if not last_check:
+        return "Ніколи"
+    try:
+        return datetime.strptime(last_check, "%Y-%m-%d %H:%M:%S").strftime("%d.%m.%Y %H:%M")
+    except (TypeError, ValueError):
+        return last_check
+
+
+# Колонка -> поле ProgramRecord для сортування
+SORT_FIELDS = {
+    COL_NAME: 'name', COL_CATEGORY: 'category', COL_CURRENT: 'current_version',
+    COL_INSTALLED: 'installed_version', COL_LAST_CHECK: 'last_check', COL_URL: 'url',
+}
+
+
+def sort_value(program, column):
+    """Значення для сортування за колонкою"""
+    if column == COL_ID:
+        return program.id
+    if column == COL_STATUS:
+        return program_status(program)
+    if column == COL_ACTIVE:
+        return 1 if program.is_active else 0
+    return getattr(program, SORT_FIELDS[column]) or ""
+
+
+class ProgramTableModel(QAbstractTableModel):
+    """Програми, за замовчуванням відсортовані за назвою (як get_all_programs)"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._programs = []
+        self._keys = []  # ключі сортування, паралельно до _programs
+        self._rows = {}  # program_id -> рядок
+        self._sort_column = COL_NAME
+        self._sort_order = Qt.AscendingOrder
+
+    # --- інтерфейс QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._programs)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        program = self._programs[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == COL_ID:
+                return str(program.id)
+            if column == COL_NAME:
+                return program.name
+            if column == COL_CATEGORY:
+                return program.category
+            if column == COL_CURRENT:
+                return program.current_version or "Не перевірено"
+            if column == COL_INSTALLED:
+                return program.installed_version or ""
+            if column == COL_LAST_CHECK:
+                return format_last_check(program.last_check)
+            if column == COL_STATUS:
+                return program_status(program)
+            if column == COL_URL:
+                url = program.url
+                return url[:37] + "..." if len(url) > 40 else url
+            if column == COL_ACTIVE:
+                return "Так" if program.is_active else "Ні"
+        elif role in (Qt.BackgroundRole, Qt.ForegroundRole):
+            if column == COL_STATUS:
+                colors = STATUS_COLORS[program_status(program)]
+            elif column == COL_ACTIVE:
+                colors = ACTIVE_COLORS if program.is_active else INACTIVE_COLORS
+            else:
+                return None
+            return colors[0] if role == Qt.BackgroundRole else colors[1]
+        elif role == Qt.ToolTipRole and column == COL_URL:
+            return program.url  # Повний URL при наведенні
+        elif role == Qt.TextAlignmentRole and column == COL_ACTIVE:
+            return Qt.AlignCenter
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Сортування за колонкою (викликається QTableView)"""
+        self.layoutAboutToBeChanged.emit()
+        old_ids = [program.id for program in self._programs]
+        self._sort_column = column
+        self._sort_order = order
+        self._programs.sort(key=self._sort_key, reverse=order == Qt.DescendingOrder)
+        self._keys = [self._sort_key(program) for program in self._programs]
+        self._reindex()
+
+        # Виділення та поточна комірка переходять разом з рядками
+        old_indexes = self.persistentIndexList()
+        new_indexes = []
+        for index in old_indexes:
+            new_row = self._rows[old_ids[index.row()]]
+            new_indexes.append(self.index(new_row, index.column()))
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
+
+    # --- зміни даних ---
+
+    def _sort_key(self, program):
+        # ID - для стабільного порядку однакових значень
+        return (sort_value(program, self._sort_column), program.id)
+
+    def _reindex(self, start=0, end=None):
+        """Перебудувати індекс ID -> рядок для рядків [start, end)"""
+        if start == 0 and end is None:
+            self._rows = {}
+        for row in range(start, len(self._programs) if end is None else end):
+            self._rows[self._programs[row].id] = row
+
+    def _position_for(self, key, exclude_row=None):
+        """Рядок, на який стане програма з ключем key (без рядка exclude_row)"""
+        descending = self._sort_order == Qt.DescendingOrder
+
+        def goes_before(other):
+            return other >= key if descending else other <= key
+
+        low, high = 0, len(self._keys)
+        while low < high:
+            middle = (low + high) // 2
+            if goes_before(self._keys[middle]):
+                low = middle + 1
+            else:
+                high = middle
+        if exclude_row is not None and goes_before(self._keys[exclude_row]):
+            low -= 1
+        return low
+
+    def set_programs(self, programs):
+        """Повністю замінити вміст (початкове завантаження)"""
+        self.beginResetModel()
+        self._programs = sorted(programs, key=self._sort_key,
+                                reverse=self._sort_order == Qt.DescendingOrder)
+        self._keys = [self._sort_key(program) for program in self._programs]
+        self._reindex()
+        self.endResetModel()
+
+    def program_at(self, row):
+        return self._programs[row]
+
+    def programs(self):
+        return list(self._programs)
+
+    def row_of(self, program_id):
+        """Рядок програми або -1"""
+        return self._rows.get(program_id, -1)
+
+    def _insert_row(self, program):
+        key = self._sort_key(program)
+        row = self._position_for(key)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._programs.insert(row, program)
+        self._keys.insert(row, key)
+        self._reindex(row)
+        self.endInsertRows()
+
+    def _replace_row(self, row, program):
+        """Замінити дані рядка; якщо змінився ключ сортування - перемістити рядок"""
+        key = self._sort_key(program)
+        if key != self._keys[row]:
+            new_row = self._position_for(key, exclude_row=row)
+            if new_row != row:
+                # Для переміщення вниз Qt очікує позицію до видалення рядка
+                destination = new_row + 1 if new_row > row else new_row
+                self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), destination)
+                del self._programs[row]
+                del self._keys[row]
+                self._programs.insert(new_row, program)
+                self._keys.insert(new_row, key)
+                self._reindex(min(row, new_row), max(row, new_row) + 1)
+                self.endMoveRows()
+                row = new_row
+            else:
+                self._keys[row] = key
+        self._programs[row] = program
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMNS) - 1))
+
+    def upsert_program(self, program):
+        """Додати програму або оновити її рядок"""
+        row = self.row_of(program.id)
+        if row < 0:
+            self._insert_row(program)
+        elif self._programs[row] != program:
+            self._replace_row(row, program)
+
+    def remove_program(self, program_id):
+        row = self.row_of(program_id)
+        if row < 0:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._programs[row]
+        del self._keys[row]
+        del self._rows[program_id]
+        self._reindex(row)
+        self.endRemoveRows()
+        return True
+
+    def update_version(self, program_id, version, checked_at=None):
+        """Оновити поточну версію та час перевірки після перевірки"""
+        row = self.row_of(program_id)
+        if row < 0:
+            return
+        checked_at = checked_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._replace_row(row, self._programs[row]._replace(current_version=version,
+                                                            last_check=checked_at))
+
+    def statistics(self):
+        """(всього, потребують оновлення, активних, остання перевірка)"""
+        need_update = 0
+        active = 0
+        last_check = None
+        for program in self._programs:
+            if program.is_active:
+                active += 1
+            if program_status(program) == "Потрібно оновити":
+                need_update += 1
+            if program.last_check and (last_check is None or program.last_check > last_check):
+                last_check = program.last_check
+        return len(self._programs), need_update, active, last_check
@@ -0,0 +1,120 @@
+"""
+Кеш програм у пам'яті поверх Database.
+
+ProgramRepository має ті самі методи читання й запису програм, що й
+Database, тому його можна передати замість БД у VersionChecker,
+CheckScheduler чи консольні команди. Усі програми читаються з SQLite один
+раз; записи йдуть у БД і одразу оновлюють кеш (або позначають запис
+застарілим, якщо нові значення відомі лише БД).
+"""
+
+import threading
+from datetime import datetime
+
+from database import DATE_FORMAT
+
+
+class ProgramRepository:
+    """Програми з БД, закешовані як ProgramRecord за ID"""
+
+    def __init__(self, db):
+        self.db = db
+        self._lock = threading.RLock()
+        self._records = None  # program_id -> ProgramRecord
+        self._stale = set()  # ID, які треба перечитати з БД
+
+    def __getattr__(self, name):
+        # Решта методів (кеш HTTP, flush, close_all_connections...) - як у БД
+        return getattr(self.db, name)
+
+    # --- кеш ---
+
+    def _ensure_loaded(self):
+        """Словник записів; викликається під self._lock"""
+        if self._records is None:
+            self._records = {record.id: record for record in self.db.get_all_programs()}
+            self._stale.clear()
+        elif self._stale:
+            for program_id in self._stale:
+                record = self.db.get_program_by_id(program_id)
+                if record is None:
+                    self._records.pop(program_id, None)
+                else:
+                    self._records[program_id] = record
+            self._stale.clear()
+        return self._records
+
+    def invalidate(self, program_id=None):
+        """Позначити запис (або весь кеш) застарілим"""
+        with self._lock:
+            if program_id is None:
+                self._records = None
+                self._stale.clear()
+            elif self._records is not None:
+                self._stale.add(program_id)
+
+    def _replace(self, program_id, **changes):
+        with self._lock:
+            records = self._ensure_loaded()
+            record = records.get(program_id)
+            if record is not None:
+                records[program_id] = record._replace(**changes)
+
+    # --- читання ---
+
+    def get_all_programs(self, category=None):
+        """Усі програми за назвою (як Database.get_all_programs)"""
+        with self._lock:
+            records = list(self._ensure_loaded().values())
+        if category:
+            records = [record for record in records if record.category == category]
+        records.sort(key=lambda record: (record.name, record.id))
+        return records
+
+    def get_active_programs(self, category=None):
+        return [record for record in self.get_all_programs(category) if record.is_active]
+
+    def get_program_by_id(self, program_id):
+        with self._lock:
+            return self._ensure_loaded().get(program_id)
+
+    # --- запис ---
+
+    def add_program(self, name, category, url, installed_version="", selector="", is_active=1):
+        program_id = self.db.add_program(name, category, url, installed_version, selector, is_active)
+        # created_at / updated_at заповнює БД
+        self.invalidate(program_id)
+        return program_id
+
+    def update_program(self, program_id, name, category, url, installed_version, selector, is_active):
+        result = self.db.update_program(program_id, name, category, url,
+                                        installed_version, selector, is_active)
+        self.invalidate(program_id)
+        return result
+
+    def update_version(self, program_id, new_version, wait=True):
+        now = datetime.now().strftime(DATE_FORMAT)
+        result = self.db.update_version(program_id, new_version, wait, checked_at=now)
+        self._replace(program_id, current_version=new_version, last_check=now, updated_at=now)
+        return result
+
+    def update_last_check(self, program_id, wait=True):
+        now = datetime.now().strftime(DATE_FORMAT)
+        result = self.db.update_last_check(program_id, wait, checked_at=now)
+        self._replace(program_id, last_check=now, updated_at=now)
+        return result
+
+    def update_installed_version(self, program_id, installed_version, wait=True):
+        result = self.db.update_installed_version(program_id, installed_version, wait)
+        self._replace(program_id, installed_version=installed_version)
+        return result
+
+    def set_program_active(self, program_id, is_active, wait=True):
+        result = self.db.set_program_active(program_id, is_active, wait)
+        self._replace(program_id, is_active=is_active)
+        return result
+
+    def delete_program(self, program_id):
+        result = self.db.delete_program(program_id)
+        self.invalidate(program_id)
+        return result
@@ -0,0 +1,257 @@
+"""
+Повторні спроби та запобіжник (circuit breaker) для HTTP-запитів парсера.
+
+Налаштування беруться з розділу "checking" config.json:
+    timeout_seconds               - тайм-аут одного запиту
+    retry_attempts                - кількість спроб (1 - без повторів)
+    retry_base_delay              - базова затримка між спробами, секунди;
+                                    далі подвоюється з кожною спробою
+    retry_max_delay_seconds       - максимальна затримка між спробами
+    circuit_breaker_threshold     - невдалих запитів поспіль (запит з усіма
+                                    його повторами - одна помилка), після
+                                    яких хост вимикається
+    circuit_breaker_reset_seconds - через скільки секунд пробувати хост знову
+"""
+
+import random
+import threading
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+# Тимчасові відповіді, після яких має сенс повторити запит
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class HostUnavailable(requests.ConnectionError):
+    """Хост вимкнено запобіжником - запит не виконувався"""
+
+
+class RateLimited(Exception):
+    """
+    Сервер вичерпав ліміт запитів до retry_at (timestamp).
+
+    Це не помилка перевірки: програму треба перевірити пізніше,
+    а не рахувати невдалою.
+    """
+
+    def __init__(self, host, retry_at):
+        self.host = host
+        self.retry_at = retry_at
+        until = datetime.fromtimestamp(retry_at).strftime('%H:%M:%S')
+        super().__init__(f"{host}: вичерпано ліміт запитів, повтор після {until}")
+
+
+def rate_limit_reset(response, now=None):
+    """
+    Час (timestamp), до якого сервер просить не надсилати запити, або None.
+
+    Враховуються Retry-After (секунди або HTTP-дата) та
+    X-RateLimit-Reset при X-RateLimit-Remaining: 0 (GitHub, Docker Hub).
+    HTTP 429 без заголовків - одна хвилина.
+    """
+    now = time.time() if now is None else now
+    headers = response.headers
+    retry_after = headers.get('Retry-After')
+    if retry_after:
+        try:
+            return now + max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return parsedate_to_datetime(retry_after).timestamp()
+            except (TypeError, ValueError):
+                pass
+    if headers.get('X-RateLimit-Remaining') == '0':
+        try:
+            return float(headers.get('X-RateLimit-Reset'))
+        except (TypeError, ValueError):
+            pass
+    if response.status_code == 429:
+        return now + 60
+    return None
+
+
+class RetryPolicy:
+    """Експоненційна затримка з випадковим зсувом (jitter)"""
+
+    def __init__(self, attempts=3, base_delay=2.0, max_delay=30.0, rng=None):
+        self.attempts = max(1, int(attempts))
+        self.base_delay = max(0.0, float(base_delay))
+        self.max_delay = max(self.base_delay, float(max_delay))
+        self.rng = rng or random.Random()
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Затримка перед спробою attempt + 1.
+
+        Половина затримки фіксована, половина випадкова, щоб паралельні
+        перевірки одного хоста не повторювали запити одночасно.
+        Retry-After сервера (у секундах) має пріоритет, але не більше max_delay.
+        """
+        if retry_after is not None:
+            try:
+                return min(self.max_delay, max(0.0, float(retry_after)))
+            except (TypeError, ValueError):
+                pass  # HTTP-дата замість секунд - рахуємо самі
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay / 2 + self.rng.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """
+    Запобіжник для кожного хоста.
+
+    Після failure_threshold помилок поспіль хост "відкривається": запити до
+    нього одразу завершуються HostUnavailable. Через reset_timeout один
+    пробний запит пропускається; успіх закриває запобіжник, помилка -
+    відкриває знову.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=3, reset_timeout=300.0, clock=time.monotonic):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._failures = {}  # хост -> помилок поспіль
+        self._opened_at = {}  # хост -> час відкриття
+        self._trial = set()  # хости, для яких виконується пробний запит
+
+    def state(self, host):
+        with self._lock:
+            return self._state(host)
+
+    def _state(self, host):
+        if host not in self._opened_at:
+            return self.CLOSED
+        if self.clock() - self._opened_at[host] >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self, host):
+        """Чи можна зараз надіслати запит до хоста"""
+        with self._lock:
+            state = self._state(host)
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and host not in self._trial:
+                self._trial.add(host)
+                return True
+            return False
+
+    def record_success(self, host):
+        with self._lock:
+            self._failures.pop(host, None)
+            self._opened_at.pop(host, None)
+            self._trial.discard(host)
+
+    def record_failure(self, host):
+        with self._lock:
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            if host in self._trial or failures >= self.failure_threshold:
+                if host not in self._opened_at or host in self._trial:
+                    print(f"🔌 {host}: {failures} помилок поспіль, запити тимчасово вимкнено")
+                self._opened_at[host] = self.clock()
+                self._trial.discard(host)
+
+    def release_trial(self, host):
+        """
+        Пробний запит завершився помилкою, що не свідчить про стан хоста
+        (невірний URL, забагато перенаправлень): наступний запит - знову пробний
+        """
+        with self._lock:
+            self._trial.discard(host)
+
+    def failures(self, host):
+        with self._lock:
+            return self._failures.get(host, 0)
+
+
+class ResilientFetcher:
+    """GET / POST через requests.Session з повторами та запобіжником"""
+
+    def __init__(self, session, policy=None, breaker=None, timeout=30, sleep=time.sleep):
+        self.session = session
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.timeout = timeout
+        self.sleep = sleep
+
+    @classmethod
+    def from_config(cls, session, checking=None):
+        """Створити з розділу "checking" config.json"""
+        checking = checking or {}
+        policy = RetryPolicy(
+            attempts=checking.get('retry_attempts', 3),
+            base_delay=checking.get('retry_base_delay', 2),
+            max_delay=checking.get('retry_max_delay_seconds', 30)
+        )
+        breaker = CircuitBreaker(
+            failure_threshold=checking.get('circuit_breaker_threshold', 3),
+            reset_timeout=checking.get('circuit_breaker_reset_seconds', 300)
+        )
+        return cls(session, policy, breaker, timeout=checking.get('timeout_seconds', 30))
+
+    def get(self, url, timeout=None, **kwargs):
+        return self.request('get', url, timeout, **kwargs)
+
+    def post(self, url, timeout=None, **kwargs):
+        return self.request('post', url, timeout, **kwargs)
+
+    def request(self, method, url, timeout=None, **kwargs):
+        """
+        Виконати запит методом сесії method ('get', 'post') з повторами.
+        Запобіжник рахує запит разом з його повторами як одну спробу: повтори
+        однієї нестабільної адреси не вимикають решту програм хоста.
+        """
+        host = urlparse(url).netloc.lower()
+        timeout = self.timeout if timeout is None else timeout
+        attempts = self.policy.attempts
+
+        if not self.breaker.allow(host):
+            raise HostUnavailable(
+                f"{host} недоступний ({self.breaker.failures(host)} помилок поспіль), запит пропущено")
+        for attempt in range(1, attempts + 1):
+            if attempt > 1 and self.breaker.state(host) == CircuitBreaker.OPEN:
+                # Поки чекали, хост вимкнули інші запити
+                raise HostUnavailable(f"{host} недоступний, повтори запиту {url} припинено")
+            try:
+                response = getattr(self.session, method)(url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == attempts:
+                    self.breaker.record_failure(host)
+                    raise
+                delay = self.policy.backoff(attempt)
+                print(f"🔁 {url}: {type(e).__name__}, спроба {attempt + 1}/{attempts} через {delay:.1f} с")
+                self.sleep(delay)
+                continue
+            except Exception:
+                # Без цього хост лишився б у пробному стані назавжди
+                self.breaker.release_trial(host)
+                raise
+
+            if response.status_code not in RETRY_STATUSES:
+                self.breaker.record_success(host)
+                return response
+
+            reset = rate_limit_reset(response)
+            if attempt == attempts or (response.status_code == 429 and reset is not None
+                                       and reset - time.time() > self.policy.max_delay):
+                # Остання спроба, або ліміт скинеться нескоро - чекати тут немає сенсу.
+                # 429 - хост працює, лише просить зачекати
+                if response.status_code >= 500:
+                    self.breaker.record_failure(host)
+                else:
+                    self.breaker.record_success(host)
+                return response
+            delay = self.policy.backoff(attempt, response.headers.get('Retry-After'))
+            print(f"🔁 {url}: HTTP {response.status_code}, спроба {attempt + 1}/{attempts} через {delay:.1f} с")
+            response.close()
+            self.sleep(delay)
@@ -0,0 +1,156 @@
+"""
+Планувальник автоматичних перевірок.
+
+Програми зберігаються в черзі з пріоритетом (heapq) за часом наступної
+перевірки: last_check + check_interval (години). Черга відновлюється з БД
+при кожному запуску, тому переживає перезапуск програми.
+"""
+
+import heapq
+import random
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from checker import get_host
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_timestamp(value):
+    """Рядок дати з БД -> timestamp або None"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, DATE_FORMAT).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class CheckScheduler:
+    """
+    Черга програм за часом наступної перевірки.
+
+    Щоб перевірки одного хоста не спрацьовували одночасно, до часу
+    додається зсув у межах jitter_seconds: програми хоста рівномірно
+    розподіляються по вікну, плюс невеликий випадковий зсув. Зсув залежить
+    лише від ID програми, тому не "пливе" між перезапусками.
+    """
+
+    def __init__(self, db, default_interval_minutes=1440, jitter_seconds=300):
+        self.db = db
+        self.default_interval = default_interval_minutes * 60
+        self.jitter_seconds = max(0, jitter_seconds)
+        self._heap = []  # (час, program_id)
+        self._due = {}  # program_id -> актуальний час (застарілі записи heap ігноруються)
+        self._jitter = {}  # program_id -> зсув, секунди
+        self._deferred = {}  # program_id -> не раніше (ліміт запитів API), переживає rebuild
+
+    def __len__(self):
+        return len(self._due)
+
+    def interval_for(self, check_interval_hours):
+        """Інтервал перевірки програми, секунди"""
+        if check_interval_hours and check_interval_hours > 0:
+            return check_interval_hours * 3600
+        return self.default_interval
+
+    def rebuild(self):
+        """Відновити чергу з БД (при старті та після масових змін)"""
+        self._heap = []
+        self._due = {}
+        self._jitter = {}
+
+        programs = self.db.get_active_programs()
+        by_host = defaultdict(list)
+        for program in programs:
+            by_host[get_host(program.url)].append(program.id)
+
+        for program_ids in by_host.values():
+            spacing = self.jitter_seconds / len(program_ids)
+            for rank, program_id in enumerate(sorted(program_ids)):
+                rng = random.Random(program_id)
+                self._jitter[program_id] = rank * spacing + rng.uniform(0, spacing)
+
+        for program in programs:
+            self.schedule(program)
+
+    def schedule(self, program, checked_at=None):
+        """Запланувати програму за її last_check та check_interval"""
+        program_id = program.id
+        if not program.is_active:
+            self.remove(program_id)
+            return
+
+        last_check = checked_at if checked_at is not None else parse_timestamp(program.last_check)
+        if last_check is None:
+            # Ніколи не перевірялась - якнайшвидше
+            due = time.time()
+        else:
+            due = last_check + self.interval_for(program.check_interval)
+
+        if program_id not in self._jitter:
+            self._jitter[program_id] = random.Random(program_id).uniform(0, self.jitter_seconds)
+        due += self._jitter[program_id]
+
+        if checked_at is not None:
+            self._deferred.pop(program_id, None)
+        deferred_until = self._deferred.get(program_id)
+        if deferred_until is not None:
+            if deferred_until > time.time():
+                due = max(due, deferred_until + self._jitter[program_id])
+            else:
+                del self._deferred[program_id]
+
+        self._due[program_id] = due
+        heapq.heappush(self._heap, (due, program_id))
+
+    def reschedule(self, program_id, checked_at=None):
+        """
+        Перепланувати програму за даними з БД (після додавання чи редагування).
+        Після перевірки (успішної чи ні) передається checked_at=time.time().
+        """
+        program = self.db.get_program_by_id(program_id)
+        if program is None:
+            self.remove(program_id)
+            return
+        self.schedule(program, checked_at)
+
+    def defer(self, program_id, until):
+        """
+        Відкласти перевірку до until (timestamp) - сервер вичерпав ліміт запитів.
+        До зсуву програми додається час скидання ліміту, щоб після нього
+        запити не пішли одночасно. Відкладення переживає rebuild.
+        """
+        if program_id not in self._jitter:
+            self._jitter[program_id] = random.Random(program_id).uniform(0, self.jitter_seconds)
+        self._deferred[program_id] = until
+        due = until + self._jitter[program_id]
+        self._due[program_id] = due
+        heapq.heappush(self._heap, (due, program_id))
+
+    def remove(self, program_id):
+        """Прибрати програму з черги (видалена або неактивна)"""
+        self._due.pop(program_id, None)
+
+    def _discard_stale(self):
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def next_due(self):
+        """Час найближчої перевірки або None"""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now=None, limit=None):
+        """Забрати з черги ID програм, час перевірки яких настав"""
+        now = time.time() if now is None else now
+        due_ids = []
+        while limit is None or len(due_ids) < limit:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            _, program_id = heapq.heappop(self._heap)
+            del self._due[program_id]
+            due_ids.append(program_id)
+        return due_ids
@@ -0,0 +1,148 @@
+# test_api_extractors.py
+import json
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from checker import CheckEngine, VersionChecker
+from database import Database, ProgramRecord
+from parser import VersionParser
+
+GITHUB_RELEASES = {"git/git": "v2.45.2", "psf/black": "24.4.2", "python/cpython": "v3.12.4"}
+RATE_LIMIT_RESET = int(time.time()) + 3600
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """Локальна заміна GitHub, Docker Hub та PyPI API"""
+    protocol_version = "HTTP/1.1"
+    log = []
+
+    def do_GET(self):
+        self.log.append(("GET", self.path, dict(self.headers)))
+        path = self.path.split("?")[0]
+        if path.startswith("/repos/limited/"):
+            self.send_json(403, {"message": "API rate limit exceeded"},
+                           {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(RATE_LIMIT_RESET)})
+        elif path.startswith("/repos/") and path.endswith("/releases/latest"):
+            repository = path[len("/repos/"):-len("/releases/latest")]
+            self.send_json(200, {"tag_name": GITHUB_RELEASES[repository]}, etag=f'"gh-{repository}"')
+        elif path == "/v2/repositories/library/nginx/tags":
+            tags = ["latest", "1.27.0-alpine", "1.27.0", "mainline", "1.26.2", "v1.9.15"]
+            self.send_json(200, {"results": [{"name": tag} for tag in tags]}, etag='"nginx-tags"')
+        elif path == "/pypi/requests/json":
+            self.send_json(200, {"info": {"name": "requests", "version": "2.32.3"}}, etag='"requests"')
+        else:
+            self.send_json(404, {"message": "Not Found"})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.log.append(("POST", self.path, dict(self.headers)))
+        variables = body["variables"]
+        data = {}
+        for key in variables:
+            if key.startswith("o"):
+                index = key[1:]
+                repository = f"{variables[key]}/{variables['n' + index]}"
+                tag = GITHUB_RELEASES.get(repository)
+                data["r" + index] = {"latestRelease": {"tagName": tag} if tag else None}
+        self.send_json(200, {"data": data})
+
+    def send_json(self, status, payload, headers=None, etag=None):
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api(monkeypatch, http_server):
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    ApiHandler.log = []
+    return http_server(ApiHandler)
+
+
+def use_api(parser, base_url):
+    for host in ("github.com", "hub.docker.com", "pypi.org"):
+        parser.extractors.resolve(f"https://{host}/").api_url = base_url
+
+
+def program(program_id, url, name="P"):
+    return ProgramRecord(program_id, name, "Програма", url)
+
+
+def test_github_rest_reuses_etag(api, tmp_path):
+    db = Database(str(tmp_path / "versions.db"))
+    parser = VersionParser(db=db)
+    use_api(parser, api)
+    git = program(1, "https://github.com/git/git/releases")
+
+    assert parser.get_version(git) == "2.45.2"
+    db.flush()
+    assert parser.get_version(git) == "2.45.2"
+    requests_seen = [entry for entry in ApiHandler.log if entry[1] == "/repos/git/git/releases/latest"]
+    assert len(requests_seen) == 2
+    assert requests_seen[1][2].get("If-None-Match") == '"gh-git/git"'
+    db.close_all_connections()
+
+
+def test_dockerhub_and_pypi_use_json_api(api):
+    parser = VersionParser()
+    use_api(parser, api)
+    assert parser.get_version(program(1, "https://hub.docker.com/_/nginx")) == "1.27.0"
+    assert parser.get_version(program(2, "https://pypi.org/project/requests/")) == "2.32.3"
+    assert [entry[1].split("?")[0] for entry in ApiHandler.log] == [
+        "/v2/repositories/library/nginx/tags", "/pypi/requests/json"]
+
+
+def test_github_graphql_batches_repositories(api, tmp_path):
+    db = Database(str(tmp_path / "versions.db"))
+    config = {'checking': {'github_token': "secret", 'collect_stats': False}}
+    checker = VersionChecker(db, config)
+    use_api(checker.parser, api)
+    checker.parser.extractors.resolve("https://github.com/").GRAPHQL_BATCH = 2
+    programs = [program(db.add_program(repository, "Програма", f"https://github.com/{repository}"),
+                        f"https://github.com/{repository}") for repository in GITHUB_RELEASES]
+
+    results = {result['program_id']: result['version'] for result in checker.check_programs(programs)}
+    assert sorted(results.values()) == ["2.45.2", "24.4.2", "3.12.4"]
+    # Три репозиторії пачками по два - два запити, без REST
+    assert [(method, path) for method, path, _ in ApiHandler.log] == [("POST", "/graphql")] * 2
+    assert all(headers["Authorization"] == "Bearer secret" for _, _, headers in ApiHandler.log)
+    db.close_all_connections()
+
+
+def test_rate_limit_defers_instead_of_failing(api, tmp_path):
+    db = Database(str(tmp_path / "versions.db"))
+    checker = VersionChecker(db)
+    use_api(checker.parser, api)
+    programs = [program(db.add_program(name, "Програма", f"https://github.com/limited/{name}"),
+                        f"https://github.com/limited/{name}") for name in ("x", "y")]
+
+    engine = CheckEngine(checker.fetch_version, max_workers=1, per_host_limit=1)
+    results = list(checker.check_programs(programs, engine))
+    assert all(result['deferred_until'] == RATE_LIMIT_RESET and 'error' not in result for result in results)
+    assert checker.deferred == {p.id: RATE_LIMIT_RESET for p in programs}
+    # Після першої відмови API більше не запитується, сторінка не розбирається
+    assert len(ApiHandler.log) == 1
+
+    _, cursor = db.get_connection()
+    cursor.execute("SELECT DISTINCT status FROM check_runs")
+    assert cursor.fetchall() == [("deferred",)]
+    assert db.get_program_by_id(programs[0].id).last_check is None
+    db.close_all_connections()
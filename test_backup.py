@@ -0,0 +1,113 @@
+# test_backup.py
+import gzip
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from backup import BackupManager
+from database import Database
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "versions.db"))
+    yield db
+    db.close_all_connections()
+
+
+def program_names(path):
+    connection = sqlite3.connect(path)
+    try:
+        assert connection.execute("PRAGMA integrity_check").fetchone() == ("ok",)
+        # Копія - самостійний файл, не в режимі WAL
+        assert connection.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+        return sorted(name for name, in connection.execute("SELECT name FROM programs"))
+    finally:
+        connection.close()
+
+
+def test_backup_is_consistent_while_writes_continue(db):
+    def fill(cursor):
+        cursor.executemany("INSERT INTO programs (name, category, url) VALUES (?, 'Програма', ?)",
+                           ((f"P{i}", f"http://host.test/{i}") for i in range(20000)))
+    db.execute_write(fill)
+
+    stop = threading.Event()
+    written = []
+
+    def writer():
+        while not stop.is_set():
+            written.append(db.add_program("Нова", "Програма", "http://new.test/"))
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    steps = []
+    try:
+        # Дрібні кроки: записи відбуваються між ними
+        backups = BackupManager(db, pages_per_step=16, sleep=0)
+        path = backups.backup(progress=lambda remaining, total: steps.append(total))
+    finally:
+        stop.set()
+        thread.join()
+
+    assert written and len(steps) > 10
+    # Знімок: копія не перезапускалась, хоча БД змінювалась
+    assert len(set(steps)) == 1
+    names = program_names(path)
+    assert names.count("P0") == 1 and len(names) >= 20000
+    assert os.path.dirname(path) == os.path.join(os.path.dirname(db.db_path), "backups")
+
+
+def test_rotation_and_compression(db, tmp_path):
+    db.add_program("GXP1625", "Прошивка", "http://grandstream.test/")
+    backups = BackupManager(db, str(tmp_path / "copies"), keep=2, compress=True)
+    start = datetime(2026, 1, 1, 9, 0, 0)
+    paths = [backups.backup(now=start + timedelta(days=day)) for day in range(4)]
+
+    assert [path for _, path in backups.list_backups()] == paths[:1:-1]
+    assert not any(os.path.exists(path) for path in paths[:2])
+    assert sorted(os.listdir(backups.folder)) == sorted(os.path.basename(path) for path in paths[2:])
+
+    restored = str(tmp_path / "restored.db")
+    with gzip.open(paths[-1], "rb") as source, open(restored, "wb") as target:
+        target.write(source.read())
+    assert program_names(restored) == ["GXP1625"]
+
+
+def test_is_due_and_failure_backoff(db, tmp_path):
+    backups = BackupManager(db, str(tmp_path / "copies"))
+    assert backups.is_due(7)
+    backups.backup(now=datetime(2026, 1, 1))
+    assert not backups.is_due(7, now=datetime(2026, 1, 7))
+    assert backups.is_due(7, now=datetime(2026, 1, 8))
+
+    # Папка недоступна для запису - копія не вдається, повтор не раніше ніж за годину
+    backups.folder = str(tmp_path / "versions.db")
+    with pytest.raises(OSError):
+        backups.backup()
+    assert not backups.is_due(0)
+    assert backups.is_due(0, now=datetime.now() + timedelta(hours=2))
+
+
+def test_background_backup_and_cli(db, tmp_path):
+    db.add_program("7-Zip", "Програма", "http://7zip.test/")
+    backups = BackupManager(db)
+    assert backups.start()
+    backups.wait()
+    assert len(backups.list_backups()) == 1
+    db.close_all_connections()
+
+    command = [sys.executable, "launcher.py", "backup", "--db", db.db_path, "--compress", "--keep", "1"]
+    result = subprocess.run(command, cwd=PROJECT_DIR, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    path = result.stdout.strip()
+    assert path.endswith(".db.gz") and os.path.exists(path)
+    # Залишилась лише щойно зроблена копія
+    assert [p for _, p in backups.list_backups()] == [path]
@@ -0,0 +1,138 @@
+# test_catalog_io.py
+import io
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+
+import pytest
+
+import catalog_io
+from database import Database
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "versions.db"))
+    yield db
+    db.close_all_connections()
+
+
+def test_import_upserts_by_name_and_url(db):
+    existing = db.add_program("GXP1625", "Прошивка", "http://grandstream.test/", "1.0.2", ".fw")
+    db.update_version(existing, "1.0.5")
+    rows = [
+        {"name": "GXP1625", "url": "http://grandstream.test/", "installed_version": "1.0.3",
+         "check_interval": "12", "is_active": "ні"},
+        {"name": "7-Zip", "url": "http://7zip.test/", "category": "Програма", "selector": "#ver"},
+        {"name": "", "url": "http://broken.test/"},
+        {"name": "Bad", "url": "http://bad.test/", "is_active": "можливо"},
+        # Той самий ключ пізніше у файлі - перемагає останній рядок
+        {"name": "7-Zip", "url": "http://7zip.test/", "installed_version": "23.01"},
+    ]
+    assert catalog_io.import_rows(db, rows) == {'read': 5, 'inserted': 1, 'updated': 1, 'skipped': 2}
+
+    updated = db.get_program_by_id(existing)
+    # Порожні поля файлу не затирають перевірену версію та селектор
+    assert (updated.installed_version, updated.current_version, updated.version_selector) == \
+        ("1.0.3", "1.0.5", ".fw")
+    assert (updated.check_interval, updated.is_active) == (12, 0)
+    new = [p for p in db.get_all_programs() if p.name == "7-Zip"]
+    assert len(new) == 1
+    assert (new[0].installed_version, new[0].version_selector, new[0].is_active) == ("23.01", "", 1)
+
+    # Повторний імпорт не створює дублікатів
+    catalog_io.import_rows(db, rows)
+    assert len(db.get_all_programs()) == 2
+
+
+@pytest.mark.parametrize("fmt", catalog_io.FORMATS)
+def test_round_trip_programs_and_history(db, tmp_path, fmt):
+    first = db.add_program("Клієнт", "Програма", "http://vendor.test/a", "1.0")
+    db.add_program("Сервер, \"LTS\"", "Програма", "http://vendor.test/b")
+    db.update_version(first, "1.1", checked_at="2026-01-01 10:00:00")
+    db.update_version(first, "1.2", checked_at="2026-02-01 10:00:00")
+
+    programs_file = str(tmp_path / f"programs.{fmt}")
+    history_file = str(tmp_path / f"history.{fmt}")
+    assert catalog_io.export_catalog(db, programs_file) == 2
+    assert catalog_io.export_catalog(db, history_file, "history") == 2
+
+    other = Database(str(tmp_path / "other.db"))
+    try:
+        assert catalog_io.import_catalog(other, programs_file)['inserted'] == 2
+        assert catalog_io.import_catalog(other, history_file, "history")['inserted'] == 2
+        # Наявні записи історії не дублюються
+        assert catalog_io.import_catalog(other, history_file, "history")['skipped'] == 2
+
+        def snapshot(database):
+            return sorted((p.name, p.url, p.current_version, p.installed_version, p.last_check)
+                          for p in database.get_all_programs())
+        assert snapshot(other) == snapshot(db)
+        assert list(catalog_io.iter_export_rows(other, "history")) == \
+            list(catalog_io.iter_export_rows(db, "history"))
+    finally:
+        other.close_all_connections()
+
+
+def test_json_array_is_read_in_pieces():
+    items = [{"name": f"P{i}", "url": f"http://h.test/{i}", "note": "ї" * (i % 7)} for i in range(200)]
+    stream = io.StringIO(json.dumps(items, ensure_ascii=False, indent=1))
+    # Крихітні порції: елементи обриваються на межі прочитаного
+    assert list(catalog_io.iter_json_array(stream, read_size=13)) == items
+    assert list(catalog_io.iter_json_array(io.StringIO(" [ ] "))) == []
+    with pytest.raises(ValueError):
+        list(catalog_io.iter_json_array(io.StringIO('[{"name": "P"}')))
+    with pytest.raises(ValueError):
+        catalog_io.detect_format("catalog.xlsx")
+
+
+def test_failed_import_leaves_database_unchanged(db):
+    db.add_program("Old", "Програма", "http://old.test/")
+
+    def rows():
+        yield {"name": "New", "url": "http://new.test/"}
+        raise OSError("файл обірвано")
+
+    with pytest.raises(OSError):
+        catalog_io.import_rows(db, rows())
+    assert [p.name for p in db.get_all_programs()] == ["Old"]
+
+
+def test_large_import_keeps_memory_flat(db):
+    count = 100_000
+    rows = ({"name": f"Device {i}", "url": f"http://host{i % 100}.test/{i}", "is_active": "1"}
+            for i in range(count))
+    tracemalloc.start()
+    try:
+        stats = catalog_io.import_rows(db, rows)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert stats['inserted'] == count
+    # Лише пачка рядків у пам'яті, а не весь каталог (~десятки МБ)
+    assert peak < 10 * 1024 * 1024
+
+    exported = sum(1 for _ in catalog_io.iter_export_rows(db))
+    assert exported == count
+
+
+def test_cli_import_and_export(db, tmp_path):
+    source = tmp_path / "devices.csv"
+    source.write_text("name,url,category\nGXP2170,http://gs.test/2170,Прошивка\n", encoding="utf-8")
+    db_path = str(tmp_path / "versions.db")
+    db.close_all_connections()
+
+    def run(*args):
+        return subprocess.run([sys.executable, "launcher.py", *args, "--db", db_path],
+                              cwd=PROJECT_DIR, capture_output=True, text=True, timeout=60)
+
+    assert run("import", str(source)).returncode == 0
+    result = run("export", "-", "--format", "jsonl")
+    assert result.returncode == 0, result.stderr
+    exported = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [(row["name"], row["category"], row["is_active"]) for row in exported] == \
+        [("GXP2170", "Прошивка", 1)]
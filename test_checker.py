@@ -0,0 +1,109 @@
+# test_checker.py
+import threading
+import time
+
+from checker import CheckEngine
+from database import ProgramRecord
+
+
+def make_programs(hosts, per_host):
+    programs = []
+    for host in hosts:
+        for i in range(per_host):
+            programs.append(ProgramRecord(len(programs) + 1, f"{host}-{i}", "Програма", f"https://{host}/p{i}"))
+    return programs
+
+
+def test_per_host_and_global_limits():
+    lock = threading.Lock()
+    active = {}
+    peak = {"total": 0}
+    peak_by_host = {}
+
+    def check(program):
+        host = program.url.split("/")[2]
+        with lock:
+            active[host] = active.get(host, 0) + 1
+            peak_by_host[host] = max(peak_by_host.get(host, 0), active[host])
+            peak["total"] = max(peak["total"], sum(active.values()))
+        time.sleep(0.02)
+        with lock:
+            active[host] -= 1
+        return "1.0"
+
+    programs = make_programs(["a.com", "b.com", "c.com"], 6)
+    engine = CheckEngine(check, max_workers=4, per_host_limit=2)
+    results = list(engine.run(programs))
+
+    assert len(results) == len(programs)
+    assert all(r.version == "1.0" for r in results)
+    assert peak["total"] <= 4
+    assert max(peak_by_host.values()) <= 2
+
+
+def test_runtime_close_to_slowest_host():
+    def check(program):
+        time.sleep(0.1)
+        return "2.0"
+
+    programs = make_programs([f"h{i}.com" for i in range(10)], 2)
+    engine = CheckEngine(check, max_workers=20, per_host_limit=2)
+    started = time.monotonic()
+    list(engine.run(programs))
+    # Послідовно це 2 секунди, паралельно - близько 0.1
+    assert time.monotonic() - started < 1.0
+
+
+def test_errors_are_reported_per_program():
+    def check(program):
+        if program.id == 2:
+            raise ValueError("boom")
+        return "1.0"
+
+    results = {r.program.id: r for r in CheckEngine(check).run(make_programs(["a.com"], 3))}
+    assert isinstance(results[2].error, ValueError)
+    assert results[1].version == "1.0" and results[3].version == "1.0"
+
+
+def test_programs_are_read_lazily_with_bounded_buffer():
+    read = []
+    checked = []
+    first_result_after = []
+
+    def catalog():
+        # Хости вперемішку, як у звичайному каталозі
+        programs = make_programs([f"h{i}.com" for i in range(20)], 50)
+        for program in sorted(programs, key=lambda program: program.url.rsplit("/p", 1)[1]):
+            read.append(program.id)
+            yield program
+
+    def check(program):
+        checked.append(program.id)
+        return "1.0"
+
+    engine = CheckEngine(check, max_workers=4, per_host_limit=1, buffer_size=16)
+    pending = []
+    for result in engine.run(catalog()):
+        if not first_result_after:
+            first_result_after.append(len(read))
+        pending.append(len(read) - len(checked))
+    assert sorted(checked) == list(range(1, 1001))
+    # Перша перевірка - до прочитання всього каталогу, наперед прочитано небагато
+    assert first_result_after[0] <= 16
+    assert max(pending) <= 16 + 4
+
+
+def test_saturated_host_reads_ahead_for_free_hosts():
+    started = []
+
+    def check(program):
+        started.append(program.url.split("/")[2])
+        time.sleep(0.01)
+        return "1.0"
+
+    # Спочатку каталогу - лише один хост, далі - інші
+    programs = make_programs(["big.com"], 30) + make_programs(["a.com", "b.com", "c.com"], 1)
+    engine = CheckEngine(check, max_workers=4, per_host_limit=1, buffer_size=8)
+    list(engine.run(iter(programs)))
+    # Вільні потоки не чекали, поки перевіриться весь big.com
+    assert set(started[:4]) == {"big.com", "a.com", "b.com", "c.com"}
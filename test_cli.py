@@ -0,0 +1,69 @@
+# test_cli.py
+import json
+import os
+import subprocess
+import sys
+from http.server import BaseHTTPRequestHandler
+
+from cli import make_checker
+from config import DEFAULT_CONFIG
+from database import Database
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = f"<html><body><b class='v'>Release {self.path.strip('/')}</b></body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run_launcher(*args):
+    code = (
+        "import sys, launcher\n"
+        "sys.argv = ['launcher.py'] + sys.argv[1:]\n"
+        "try:\n"
+        "    launcher.main()\n"
+        "finally:\n"
+        "    assert not any(m.startswith('PyQt5') for m in sys.modules), 'PyQt5 imported'\n"
+    )
+    return subprocess.run([sys.executable, "-c", code, *args], cwd=PROJECT_DIR,
+                          capture_output=True, text=True, timeout=60)
+
+
+def test_check_json_and_exit_codes(tmp_path, http_server):
+    base = http_server(Handler)
+    db_path = str(tmp_path / "versions.db")
+    db = Database(db_path)
+    db.add_program("Up to date", "Програма", f"{base}/1.2.3", "1.2.3", ".v")
+    db.add_program("Outdated", "Прошивка", f"{base}/2.0.1", "2.0.0", ".v")
+    db.close_all_connections()
+    result = run_launcher("check", "--db", db_path, "--category", "Програма", "--json")
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout)
+    assert report["summary"]["checked"] == 1
+    assert report["results"][0]["version"] == "1.2.3"
+
+    result = run_launcher("check", "--db", db_path, "--json")
+    assert result.returncode == 2, result.stderr
+    assert json.loads(result.stdout)["summary"]["updates_available"] == 1
+
+    assert run_launcher("check", "--db", db_path, "--bogus").returncode == 1
+
+
+def test_console_checks_parse_in_threads_unless_configured(tmp_path):
+    db = Database(str(tmp_path / "versions.db"))
+    assert DEFAULT_CONFIG["parsing"]["parse_processes"] == "auto"
+    checker, _ = make_checker(db, DEFAULT_CONFIG)
+    assert checker.parser.parse_processes == 0
+    configured = {**DEFAULT_CONFIG, "parsing": {"parse_processes": 2}}
+    checker, _ = make_checker(db, configured)
+    assert checker.parser.parse_processes == 2
+    db.close_all_connections()
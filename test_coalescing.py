@@ -0,0 +1,174 @@
+# test_coalescing.py
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from checker import VersionChecker
+from coalescing import SingleFlight
+from database import Database
+from parser import VersionParser
+
+VENDOR_PAGE = b"""<html><body>
+<div id="client">Client 4.2.1</div>
+<div id="server">Server 7.0.3</div>
+<p>Latest release: Version 9.9.9</p>
+</body></html>"""
+
+
+class VendorHandler(BaseHTTPRequestHandler):
+    """Портал виробника: одна сторінка з версіями кількох продуктів"""
+    protocol_version = "HTTP/1.1"
+    hits = []
+
+    def do_GET(self):
+        self.hits.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/pypi/requests/json":
+            self.reply(json.dumps({"info": {"version": "2.32.3"}}).encode(), "application/json")
+        elif self.path == "/other":
+            self.reply(b"<html><body>Tool 1.5.0</body></html>")
+        elif self.headers.get("If-None-Match") == '"vendor-1"':
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self.reply(VENDOR_PAGE, etag='"vendor-1"')
+
+    def reply(self, body, content_type="text/html", etag=None):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def vendor(http_server):
+    VendorHandler.hits = []
+    return http_server(VendorHandler)
+
+
+def test_single_flight_runs_once_per_shared_key():
+    calls = []
+
+    def load():
+        calls.append(1)
+        # Чекаємо, поки решта потоків стануть у чергу за результатом
+        deadline = time.monotonic() + 2
+        while flights.saved < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return "page"
+
+    def check(_):
+        result = flights.do("shared", load)
+        flights.done("shared")
+        return result
+
+    flights = SingleFlight({"shared": 4, "alone": 1})
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(check, range(4)))
+    assert len(calls) == 1
+    assert sorted(loaded for _, loaded in results) == [False, False, False, True]
+    assert flights.saved == 3
+    # Усі програми завершили перевірку - ключ звільнено
+    assert not flights.shared("shared")
+
+    assert flights.do("alone", lambda: "own") == ("own", True)
+    assert not flights.shared("alone")
+
+    # Програми, прочитані пізніше (наступна сторінка каталогу), додаються до обліку
+    flights.add(["alone", None])
+    assert flights.shared("alone")
+    flights.done("alone")
+    flights.done("alone")
+    assert not flights.shared("alone")
+
+
+def test_single_flight_shares_errors():
+    flights = SingleFlight({"url": 2})
+
+    def fail():
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        flights.do("url", fail)
+    with pytest.raises(ConnectionError):
+        flights.do("url", lambda: "not called")
+
+
+def test_programs_on_same_page_share_one_request(vendor, tmp_path):
+    db = Database(str(tmp_path / "versions.db"))
+    checker = VersionChecker(db)
+    page = f"{vendor}/downloads"
+    ids = {
+        "client": db.add_program("Client", "Програма", page, selector="#client"),
+        "server": db.add_program("Server", "Програма", page, selector="#server"),
+        "page": db.add_program("Suite", "Програма", page),
+        "other": db.add_program("Tool", "Програма", f"{vendor}/other"),
+    }
+    # Без селектора - те саме, що дав би розбір сторінки окремо для програми
+    page_version = VersionParser().extract_version_from_html(VENDOR_PAGE.decode())
+    expected = {ids["client"]: "4.2.1", ids["server"]: "7.0.3", ids["page"]: page_version, ids["other"]: "1.5.0"}
+
+    results = list(checker.check_programs(db.get_active_programs()))
+    assert {result['program_id']: result['version'] for result in results} == expected
+    assert [path for path, _ in VendorHandler.hits].count("/downloads") == 1
+
+    _, cursor = db.get_connection()
+    cursor.execute("SELECT program_id, cache_hit FROM check_runs WHERE program_id != ?", (ids["other"],))
+    assert sorted(hit for _, hit in cursor.fetchall()) == [0, 1, 1]
+
+    # Наступна перевірка: один умовний запит, 304 - версії всіх селекторів з кешу
+    VendorHandler.hits = []
+    results = list(checker.check_programs(db.get_active_programs()))
+    assert {result['program_id']: result['version'] for result in results} == expected
+    assert ("/downloads", '"vendor-1"') in VendorHandler.hits
+    assert [path for path, _ in VendorHandler.hits].count("/downloads") == 1
+    db.close_all_connections()
+
+
+def test_json_api_requests_are_shared(vendor, tmp_path):
+    db = Database(str(tmp_path / "versions.db"))
+    checker = VersionChecker(db)
+    checker.parser.extractors.resolve("https://pypi.org/").api_url = vendor
+    for name in ("requests", "requests (dev)"):
+        db.add_program(name, "Бібліотека", "https://pypi.org/project/requests/")
+
+    results = list(checker.check_programs(db.get_active_programs()))
+    assert [result['version'] for result in results] == ["2.32.3", "2.32.3"]
+    assert VendorHandler.hits == [("/pypi/requests/json", None)]
+    db.close_all_connections()
+
+
+def test_streamed_catalog_releases_shared_pages(vendor, tmp_path, monkeypatch):
+    import checker as checker_module
+    # Каталог читається з БД сторінками, а парсеру передається частинами по 2
+    monkeypatch.setattr(checker_module, "RUN_CHUNK_SIZE", 2)
+    db = Database(str(tmp_path / "versions.db"))
+    checker = VersionChecker(db)
+    page = f"{vendor}/downloads"
+    expected = {}
+    for index in range(3):
+        expected[db.add_program(f"Client {index}", "Програма", page, selector="#client")] = "4.2.1"
+        expected[db.add_program(f"Tool {index}", "Програма", f"{vendor}/other")] = "1.5.0"
+
+    remaining = []
+    end_run = checker.parser.end_run
+
+    def capture_end_run():
+        remaining.append(dict(checker.parser.flights._remaining))
+        end_run()
+    monkeypatch.setattr(checker.parser, "end_run", capture_end_run)
+
+    results = list(checker.check_programs(db.iter_programs(batch_size=2)))
+    assert {result['program_id']: result['version'] for result in results} == expected
+    # Облік спільних ресурсів звільнено для кожної перевіреної програми
+    assert remaining == [{}]
+    db.close_all_connections()
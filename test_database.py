@@ -0,0 +1,151 @@
+# test_database.py
+import sqlite3
+import threading
+
+import pytest
+
+from database import CHECK_FIELDS, Database
+
+
+def make_db(tmp_path):
+    return Database(str(tmp_path / "versions.db"))
+
+
+def test_wal_mode_enabled(tmp_path):
+    db = make_db(tmp_path)
+    _, cursor = db.get_connection()
+    assert cursor.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    db.close_all_connections()
+
+
+def test_queued_writes_are_batched_and_flushed(tmp_path):
+    db = make_db(tmp_path)
+    program_id = db.add_program("Batch", "Програма", "https://a.com/1")
+
+    futures = [db.update_version(program_id, f"1.0.{i}", wait=False) for i in range(50)]
+    db.flush()
+    assert all(future.done() for future in futures)
+
+    _, cursor = db.get_connection()
+    cursor.execute("SELECT COUNT(*) FROM version_history WHERE program_id = ?", (program_id,))
+    assert cursor.fetchone()[0] == 50
+    assert db.get_program_by_id(program_id)[4] == "1.0.49"
+    db.close_all_connections()
+
+
+def test_failed_write_does_not_abort_batch(tmp_path):
+    db = make_db(tmp_path)
+    program_id = db.add_program("Ok", "Програма", "https://a.com/1")
+
+    def broken(cursor):
+        cursor.execute("INSERT INTO no_such_table VALUES (1)")
+
+    bad = db.execute_write(broken, wait=False)
+    good = db.update_installed_version(program_id, "2.0", wait=False)
+    db.flush()
+
+    assert bad.exception() is not None
+    assert good.exception() is None
+    assert db.get_program_by_id(program_id)[5] == "2.0"
+    db.close_all_connections()
+
+
+def test_writes_from_many_threads(tmp_path):
+    db = make_db(tmp_path)
+    program_ids = [db.add_program(f"P{i}", "Програма", f"https://h{i}.com/") for i in range(8)]
+
+    def worker(program_id):
+        for i in range(20):
+            db.update_version(program_id, f"{i}.0", wait=False)
+        # Читання з власного з'єднання потоку
+        db.get_program_by_id(program_id)
+
+    threads = [threading.Thread(target=worker, args=(pid,)) for pid in program_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    db.flush()
+
+    assert {program[4] for program in db.get_all_programs()} == {"19.0"}
+    db.close_all_connections()
+
+
+def test_invalid_path_raises_instead_of_blocking(tmp_path):
+    db = Database(str(tmp_path / "missing" / "versions.db"))
+    with pytest.raises(sqlite3.OperationalError):
+        db.add_program("P", "Програма", "https://a.com/")
+    assert db.writer is None
+
+
+def test_fatal_writer_error_fails_waiting_writes(tmp_path):
+    db = make_db(tmp_path)
+    program_id = db.add_program("P", "Програма", "https://a.com/")
+
+    class Fatal(BaseException):
+        pass
+
+    def crash(cursor):
+        raise Fatal()
+    # Записи в черзі за пачкою, на якій зупинився потік, теж отримують помилку
+    started = threading.Event()
+    release = threading.Event()
+    db.execute_write(lambda cursor: started.set() or release.wait(5), wait=False)
+    started.wait(5)
+    crashed = db.execute_write(crash, wait=False)
+    queued = db.update_version(program_id, "2.0", wait=False)
+    release.set()
+    with pytest.raises(Fatal):
+        crashed.result(timeout=5)
+    with pytest.raises(Fatal):
+        queued.result(timeout=5)
+    # Потік запису зупинено - наступні записи не чекають вічно
+    with pytest.raises(Fatal):
+        db.update_version(program_id, "3.0")
+    db.close_all_connections()
+
+
+def test_close_all_connections_allows_reopen(tmp_path):
+    db = make_db(tmp_path)
+    program_id = db.add_program("Reopen", "Програма", "https://a.com/1")
+    db.update_last_check(program_id, wait=False)
+    db.close_all_connections()
+
+    assert db.writer is None
+    assert db.get_program_by_id(program_id)[7] is not None
+    assert db.delete_program(program_id) is True
+    assert db.get_all_programs() == []
+    db.close_all_connections()
+
+
+def test_iter_programs_pages_by_primary_key(tmp_path):
+    db = make_db(tmp_path)
+    ids = [db.add_program(f"P{i}", "Прошивка" if i % 2 else "Програма", f"https://a.com/{i}") for i in range(7)]
+    db.set_program_active(ids[3], 0)
+
+    pages = []
+    programs = db.iter_programs(batch_size=2)
+    first = next(programs)
+    # Лише перша сторінка прочитана, решта - в міру обходу
+    assert first.id == ids[0]
+    # Програма, додана під час обходу, потрапляє в нього (більший id)
+    late = db.add_program("Late", "Програма", "https://a.com/late")
+    pages = [first.id] + [program.id for program in programs]
+    assert pages == [i for i in ids if i != ids[3]] + [late]
+
+    firmware = list(db.iter_programs(active_only=False, category="Прошивка", batch_size=3))
+    assert [program.id for program in firmware] == ids[1::2]
+    # Лише колонки перевірки; полів поза вибіркою в записі немає
+    assert firmware[0].url == "https://a.com/1" and firmware[0]._fields == CHECK_FIELDS
+    for missing in ("check_interval", "last_check", "created_at"):
+        assert not hasattr(firmware[0], missing)
+
+    partial = next(db.iter_programs(columns=("name", "created_at")))
+    assert partial._fields == ("id", "name", "created_at")
+    assert partial.id == ids[0] and partial.created_at is not None and not hasattr(partial, "url")
+    try:
+        next(db.iter_programs(columns=("id", "url; DROP TABLE programs")))
+        assert False, "невідома колонка"
+    except ValueError:
+        pass
+    db.close_all_connections()
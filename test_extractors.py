@@ -0,0 +1,99 @@
+# test_extractors.py
+import json
+
+from database import ProgramRecord
+from extractors import ExtractorRegistry, Extractor, default_registry
+from parser import VersionParser
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body="", headers=None):
+        self.status_code = status_code
+        self.text = body
+        self.content = body.encode()
+        self.headers = headers or {}
+        self.url = ""
+        self.encoding = "utf-8"
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise Exception(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size=1):
+        yield self.content
+
+    def close(self):
+        pass
+
+
+class RoutingSession:
+    """Відповіді за URL; запам'ятовує запити"""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        return self.routes.get(url) or FakeResponse(404)
+
+
+def program(name, url, selector=""):
+    return ProgramRecord(1, name, "Програма", url, version_selector=selector)
+
+
+def test_resolve_by_host_suffix():
+    registry = default_registry()
+    assert registry.resolve("https://www.grandstream.com/support/firmware").name == "grandstream"
+    assert registry.resolve("https://GitHub.com:443/git/git").name == "github"
+    assert registry.resolve("https://hub.docker.com/r/library/nginx/tags").name == "dockerhub"
+    assert registry.resolve("https://docker.com/").name == "html"
+    assert registry.resolve("https://notgithub.com/a/b").name == "html"
+
+    class Custom(Extractor):
+        name = "custom"
+        hosts = ("example.org",)
+
+    registry.register(Custom())
+    assert registry.resolve("https://downloads.example.org/x").name == "custom"
+
+
+def test_github_api_replaces_html_scraping():
+    parser = VersionParser()
+    parser.session = RoutingSession({
+        "https://api.github.com/repos/git/git/releases/latest": FakeResponse(body='{"tag_name": "v2.45.2"}'),
+    })
+    assert parser.get_version(program("Git", "https://github.com/git/git/releases", ".f1 a")) == "2.45.2"
+    assert parser.session.requested == ["https://api.github.com/repos/git/git/releases/latest"]
+
+
+def test_failed_extractor_falls_back_to_html():
+    parser = VersionParser(config={'parsing': {'streaming': False}})
+    page = '<html><body><span class="v">Release 1.4.0</span></body></html>'
+    parser.session = RoutingSession({"https://github.com/a/b": FakeResponse(body=page)})
+    assert parser.get_version(program("B", "https://github.com/a/b", ".v")) == "1.4.0"
+    assert parser.session.requested[0].startswith("https://api.github.com/")
+
+
+def test_grandstream_does_not_fall_back_to_page_text():
+    parser = VersionParser()
+    parser._grandstream_index = {"GXP1625": "1.0.7.79"}
+    url = "https://www.grandstream.com/support/firmware"
+    parser.session = RoutingSession({url: FakeResponse(body="<p>Firmware 9.9.9</p>")})
+
+    assert parser.get_version(program("Grandstream GXP1625", url)) == "1.0.7.79"
+    assert parser.get_version(program("Grandstream GXV9999", url)) is None
+    assert parser.session.requested == []
+    # Назва без моделі - звичайна сторінка
+    assert parser.get_version(program("Сайт Grandstream", url)) == "9.9.9"
+
+
+def test_registry_without_specific_extractors():
+    parser = VersionParser(config={'parsing': {'streaming': False}})
+    parser.extractors = ExtractorRegistry()
+    parser.session = RoutingSession({"https://github.com/a/b": FakeResponse(body="<p>Version 3.1.0</p>")})
+    assert parser.get_version(program("B", "https://github.com/a/b")) == "3.1.0"
+    assert parser.session.requested == ["https://github.com/a/b"]
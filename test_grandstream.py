@@ -0,0 +1,53 @@
+# test_grandstream.py
+from parser import VersionParser
+
+FIRMWARE_PAGE = """
+<html><body>
+<table>
+  <tr><th>Model</th><th>Firmware</th></tr>
+  <tr><td>GXP1610/1615/1620/1625/1628/1630</td><td>1.0.7.79</td><td><a href="#">Release Notes</a></td></tr>
+  <tr><td>GXW4216/GXW4224, GXW4232</td><td>Firmware 1.0.21.6</td></tr>
+  <tr><td>GRP2612 &amp; GRP2613</td><td>-</td><td><a href="/fw.zip">1.0.11.3</a></td></tr>
+  <tr><td>GXP1625</td><td>9.9.9.9</td></tr>
+</table>
+</body></html>
+"""
+
+
+class FakeResponse:
+    status_code = 200
+    encoding = "utf-8"
+    text = FIRMWARE_PAGE
+    content = FIRMWARE_PAGE.encode()
+
+    def raise_for_status(self):
+        pass
+
+
+class CountingSession:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return FakeResponse()
+
+
+def test_expand_models():
+    expand = VersionParser.expand_grandstream_models
+    assert expand("GXP1620/1625") == ["GXP1620", "GXP1625"]
+    assert expand("GXW4216/GXW4224") == ["GXW4216", "GXW4224"]
+    assert expand("GRP2612, GRP2613") == ["GRP2612", "GRP2613"]
+
+
+def test_index_is_built_once_and_shared():
+    parser = VersionParser()
+    parser.session = CountingSession()
+
+    assert parser.get_grandstream_version("GXP1625") == "1.0.7.79"
+    assert parser.get_grandstream_version("gxp 1610") == "1.0.7.79"
+    assert parser.get_grandstream_version("GXW4232") == "1.0.21.6"
+    assert parser.get_grandstream_version("GRP2613") == "1.0.11.3"
+    assert parser.get_grandstream_version("GXP1625 v2") == "1.0.7.79"
+    assert parser.get_grandstream_version("GXV3380") is None
+    assert parser.session.calls == 1
@@ -0,0 +1,57 @@
+# test_html_backend.py
+import pytest
+
+from html_backend import available_backends, get_backend, BeautifulSoupBackend
+from parser import VersionParser
+
+PAGE = """
+<html><head><title>Downloads 0.1.1</title><script>var build = "9.9.9";</script></head>
+<body>
+  <div class="download-for-current-os featured"><p class="download-number">Python 3.12.1</p></div>
+  <div id="older"><span>Release 3.11.7</span></div>
+  <ul><li>one</li><li>version 4.0.0</li></ul>
+</body></html>
+"""
+
+
+@pytest.mark.parametrize("name", available_backends())
+@pytest.mark.parametrize("selector", [
+    ".download-for-current-os .download-number",
+    "div.featured.download-for-current-os > p",
+    "#older span",
+    "li:nth-of-type(2)",
+    ".missing",
+])
+def test_scoped_selection_matches_full_tree(name, selector):
+    backend = get_backend(name)
+    assert backend.select_text(PAGE, selector) == backend.parse(PAGE).select_text(selector)
+
+
+def test_strainer_only_for_simple_selectors():
+    assert BeautifulSoupBackend.strainer_for("#older span") is not None
+    assert BeautifulSoupBackend.strainer_for("h2 + p") is None
+    assert BeautifulSoupBackend.strainer_for("body .x") is None
+
+
+def test_unknown_backend_falls_back_to_html_parser():
+    assert get_backend("no-such-parser").name == "html.parser"
+
+
+@pytest.mark.parametrize("name", available_backends())
+def test_parser_uses_configured_backend(name):
+    parser = VersionParser(config={"parsing": {"html_backend": name}})
+    assert parser.html_backend.name == name
+    assert parser.extract_version_from_html(PAGE, "#older span") == "3.11.7"
+    assert parser.extract_version_from_html(PAGE, ".missing") == "0.1.1"
+
+
+@pytest.mark.parametrize("name", available_backends())
+def test_page_text_does_not_change_document(name):
+    page = PAGE.replace("<ul>", "<noscript><p>Enable JavaScript 1.0.0</p></noscript><ul>")
+    document = get_backend(name).parse(page)
+    text = document.page_text()
+    assert "9.9.9" not in text and "Enable JavaScript 1.0.0" in text
+    # Вибірки після page_text() бачать той самий документ
+    assert document.select_text("script") == 'var build = "9.9.9";'
+    assert document.select_text("noscript p") == "Enable JavaScript 1.0.0"
+    assert document.page_text() == text
@@ -0,0 +1,48 @@
+# test_http_cache.py
+from http.server import BaseHTTPRequestHandler
+
+from database import Database
+from parser import VersionParser
+
+PAGE = b"<html><body><span class='ver'>Version 3.4.5</span></body></html>"
+ETAG = '"v345"'
+
+
+class Handler(BaseHTTPRequestHandler):
+    full_responses = 0
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            return
+        Handler.full_responses += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_not_modified_reuses_cached_version(tmp_path, monkeypatch, http_server):
+    url = f"{http_server(Handler)}/download"
+    db = Database(str(tmp_path / "versions.db"))
+    try:
+        parser = VersionParser(db=db)
+        assert parser.get_version_from_website(url, ".ver") == "3.4.5"
+        db.flush()  # валідатори записуються у фоні
+        assert db.get_http_cache(url, ".ver") == (ETAG, None, "3.4.5")
+
+        # Друга перевірка: 304 і жодного розбору HTML
+        def fail(*args, **kwargs):
+            raise AssertionError("HTML не повинен розбиратися при 304")
+        monkeypatch.setattr(parser, "extract_version_from_html", fail)
+        assert parser.get_version_from_website(url, ".ver") == "3.4.5"
+        assert Handler.full_responses == 1
+    finally:
+        db.close_all_connections()
@@ -0,0 +1,56 @@
+# test_metrics.py
+from http.server import BaseHTTPRequestHandler
+
+from checker import VersionChecker
+from database import Database
+from metrics import PHASES, format_summary
+
+PAGE = b"<html><body>" + b"<p>filler</p>" * 500 + b"<b class='v'>Version 7.8.9</b></body></html>"
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/missing":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_check_runs_are_recorded_and_summarised(tmp_path, http_server):
+    base = http_server(Handler)
+    db = Database(str(tmp_path / "versions.db"))
+    try:
+        ok = db.add_program("Found", "Програма", f"{base}/page", "7.8.9", ".v")
+        missing = db.add_program("Missing", "Програма", f"{base}/missing")
+        config = {"checking": {"retry_attempts": 1}, "parsing": {"streaming": False}}
+        checker = VersionChecker(db, config)
+        results = list(checker.check_programs(db.get_active_programs()))
+        assert len(results) == 2
+
+        _, cursor = db.get_connection()
+        cursor.execute("SELECT program_id, run_id, status, http_status, extractor, bytes, total_ms "
+                       "FROM check_runs ORDER BY program_id")
+        rows = cursor.fetchall()
+        assert [row[0] for row in rows] == [ok, missing]
+        assert {row[1] for row in rows} == {checker.run_id}
+        assert rows[0][2:6] == ("ok", 200, "selector", len(PAGE))
+        assert rows[1][2:4] == ("error", 404)
+        assert all(row[6] > 0 for row in rows)
+
+        summary = db.get_check_run_summary()
+        assert summary["runs"] == [checker.run_id]
+        assert summary["hosts"][0]["checks"] == 2 and summary["hosts"][0]["errors"] == 1
+        assert {row["name"] for row in summary["programs"]} == {"Found", "Missing"}
+        assert set(summary["phases"]) == set(PHASES)
+        assert "Найповільніші хости" in format_summary(summary)
+    finally:
+        db.close_all_connections()
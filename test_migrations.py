@@ -0,0 +1,112 @@
+# test_migrations.py
+import sqlite3
+
+from database import Database
+from migrations import SCHEMA_VERSION, migrate
+
+
+def make_legacy_db(path):
+    """БД у форматі до міграцій: без індексів, CASCADE та user_version"""
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE programs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            category TEXT NOT NULL,
+            url TEXT NOT NULL,
+            current_version TEXT,
+            installed_version TEXT,
+            version_selector TEXT,
+            last_check TEXT,
+            check_interval INTEGER DEFAULT 24,
+            is_active INTEGER DEFAULT 1,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE version_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            program_id INTEGER,
+            version TEXT,
+            check_date TEXT,
+            FOREIGN KEY (program_id) REFERENCES programs (id)
+        );
+    ''')
+    for i in range(1, 51):
+        conn.execute("INSERT INTO programs (name, category, url, current_version, is_active) "
+                     "VALUES (?, ?, ?, ?, ?)",
+                     (f"Program {i:02d}", "Програма", f"https://h{i}.com/", f"{i}.0", i % 2))
+        conn.execute("INSERT INTO version_history (program_id, version, check_date) VALUES (?, ?, ?)",
+                     (i, f"{i}.0", "2024-01-01 00:00:00"))
+    # Історія програми, видаленої без foreign_keys
+    conn.execute("INSERT INTO version_history (program_id, version, check_date) "
+                 "VALUES (999, '1.0', '2024-01-01 00:00:00')")
+    conn.commit()
+    conn.close()
+
+
+def index_names(cursor):
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def test_legacy_db_is_migrated(tmp_path):
+    path = str(tmp_path / "versions.db")
+    make_legacy_db(path)
+
+    db = Database(path)
+    _, cursor = db.get_connection()
+    assert cursor.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert {'idx_programs_name', 'idx_programs_category_name', 'idx_programs_active',
+            'idx_version_history_program_id'} <= index_names(cursor)
+
+    # Дані збережені, осиротілі записи історії відкинуті
+    assert len(db.get_all_programs()) == 50
+    assert len(db.get_active_programs()) == 25
+    cursor.execute("SELECT COUNT(*) FROM version_history")
+    assert cursor.fetchone()[0] == 50
+
+    # Видалення програми каскадно видаляє її історію
+    cursor.execute("PRAGMA foreign_key_list(version_history)")
+    assert cursor.fetchone()[6] == 'CASCADE'
+    db.execute_write(lambda c: c.execute("DELETE FROM programs WHERE id = 1"))
+    cursor.execute("SELECT COUNT(*) FROM version_history WHERE program_id = 1")
+    assert cursor.fetchone()[0] == 0
+    db.close_all_connections()
+
+
+def test_hot_queries_use_indexes(tmp_path):
+    path = str(tmp_path / "versions.db")
+    make_legacy_db(path)
+    db = Database(path)
+    _, cursor = db.get_connection()
+
+    def plan(sql):
+        return " ".join(row[3] for row in cursor.execute("EXPLAIN QUERY PLAN " + sql))
+
+    assert "USE TEMP B-TREE" not in plan("SELECT * FROM programs ORDER BY name")
+    assert "idx_programs_active" in plan("SELECT * FROM programs WHERE is_active = 1")
+    assert "idx_version_history_program_id" in plan(
+        "SELECT * FROM version_history WHERE program_id = 1")
+    db.close_all_connections()
+
+
+def test_migrations_are_idempotent(tmp_path):
+    path = str(tmp_path / "versions.db")
+    db = Database(path)
+    program_id = db.add_program("Fresh", "Програма", "https://a.com/")
+    db.update_version(program_id, "1.0")
+    db.close_all_connections()
+
+    # Повторне відкриття нічого не застосовує і не змінює даних
+    conn = sqlite3.connect(path)
+    assert migrate(conn.cursor()) == 0
+    # Навіть з нуля: усі міграції перевіряють поточну схему
+    conn.execute("PRAGMA user_version = 0")
+    assert migrate(conn.cursor()) == SCHEMA_VERSION
+    conn.commit()
+    assert conn.execute("SELECT COUNT(*) FROM version_history").fetchone()[0] == 1
+    conn.close()
+
+    db = Database(path)
+    assert db.get_program_by_id(program_id)[4] == "1.0"
+    db.close_all_connections()
@@ -0,0 +1,108 @@
+# test_parse_worker.py
+import parse_worker
+from database import ProgramRecord
+from metrics import CheckTrace, tracing
+from parser import VersionParser
+from test_grandstream import CountingSession
+from test_streaming import FILLER, HEAD, FakeStreamResponse
+
+PAGE = "<html><body><div id='ver'>Версія 3.2.1</div><p>Інші збірки 2.0.0</p></body></html>"
+
+
+def make_parser(**parsing):
+    parsing.setdefault("parse_processes", 1)
+    parsing.setdefault("stream_probe_bytes", 16 * 1024)
+    return VersionParser(config={"parsing": parsing})
+
+
+def test_process_count():
+    assert parse_worker.process_count(0) == 0
+    assert parse_worker.process_count(None) == 0
+    assert parse_worker.process_count("2") == 2
+    assert parse_worker.process_count("багато") == 0
+    assert 1 <= parse_worker.process_count("auto") <= 4
+    assert VersionParser().parse_pool is None
+
+
+def test_worker_returns_version_and_phases():
+    parser = make_parser()
+    trace = CheckTrace()
+    with tracing(trace):
+        # Байти в іншому кодуванні: процес декодує їх сам
+        version = parser.extract_in_worker(PAGE.encode("cp1251"), "cp1251", "#ver")
+    assert version == "3.2.1"
+    assert trace.extractor == "selector"
+    assert trace.phases["parse"] > 0
+    # Той самий результат, що й розбір у потоці
+    assert parser.extract_in_worker(PAGE.encode(), "utf-8", ".missing") == \
+        VersionParser().extract_version_from_html(PAGE, ".missing")
+
+
+def test_streaming_probes_run_in_worker():
+    body = HEAD + FILLER * 5000 + b"</body></html>"
+    response = FakeStreamResponse(body)
+    data, version = make_parser().read_raw(response)
+    assert version == "5.4.3"
+    assert isinstance(data, bytes)
+    assert response.consumed < 64 * 1024 < len(body)
+    assert response.closed
+
+
+class PageResponse(FakeStreamResponse):
+    status_code = 200
+    headers = {}
+
+    def raise_for_status(self):
+        pass
+
+
+def test_shared_page_is_parsed_once_for_all_selectors(monkeypatch):
+    parser = make_parser()
+    requests_seen = []
+    monkeypatch.setattr(parser.fetcher, "get",
+                        lambda url, **kwargs: requests_seen.append(url) or PageResponse(PAGE.encode()))
+    batches = []
+    extract_versions = parser.extract_versions_in_worker
+    monkeypatch.setattr(parser, "extract_versions_in_worker",
+                        lambda data, encoding, selectors: batches.append(sorted(selectors)) or
+                        extract_versions(data, encoding, selectors))
+    monkeypatch.setattr(parser, "extract_in_worker", None)
+
+    url = "http://example.test/"
+    parser.begin_run([ProgramRecord(1, "Клієнт", "Програма", url, version_selector="#ver"),
+                      ProgramRecord(2, "Сервер", "Програма", url)])
+    assert parser.get_version_from_website(url, "#ver") == "3.2.1"
+    assert parser.get_version_from_website(url) == VersionParser().extract_version_from_html(PAGE)
+    # Одне завантаження і один розбір у пулі для обох селекторів
+    assert requests_seen == [url]
+    assert batches == [["", "#ver"]]
+
+    # Програма, додана до перевірки після завантаження, - окремий розбір
+    parser.add_run_programs([ProgramRecord(3, "Збірки", "Програма", url, version_selector="p")])
+    assert parser.get_version_from_website(url, "p") == "2.0.0"
+    assert batches == [["", "#ver"], ["p"]]
+    parser.end_run()
+
+
+def test_grandstream_index_is_built_in_worker(monkeypatch):
+    parser = make_parser()
+    parser.session = CountingSession()
+    monkeypatch.setattr(parser, "build_grandstream_index", None)
+    trace = CheckTrace()
+    with tracing(trace):
+        assert parser.get_grandstream_version("GXP1625") == "1.0.7.79"
+    assert parser.get_grandstream_version("GRP2613") == "1.0.11.3"
+    assert parser.session.calls == 1
+    assert trace.phases["parse"] > 0
+
+
+def test_broken_pool_falls_back_to_thread():
+    parser = make_parser()
+    pool = parser.parse_pool
+    # Аварійне завершення процесу пулу
+    pool.submit(parse_worker.os._exit, 1).exception()
+    assert parser.extract_in_worker(PAGE.encode(), "utf-8", "#ver") == "3.2.1"
+    # Наступний виклик отримує новий пул
+    assert parser.parse_pool is not pool
+    assert parser.extract_in_worker(PAGE.encode(), "utf-8", "#ver") == "3.2.1"
+    parse_worker.shutdown_pool()
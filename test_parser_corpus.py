@@ -0,0 +1,34 @@
+# test_parser_corpus.py
+import json
+import os
+
+import pytest
+
+from parser import VersionParser
+from html_backend import available_backends
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "corpus")
+
+with open(os.path.join(CORPUS_DIR, "manifest.json"), encoding="utf-8") as f:
+    MANIFEST = json.load(f)
+
+
+def read_page(name):
+    with open(os.path.join(CORPUS_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("page", MANIFEST["pages"], ids=lambda page: page["file"])
+def test_corpus_page_versions(backend, page):
+    parser = VersionParser(config={'parsing': {'html_backend': backend}})
+    html = read_page(page["file"])
+    assert parser.extract_version_from_html(html, page["selector"]) == page["expected"]
+
+
+def test_corpus_grandstream_models():
+    parser = VersionParser()
+    grandstream = MANIFEST["grandstream"]
+    parser._grandstream_index = parser.build_grandstream_index(read_page(grandstream["file"]))
+    found = {model: parser.get_grandstream_version(model) for model in grandstream["models"]}
+    assert found == grandstream["models"]
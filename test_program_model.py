@@ -0,0 +1,84 @@
+# test_program_model.py
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PyQt5")
+
+from PyQt5.QtCore import Qt  # noqa: E402
+
+from database import ProgramRecord  # noqa: E402
+from program_model import ProgramTableModel, COL_ACTIVE, COL_CURRENT, COL_ID, COL_STATUS  # noqa: E402
+
+
+def program(program_id, name, current=None, installed=None, is_active=1):
+    return ProgramRecord(program_id, name, "Програма", f"https://h{program_id}.com/", current, installed,
+                         is_active=is_active)
+
+
+def names(model):
+    return [model.program_at(row).name for row in range(model.rowCount())]
+
+
+def test_row_level_changes_keep_name_order():
+    model = ProgramTableModel()
+    model.set_programs([program(1, "Alpha"), program(2, "Gamma")])
+    inserted = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append(first))
+
+    model.upsert_program(program(3, "Beta"))
+    assert names(model) == ["Alpha", "Beta", "Gamma"]
+    assert inserted == [1]
+
+    # Перейменування переміщує рядок
+    model.upsert_program(program(1, "Zeta"))
+    assert names(model) == ["Beta", "Gamma", "Zeta"]
+
+    assert model.remove_program(2)
+    assert not model.remove_program(2)
+    assert names(model) == ["Beta", "Zeta"]
+
+
+def test_status_is_computed_in_data():
+    model = ProgramTableModel()
+    model.set_programs([program(1, "A", current=None, installed="1.0"),
+                        program(2, "B", current="1.0", installed="1.0", is_active=0)])
+    changed = []
+    model.dataChanged.connect(lambda first, last: changed.append((first.row(), last.row())))
+
+    assert model.data(model.index(0, COL_STATUS)) == "Не перевірено"
+    assert model.data(model.index(0, COL_CURRENT)) == "Не перевірено"
+    assert model.data(model.index(1, COL_STATUS)) == "Актуальна"
+    assert model.data(model.index(1, COL_ACTIVE)) == "Ні"
+
+    model.update_version(1, "2.0")
+    assert changed == [(0, 0)]
+    assert model.data(model.index(0, COL_STATUS)) == "Потрібно оновити"
+    assert model.data(model.index(0, COL_STATUS), Qt.BackgroundRole) is not None
+    assert model.statistics()[:3] == (2, 1, 1)
+
+
+def assert_index_consistent(model):
+    for row in range(model.rowCount()):
+        assert model.row_of(model.program_at(row).id) == row
+
+
+def test_id_index_follows_sorting_inserts_and_deletes():
+    model = ProgramTableModel()
+    model.set_programs([program(i, f"P{i:02d}", current="1.0", installed="1.0") for i in range(1, 21)])
+    assert_index_consistent(model)
+
+    model.sort(COL_STATUS, Qt.AscendingOrder)
+    model.update_version(7, "2.0")  # "Потрібно оновити" - переїжджає вниз
+    assert model.row_of(7) == model.rowCount() - 1
+    assert_index_consistent(model)
+
+    model.sort(COL_ID, Qt.DescendingOrder)
+    assert model.row_of(20) == 0
+    model.upsert_program(program(21, "New"))
+    assert model.row_of(21) == 0
+    model.remove_program(10)
+    assert model.row_of(10) == -1
+    assert_index_consistent(model)
+    assert [model.program_at(row).id for row in range(3)] == [21, 20, 19]
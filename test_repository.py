@@ -0,0 +1,66 @@
+# test_repository.py
+from database import Database, ProgramRecord
+from repository import ProgramRepository
+
+
+class CountingDatabase(Database):
+    """Database, що рахує звернення до SQLite за програмами"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reads = 0
+
+    def get_all_programs(self, category=None):
+        self.reads += 1
+        return super().get_all_programs(category)
+
+    def get_program_by_id(self, program_id):
+        self.reads += 1
+        return super().get_program_by_id(program_id)
+
+
+def test_records_are_named_and_positional(tmp_path):
+    db = Database(str(tmp_path / "versions.db"))
+    program_id = db.add_program("Named", "Програма", "https://a.com/", "1.0", ".v", 0)
+    record = db.get_program_by_id(program_id)
+    assert isinstance(record, ProgramRecord)
+    assert (record.url, record.version_selector, record.check_interval, record.is_active) == \
+        ("https://a.com/", ".v", 24, 0)
+    assert record[3] == record.url
+    assert not hasattr(record, '__dict__')
+    db.close_all_connections()
+
+
+def test_reads_are_served_from_cache(tmp_path):
+    db = CountingDatabase(str(tmp_path / "versions.db"))
+    repository = ProgramRepository(db)
+    first = repository.add_program("B", "Програма", "https://b.com/")
+    second = repository.add_program("A", "Прошивка", "https://a.com/", is_active=0)
+
+    assert [p.name for p in repository.get_all_programs()] == ["A", "B"]
+    assert [p.id for p in repository.get_active_programs()] == [first]
+    assert repository.get_all_programs("Прошивка")[0].id == second
+    reads = db.reads
+    for _ in range(10):
+        repository.get_program_by_id(first)
+        repository.get_all_programs()
+    assert db.reads == reads
+
+    # Записи з відомими значеннями оновлюють кеш без читання з БД
+    repository.update_version(first, "2.0", wait=False)
+    repository.update_installed_version(first, "1.0")
+    cached = repository.get_program_by_id(first)
+    assert (cached.current_version, cached.installed_version) == ("2.0", "1.0")
+    assert db.reads == reads
+    db.flush()
+    assert db.get_program_by_id(first)[4:8] == cached[4:8]
+
+    # Після редагування запис перечитується один раз
+    repository.update_program(first, "C", "Програма", "https://c.com/", "1.0", "", 1)
+    assert repository.get_program_by_id(first).name == "C"
+    assert [p.name for p in repository.get_all_programs()] == ["A", "C"]
+
+    repository.delete_program(second)
+    assert repository.get_program_by_id(second) is None
+    assert [p.id for p in repository.get_all_programs()] == [first]
+    db.close_all_connections()
@@ -0,0 +1,135 @@
+# test_resilience.py
+import random
+import socket
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+import requests
+
+from parser import VersionParser
+from resilience import CircuitBreaker, HostUnavailable, ResilientFetcher, RetryPolicy
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Перші failures запитів - 503, далі сторінка з версією"""
+    failures = 2
+    requests_seen = 0
+
+    def do_GET(self):
+        FlakyHandler.requests_seen += 1
+        if FlakyHandler.requests_seen <= FlakyHandler.failures:
+            self.send_response(503)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b"<html><body><p class='v'>Version 4.5.6</p></body></html>"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_backoff_grows_and_is_capped():
+    policy = RetryPolicy(attempts=5, base_delay=1, max_delay=4, rng=random.Random(1))
+    for attempt, cap in [(1, 1), (2, 2), (3, 4), (4, 4)]:
+        assert cap / 2 <= policy.backoff(attempt) <= cap
+    assert policy.backoff(1, retry_after="3") == 3
+    assert policy.backoff(1, retry_after="100") == 4
+
+
+def test_transient_errors_are_retried(http_server):
+    FlakyHandler.requests_seen = 0
+    url = f"{http_server(FlakyHandler)}/"
+    parser = VersionParser(config={"checking": {"retry_attempts": 3, "retry_base_delay": 0.01}})
+    sleeps = []
+    parser.fetcher.sleep = sleeps.append
+    assert parser.get_version_from_website(url, ".v") == "4.5.6"
+    assert FlakyHandler.requests_seen == 3
+    assert sleeps == [1.0, 1.0]  # Retry-After сервера
+
+
+def test_circuit_breaker_fails_fast_for_dead_host():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, clock=lambda: now[0])
+    fetcher = ResilientFetcher(requests.Session(), RetryPolicy(attempts=1), breaker,
+                               timeout=2, sleep=lambda delay: None)
+    host = f"127.0.0.1:{free_port()}"
+    url = f"http://{host}/"
+
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError) as error:
+            fetcher.get(url)
+        assert not isinstance(error.value, HostUnavailable)
+    assert breaker.state(host) == CircuitBreaker.OPEN
+
+    # Решта програм цього хоста - без звернення до мережі
+    fetcher.session = None
+    with pytest.raises(HostUnavailable):
+        fetcher.get(url + "other")
+
+    # Після reset_timeout пропускається один пробний запит
+    now[0] = 61
+    assert breaker.allow(host)
+    assert not breaker.allow(host)
+    breaker.record_success(host)
+    assert breaker.state(host) == CircuitBreaker.CLOSED
+
+
+def test_trial_with_non_network_error_does_not_block_host():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60, clock=lambda: now[0])
+    outcomes = [requests.ConnectionError("down"), requests.TooManyRedirects("loop"), "ok"]
+
+    class Session:
+        def get(self, url, timeout=None, **kwargs):
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return type("Response", (), {"status_code": 200, "text": outcome})()
+
+    fetcher = ResilientFetcher(Session(), RetryPolicy(attempts=1), breaker,
+                               timeout=2, sleep=lambda delay: None)
+    url = "http://flaky.test/"
+    with pytest.raises(requests.ConnectionError):
+        fetcher.get(url)
+    assert breaker.state("flaky.test") == CircuitBreaker.OPEN
+
+    # Пробний запит упав не з мережевої причини - хост не блокується назавжди
+    now[0] = 61
+    with pytest.raises(requests.TooManyRedirects):
+        fetcher.get(url)
+    assert fetcher.get(url).text == "ok"
+    assert breaker.state("flaky.test") == CircuitBreaker.CLOSED
+
+
+def test_retries_of_one_request_count_as_one_failure():
+    class Session:
+        calls = []
+
+        def get(self, url, timeout=None, **kwargs):
+            self.calls.append(url)
+            if url.endswith("/flaky"):
+                raise requests.ConnectionError("reset")
+            return type("Response", (), {"status_code": 200})()
+
+    fetcher = ResilientFetcher.from_config(Session(), {"retry_attempts": 3, "retry_base_delay": 0.5,
+                                                       "circuit_breaker_threshold": 3})
+    delays = []
+    fetcher.sleep = delays.append
+    with pytest.raises(requests.ConnectionError):
+        fetcher.get("http://vendor.test/flaky")
+    assert len(Session.calls) == 3 and 0.25 <= delays[0] <= 0.5
+    # Повтори однієї адреси не вимикають решту програм хоста
+    assert fetcher.breaker.failures("vendor.test") == 1
+    assert fetcher.breaker.state("vendor.test") == CircuitBreaker.CLOSED
+    assert fetcher.get("http://vendor.test/other").status_code == 200
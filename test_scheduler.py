@@ -0,0 +1,87 @@
+# test_scheduler.py
+import time
+from datetime import datetime, timedelta
+
+from database import Database
+from scheduler import CheckScheduler
+
+
+def make_db(tmp_path):
+    return Database(str(tmp_path / "versions.db"))
+
+
+def set_last_check(db, program_id, when):
+    conn, cursor = db.get_connection()
+    cursor.execute("UPDATE programs SET last_check = ? WHERE id = ?",
+                   (when.strftime("%Y-%m-%d %H:%M:%S"), program_id))
+    conn.commit()
+
+
+def test_only_due_programs_are_popped(tmp_path):
+    db = make_db(tmp_path)
+    fresh = db.add_program("Fresh", "Програма", "https://a.com/1")
+    stale = db.add_program("Stale", "Програма", "https://b.com/1")
+    never = db.add_program("Never", "Програма", "https://c.com/1")
+    db.add_program("Inactive", "Програма", "https://d.com/1", is_active=0)
+    set_last_check(db, fresh, datetime.now())
+    set_last_check(db, stale, datetime.now() - timedelta(hours=25))
+
+    scheduler = CheckScheduler(db, jitter_seconds=60)
+    scheduler.rebuild()
+    assert len(scheduler) == 3
+    assert sorted(scheduler.pop_due(now=time.time() + 60)) == sorted([stale, never])
+    assert scheduler.pop_due(now=time.time() + 60) == []
+
+    # Після перевірки - наступний раз через check_interval (24 год)
+    scheduler.reschedule(stale, checked_at=time.time())
+    assert scheduler.pop_due(now=time.time() + 23 * 3600) == []
+    assert sorted(scheduler.pop_due(now=time.time() + 24 * 3600 + 120)) == sorted([fresh, stale])
+    db.close_all_connections()
+
+
+def test_same_host_checks_are_spread(tmp_path):
+    db = make_db(tmp_path)
+    ids = [db.add_program(f"P{i}", "Програма", f"https://same.host/{i}") for i in range(10)]
+    scheduler = CheckScheduler(db, jitter_seconds=600)
+    scheduler.rebuild()
+    offsets = sorted(scheduler._jitter[i] for i in ids)
+    assert all(b - a > 0 for a, b in zip(offsets, offsets[1:]))
+    assert offsets[-1] - offsets[0] > 300
+
+    # Після перезапуску розклад той самий
+    again = CheckScheduler(db, jitter_seconds=600)
+    again.rebuild()
+    assert again._jitter == scheduler._jitter
+    db.close_all_connections()
+
+
+def test_removed_programs_are_skipped(tmp_path):
+    db = make_db(tmp_path)
+    program_id = db.add_program("X", "Програма", "https://a.com/x")
+    scheduler = CheckScheduler(db, jitter_seconds=0)
+    scheduler.rebuild()
+    scheduler.remove(program_id)
+    assert scheduler.next_due() is None
+    assert scheduler.pop_due(now=time.time() + 10) == []
+    db.close_all_connections()
+
+
+def test_deferred_program_waits_for_rate_limit_reset(tmp_path):
+    db = make_db(tmp_path)
+    program_id = db.add_program("Repo", "Програма", "https://github.com/a/b")
+    scheduler = CheckScheduler(db, jitter_seconds=0)
+    scheduler.rebuild()
+    assert scheduler.pop_due(now=time.time() + 1) == [program_id]
+
+    reset = time.time() + 3600
+    scheduler.defer(program_id, reset)
+    assert scheduler.pop_due(now=reset - 1) == []
+    # Відкладення не губиться при відновленні черги з БД
+    scheduler.rebuild()
+    assert scheduler.pop_due(now=reset - 1) == []
+    assert scheduler.pop_due(now=reset + 1) == [program_id]
+
+    # Успішна перевірка знімає відкладення
+    scheduler.reschedule(program_id, checked_at=time.time())
+    assert program_id not in scheduler._deferred
+    db.close_all_connections()
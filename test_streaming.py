@@ -0,0 +1,109 @@
+# test_streaming.py
+import pytest
+import requests
+
+from parser import VersionParser
+
+HEAD = b"<html><head><title>Downloads</title></head><body><h1>Latest: 5.4.3 stable</h1>"
+FILLER = b"<p>" + b"mirror list and checksums " * 40 + b"</p>\n"
+
+
+class FakeStreamResponse:
+    """Відповідь, що рахує, скільки байтів прочитано"""
+    encoding = "utf-8"
+    url = "http://example.test/"
+
+    def __init__(self, body):
+        self.body = body
+        self.consumed = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size=1):
+        for offset in range(0, len(self.body), chunk_size):
+            chunk = self.body[offset:offset + chunk_size]
+            self.consumed += len(chunk)
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+def make_parser(**parsing):
+    parsing.setdefault("stream_probe_bytes", 16 * 1024)
+    return VersionParser(config={"parsing": parsing})
+
+
+def test_stops_after_version_found():
+    body = HEAD + FILLER * 5000 + b"</body></html>"
+    response = FakeStreamResponse(body)
+    html, version = make_parser().read_body(response)
+    assert version == "5.4.3"
+    assert response.consumed < 64 * 1024 < len(body)
+    assert response.closed
+
+
+def test_stops_after_selector_found():
+    body = HEAD + FILLER * 200 + b"<span id='ver'>v 2.1.0</span>" + FILLER * 5000
+    response = FakeStreamResponse(body)
+    html, version = make_parser().read_body(response, "#ver")
+    assert version == "2.1.0"
+    assert response.consumed < len(body) // 2
+
+
+def test_byte_cap():
+    body = b"<html><body>" + FILLER * 5000
+    response = FakeStreamResponse(body)
+    html, version = make_parser(stream_max_bytes=100 * 1024).read_body(response)
+    assert version is None
+    assert 100 * 1024 <= response.consumed < 100 * 1024 + 16384
+
+
+def test_split_version_is_not_taken_early():
+    # "1.2" обірвано тегом - раніше за кінець тексту зупинятися не можна
+    body = b"<html><body>" + FILLER * 20 + b"<p>build 1.2<b>.3</b> notes</p>" + FILLER * 100
+    parser = make_parser(stream_probe_bytes=len(FILLER) * 20 + 30)
+    html, version = parser.read_body(FakeStreamResponse(body))
+    assert version in (None, "1.2.3")
+    assert parser.extract_version_from_html(html) == "1.2.3"
+
+
+def test_streaming_disabled_reads_text():
+    class PlainResponse:
+        text = "<html>v 1.0</html>"
+        content = text.encode()
+    assert make_parser(streaming=False).read_body(PlainResponse()) == ("<html>v 1.0</html>", None)
+
+
+def test_selector_inside_unclosed_element_keeps_reading():
+    # Буфер обрізано всередині знайденого елемента: "2.1." ще не вся версія
+    body = HEAD + FILLER * 20 + b"<span id='ver'>v 2.1.<b>0</b></span>" + FILLER * 100
+    parser = make_parser(stream_probe_bytes=body.index(b"<b>") + 3)
+    assert parser.probe_partial_html(body[:body.index(b"<b>") + 3].decode(), "#ver") is None
+    html, version = parser.read_body(FakeStreamResponse(body), "#ver")
+    assert version == "2.1.0"
+
+
+def test_unread_responses_are_closed(monkeypatch):
+    class StatusResponse(FakeStreamResponse):
+        def __init__(self, status_code):
+            super().__init__(b"")
+            self.status_code = status_code
+
+        def raise_for_status(self):
+            if self.status_code >= 400:
+                raise requests.HTTPError(f"{self.status_code}")
+
+    parser = make_parser()
+    # 304 з версією з кешу: тіло не читається, але з'єднання повертається в пул
+    cached = StatusResponse(304)
+    monkeypatch.setattr(parser, "conditional_get", lambda *args, **kwargs: (cached, "1.0"))
+    assert parser.fetch_page_version("http://example.test/", "#ver") == "1.0"
+    assert cached.closed
+
+    for load in (lambda url: parser.fetch_page_version(url), parser.load_shared_page):
+        missing = StatusResponse(404)
+        monkeypatch.setattr(parser, "conditional_get", lambda *args, **kwargs: (missing, None))
+        monkeypatch.setattr(parser.fetcher, "get", lambda *args, **kwargs: missing)
+        with pytest.raises(requests.HTTPError):
+            load("http://example.test/missing")
+        assert missing.closed
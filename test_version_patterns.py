@@ -0,0 +1,40 @@
+# test_version_patterns.py
+import random
+import re
+
+from version_patterns import (TEXT_PATTERNS, PAGE_PATTERNS,
+                              TEXT_VERSION_ENGINE, PAGE_VERSION_ENGINE)
+
+
+def sequential_text(text):
+    for pattern in TEXT_PATTERNS:
+        match = re.search(pattern, text)
+        if match:
+            return match.group(1)
+    return None
+
+
+def sequential_page(text):
+    for pattern in PAGE_PATTERNS:
+        for match in re.findall(pattern, text, re.IGNORECASE):
+            if len(match) > 2:
+                return match
+    return None
+
+
+def test_known_values():
+    assert TEXT_VERSION_ENGINE.extract("Firmware 1.0.7.79") == "1.0.7.79"
+    assert TEXT_VERSION_ENGINE.extract("build 2024 version: 3.1.4") == "3.1.4"
+    assert TEXT_VERSION_ENGINE.extract("2.0-beta") == "2.0"
+    assert TEXT_VERSION_ENGINE.extract("release 2024") == "2024"
+    assert TEXT_VERSION_ENGINE.extract("немає") is None
+    assert PAGE_VERSION_ENGINE.extract("Python 3.12.1 (Dec 2023)") == "3.12.1"
+
+
+def test_same_result_as_sequential_search():
+    rng = random.Random(7)
+    alphabet = "0123456789.... vV-_()[]abrelsionVersion2024:=Версія"
+    for _ in range(20000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        assert TEXT_VERSION_ENGINE.extract(text) == sequential_text(text), text
+        assert PAGE_VERSION_ENGINE.extract(text) == sequential_page(text), text
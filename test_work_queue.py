@@ -0,0 +1,157 @@
+# test_work_queue.py
+import os
+import subprocess
+import sys
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from database import Database
+from work_queue import PRIORITY_NOW, WorkQueue
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+NOW = 1_800_000_000.0
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "versions.db")
+
+
+@pytest.fixture
+def db(db_path):
+    db = Database(db_path)
+    yield db
+    db.close_all_connections()
+
+
+def add_programs(db, count):
+    return [db.add_program(f"P{i}", "Програма", f"http://example.test/{i}") for i in range(count)]
+
+
+def test_two_processes_never_claim_the_same_program(db, db_path):
+    ids = add_programs(db, 10)
+    # Другий процес - окреме підключення до того самого файлу БД
+    other_db = Database(db_path)
+    first, second = WorkQueue(db, "a"), WorkQueue(other_db, "b")
+    assert first.enqueue(ids, now=NOW) == 10
+    assert second.enqueue(ids, now=NOW) == 0  # вже в черзі
+
+    claimed_a = first.claim(6, now=NOW)
+    claimed_b = second.claim(10, now=NOW)
+    assert len(claimed_a) == 6 and len(claimed_b) == 4
+    assert set(claimed_a).isdisjoint(claimed_b)
+    assert first.stats(now=NOW) == {'queued': 10, 'ready': 0, 'leased': 10, 'expired': 0, 'owners': 2}
+    other_db.close_all_connections()
+
+
+def test_scheduled_enqueue_skips_programs_checked_elsewhere(db):
+    checked, due = add_programs(db, 2)
+    db.update_last_check(checked)
+    queue = WorkQueue(db)
+    assert queue.enqueue([checked, due], default_interval_minutes=60) == 1
+    assert queue.claim(5) == [due]
+    # "Перевірити зараз" з GUI - незалежно від розкладу
+    assert queue.enqueue([checked], PRIORITY_NOW) == 1
+
+
+def test_expired_lease_is_reclaimed_and_heartbeat_keeps_it(db):
+    ids = add_programs(db, 4)
+    crashed, alive, other = WorkQueue(db, "crashed", 300), WorkQueue(db, "alive", 300), WorkQueue(db, "other")
+    crashed.enqueue(ids[:2], now=NOW)
+    alive.enqueue(ids[2:], now=NOW)
+    assert sorted(crashed.claim(2, ids[:2], now=NOW)) == ids[:2]
+    assert sorted(alive.claim(2, ids[2:], now=NOW)) == ids[2:]
+
+    alive.heartbeat(now=NOW + 200)
+    assert WorkQueue(db).stats(now=NOW + 301)['expired'] == 2
+    assert sorted(other.claim(10, now=NOW + 301)) == ids[:2]
+
+    # Процес, що "ожив", не прибирає чужі оренди
+    crashed.complete(ids[:2], wait=True)
+    assert other.stats(now=NOW + 301)['leased'] == 4
+
+
+def test_release_defers_and_priority_orders_claims(db):
+    later, scheduled, urgent = add_programs(db, 3)
+    queue = WorkQueue(db)
+    queue.enqueue([later, scheduled], now=NOW)
+    queue.enqueue([urgent], PRIORITY_NOW, now=NOW + 5)
+    assert queue.claim(1, now=NOW + 10) == [urgent]
+
+    assert queue.claim(1, [later], now=NOW + 10) == [later]
+    # Ліміт запитів API - не раніше скидання ліміту
+    queue.release([later], available_at=NOW + 1000)
+    assert queue.claim(5, now=NOW + 20) == [scheduled]
+    queue.complete([urgent, scheduled], wait=True)
+    assert queue.claim(5, now=NOW + 1001) == [later]
+
+
+class Handler(BaseHTTPRequestHandler):
+    hits = Counter()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            self.hits[self.path] += 1
+        body = f"<html><body><b class='v'>Release 1.{self.path.strip('/')}</b></body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_worker_processes_split_catalog(db, db_path, http_server):
+    Handler.hits = Counter()
+    base = http_server(Handler)
+    ids = [db.add_program(f"P{i}", "Програма", f"{base}/{i}", selector=".v") for i in range(40)]
+    db.close_all_connections()
+
+    command = [sys.executable, "launcher.py", "worker", "--db", db_path, "--once", "--batch", "5"]
+    workers = [subprocess.Popen(command, cwd=PROJECT_DIR, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, text=True) for _ in range(3)]
+    outputs = [worker.communicate(timeout=120) for worker in workers]
+
+    assert all(worker.returncode == 0 for worker in workers), [err for _, err in outputs]
+    # Кожну сторінку перевірено рівно один раз
+    assert sorted(Handler.hits.values()) == [1] * 40
+    assert sum(out.count("✅") for out, _ in outputs) == 40
+    assert all(db.get_program_by_id(program_id).current_version for program_id in ids)
+    assert WorkQueue(db).stats()['queued'] == 0
+
+
+def test_gui_rereads_programs_checked_by_another_process(db, db_path):
+    pytest.importorskip("PyQt5")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from types import SimpleNamespace
+
+    from main import MainWindow
+    from repository import ProgramRepository
+    from scheduler import CheckScheduler
+
+    ours, theirs = add_programs(db, 2)
+    programs = ProgramRepository(db)
+    scheduler = CheckScheduler(programs, jitter_seconds=0)
+    scheduler.rebuild()
+    assert sorted(scheduler.pop_due()) == [ours, theirs]
+
+    # Фоновий процес ("launcher.py worker") перевірив програму через своє підключення
+    worker_db = Database(db_path)
+    worker_db.update_version(theirs, "2.0")
+    worker_db.close_all_connections()
+
+    check_thread = SimpleNamespace(programs=[programs.get_program_by_id(ours), programs.get_program_by_id(theirs)],
+                                   claimed={ours}, checker=SimpleNamespace(deferred={}))
+    window = SimpleNamespace(check_thread=check_thread, programs=programs, scheduler=scheduler)
+    MainWindow.reschedule_checked_programs(window)
+
+    record = programs.get_program_by_id(theirs)
+    assert record.current_version == "2.0" and record.last_check is not None
+    # Не стає "на черзі" знову на кожному такті планувальника
+    assert scheduler.pop_due() == []
@@ -0,0 +1,112 @@
+"""
+Попередньо скомпільовані шаблони пошуку версій.
+
+Шаблони компілюються один раз при імпорті. Пошук виконується за один прохід
+тексту зліва направо і повертає той самий результат, що й послідовний
+re.search для кожного шаблону в порядку пріоритету.
+"""
+
+import re
+
+# Шаблони для короткого тексту (комірка таблиці, елемент за селектором)
+TEXT_PATTERNS = [
+    # 1. Версії з префіксом (v, version, версія)
+    r'(?:v|version|версія|вірсія|release|реліз|build|білд)\s*[:=]?\s*v?(\d+(?:\.\d+)+)',
+
+    # 2. Версії з 2-6 частинами (1.0, 1.0.7, 1.0.7.79, 1.0.7.79.1)
+    r'\b(\d+(?:\.\d+){1,5})\b',
+
+    # 3. Версії з датами (2024.01.15.1)
+    r'\b(\d{4}(?:\.\d+){1,3})\b',
+
+    # 4. Версії в дужках/квадратних дужках
+    r'[\[(]v?(\d+(?:\.\d+)+)[])]',
+
+    # 5. Версії з буквами (1.0.7a, 2.0-beta, 3.1.4-rc1)
+    r'\b(\d+(?:\.\d+)+[a-zA-Z]*(?:-\w+)?)\b',
+
+    # 6. Версії з роздільниками _ і -
+    r'\b(\d+(?:[_.-]\d+)+)\b',
+
+    # 7. Просто числа більше 1000 (може бути версією)
+    r'\b(20\d{2}|\d{4,})\b',  # 2024, 12345
+]
+
+# Шаблони для тексту всієї сторінки (без урахування регістру)
+PAGE_PATTERNS = [
+    r'\b(\d+(?:\.\d+){1,3})\b',  # 1.2, 1.2.3, 1.2.3.4, 1.0.7.79
+    r'v?(\d+\.\d+\.\d+)',  # 1.2.3
+    r'v?(\d+\.\d+)',       # 1.2
+    r'Version\s*[:]?\s*(\d+\.\d+\.\d+)',
+    r'Версія\s*[:]?\s*(\d+\.\d+\.\d+)',
+    r'(\d{4}\.\d+\.\d+)',  # 2023.1.0
+]
+
+
+class VersionPatternEngine:
+    """
+    Пошук версії за списком шаблонів з пріоритетами за один прохід.
+
+    Для кожного k заздалегідь компілюється сканер - альтернатива шаблонів
+    1..k. У кожній позиції альтернатива пробує шаблони в порядку пріоритету,
+    тож перший збіг сканера - найраніша позиція, де спрацьовує хоч один
+    шаблон, а lastindex - найкращий пріоритет у цій позиції.
+    Після знайденого кандидата з пріоритетом p далі шукаються лише шаблони
+    з вищим пріоритетом, починаючи з наступної позиції. Прохід закінчується
+    на першому кандидаті з найвищим пріоритетом або в кінці тексту.
+    """
+
+    def __init__(self, patterns, flags=0, min_length=0):
+        self.patterns = [re.compile(pattern, flags) for pattern in patterns]
+        self.min_length = min_length
+        # Кожен шаблон має рівно одну групу, тому номер групи = пріоритет
+        self._scanners = [None, self.patterns[0]] + [
+            re.compile('|'.join(f'(?:{pattern})' for pattern in patterns[:k]), flags)
+            for k in range(2, len(patterns) + 1)
+        ]
+
+    def search(self, text, pos=0):
+        """Повернути (пріоритет, версія, кінець збігу) найкращого кандидата або None"""
+        if not text:
+            return None
+
+        best = None
+        limit = len(self.patterns)
+        while limit:
+            match = self._scanners[limit].search(text, pos)
+            if match is None:
+                break
+            start = match.start()
+            priority = match.lastindex
+            value = match.group(priority)
+            end = match.end(priority)
+            pos = start + 1
+            if len(value) <= self.min_length:
+                # Кандидат закороткий - перевіряємо шаблони з нижчим пріоритетом
+                # у цій же позиції, набір шаблонів для сканування не змінюється
+                priority, value = None, None
+                for lower in range(match.lastindex + 1, limit + 1):
+                    lower_match = self.patterns[lower - 1].match(text, start)
+                    if lower_match and len(lower_match.group(1)) > self.min_length:
+                        priority, value = lower, lower_match.group(1)
+                        end = lower_match.end(1)
+                        break
+                if priority is None:
+                    continue
+            best = (priority, value, end)
+            if priority == 1:
+                break
+            # Далі цікаві лише шаблони з вищим пріоритетом
+            limit = priority - 1
+        return best
+
+    def extract(self, text):
+        """Витягнути версію з тексту або None"""
+        found = self.search(text)
+        return found[1] if found else None
+
+
+TEXT_VERSION_ENGINE = VersionPatternEngine(TEXT_PATTERNS)
+
+# "Мінімум 1.2": кандидати з 2 і менше символів відкидаються
+PAGE_VERSION_ENGINE = VersionPatternEngine(PAGE_PATTERNS, flags=re.IGNORECASE, min_length=2)
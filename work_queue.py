@@ -0,0 +1,247 @@
+"""
+Черга перевірок у versions.db для кількох процесів перевірки.
+
+Кілька консольних процесів ("launcher.py worker") - на одному комп'ютері
+або на кількох, зі спільною БД - ділять між собою один каталог програм,
+не перевіряючи програму двічі. GUI ставить у ту саму чергу свої
+"перевірити зараз", тому GUI та фонові процеси не пишуть update_version
+для однієї програми одночасно.
+
+Таблиця work_queue (міграція 5) містить не більше одного рядка на програму:
+    priority      - PRIORITY_NOW для запитів з GUI, інакше PRIORITY_SCHEDULED
+    available_at  - не раніше (timestamp); після ліміту запитів API - час скидання
+    lease_owner   - процес, що перевіряє програму, і lease_expires - до коли
+
+Процес забирає пачку вільних рядків (claim) в оренду на lease_seconds і
+продовжує її, поки перевіряє (keep_alive). Після перевірки рядок
+видаляється (complete) або повертається в чергу (release). Оренда процесу,
+що завершився аварійно, спливає, і рядки забирає інший процес.
+
+claim виконується в потоці запису однією транзакцією BEGIN IMMEDIATE, тож
+два процеси не можуть забрати той самий рядок. Час - time.time(), тому
+годинники комп'ютерів зі спільною БД мають бути синхронізовані (NTP).
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+PRIORITY_SCHEDULED = 0
+PRIORITY_NOW = 10
+
+# Не більше параметрів в одному IN (...) - ліміт змінних SQLite
+CHUNK_SIZE = 500
+
+# Час перевірки настав: last_check + check_interval (години; 0 - інтервал за
+# замовчуванням, хвилини) не пізніше поточного часу. Параметри: час, інтервал
+DUE_CONDITION = """(last_check IS NULL OR last_check <= datetime(?, '-' ||
+    (CASE WHEN check_interval > 0 THEN check_interval * 60 ELSE ? END) || ' minutes'))"""
+
+
+def make_owner():
+    """Ідентифікатор процесу для оренди: хост, PID і випадковий суфікс"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def chunks(items, size=CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class WorkQueue:
+    """Черга перевірок з орендою; owner - цей процес (або потік GUI)"""
+
+    def __init__(self, db, owner=None, lease_seconds=300):
+        self.db = db
+        self.owner = owner or make_owner()
+        self.lease_seconds = lease_seconds
+
+    def enqueue(self, program_ids, priority=PRIORITY_SCHEDULED, default_interval_minutes=1440, now=None):
+        """
+        Поставити програми в чергу; повертає кількість нових або оновлених рядків.
+
+        Запланована програма (PRIORITY_SCHEDULED) ставиться, лише якщо за БД її
+        час справді настав: планувальник іншого процесу міг щойно її перевірити.
+        Рядок, що вже є в черзі (в оренді чи відкладений), не змінюється.
+        PRIORITY_NOW ставить програму негайно й піднімає пріоритет наявного рядка.
+        program_ids=None - усі активні програми, час перевірки яких настав.
+        """
+        now = time.time() if now is None else now
+        now_text = datetime.fromtimestamp(now).strftime(DATE_FORMAT)
+
+        def write(cursor):
+            changed = 0
+            for chunk in chunks(program_ids) if program_ids is not None else [None]:
+                if chunk is None:
+                    cursor.execute(f'''
+                        INSERT OR IGNORE INTO work_queue (program_id, priority, available_at, enqueued_at)
+                        SELECT id, ?, ?, ? FROM programs WHERE is_active = 1 AND {DUE_CONDITION}
+                    ''', (priority, now, now, now_text, default_interval_minutes))
+                    changed += cursor.rowcount
+                    continue
+                placeholders = ", ".join("?" * len(chunk))
+                if priority > PRIORITY_SCHEDULED:
+                    cursor.execute(f'''
+                        INSERT INTO work_queue (program_id, priority, available_at, enqueued_at)
+                        SELECT id, ?, ?, ? FROM programs WHERE id IN ({placeholders})
+                        ON CONFLICT (program_id) DO UPDATE SET
+                            priority = MAX(priority, excluded.priority),
+                            available_at = MIN(available_at, excluded.available_at)
+                    ''', (priority, now, now, *chunk))
+                else:
+                    cursor.execute(f'''
+                        INSERT OR IGNORE INTO work_queue (program_id, priority, available_at, enqueued_at)
+                        SELECT id, ?, ?, ? FROM programs
+                        WHERE id IN ({placeholders}) AND is_active = 1 AND {DUE_CONDITION}
+                    ''', (priority, now, now, *chunk, now_text, default_interval_minutes))
+                changed += cursor.rowcount
+            return changed
+
+        return self.db.execute_write(write)
+
+    def claim(self, limit, program_ids=None, now=None):
+        """
+        Забрати в оренду до limit вільних програм (найвищий пріоритет, найдавніші
+        першими); program_ids - лише з цих програм. Прострочені оренди інших
+        процесів теж забираються. Повертає ID програм.
+        """
+        now = time.time() if now is None else now
+
+        def write(cursor):
+            rows = []
+            id_groups = chunks(program_ids) if program_ids is not None else [None]
+            for chunk in id_groups:
+                if len(rows) >= limit:
+                    break
+                condition = "available_at <= ? AND (lease_owner IS NULL OR lease_expires < ?)"
+                params = [now, now]
+                if chunk is not None:
+                    condition += f" AND program_id IN ({', '.join('?' * len(chunk))})"
+                    params.extend(chunk)
+                cursor.execute(f'''
+                    SELECT program_id, lease_owner FROM work_queue WHERE {condition}
+                    ORDER BY priority DESC, available_at LIMIT ?
+                ''', (*params, limit - len(rows)))
+                rows.extend(cursor.fetchall())
+
+            claimed = [program_id for program_id, _ in rows]
+            for chunk in chunks(claimed):
+                cursor.execute(f'''
+                    UPDATE work_queue SET lease_owner = ?, lease_expires = ?, attempts = attempts + 1
+                    WHERE program_id IN ({", ".join("?" * len(chunk))})
+                ''', (self.owner, now + self.lease_seconds, *chunk))
+            reclaimed = sum(1 for _, owner in rows if owner is not None)
+            if reclaimed:
+                print(f"♻️ Забрано {reclaimed} програм з простроченою орендою")
+            return claimed
+
+        return self.db.execute_write(write)
+
+    def heartbeat(self, now=None):
+        """Продовжити оренду всіх програм цього процесу; повертає їх кількість"""
+        now = time.time() if now is None else now
+
+        def write(cursor):
+            cursor.execute('''
+                UPDATE work_queue SET lease_expires = ? WHERE lease_owner = ?
+            ''', (now + self.lease_seconds, self.owner))
+            return cursor.rowcount
+
+        return self.db.execute_write(write)
+
+    @contextmanager
+    def keep_alive(self):
+        """Продовжувати оренду у фоновому потоці, поки виконується блок"""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.lease_seconds / 3):
+                try:
+                    self.heartbeat()
+                except Exception as e:
+                    print(f"⚠️ Не вдалося продовжити оренду: {e}")
+
+        thread = threading.Thread(target=beat, name="lease-heartbeat", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def complete(self, program_ids, wait=False):
+        """Прибрати перевірені програми з черги (лише власні оренди)"""
+        def write(cursor):
+            for chunk in chunks(program_ids):
+                cursor.execute(f'''
+                    DELETE FROM work_queue
+                    WHERE lease_owner = ? AND program_id IN ({", ".join("?" * len(chunk))})
+                ''', (self.owner, *chunk))
+
+        return self.db.execute_write(write, wait)
+
+    def release(self, program_ids=None, available_at=None, wait=True):
+        """
+        Повернути програми в чергу без перевірки (зупинка, ліміт запитів API).
+        available_at - не раніше цього часу; program_ids=None - усі оренди процесу.
+        """
+        def write(cursor):
+            groups = chunks(program_ids) if program_ids is not None else [None]
+            for chunk in groups:
+                condition = "lease_owner = ?"
+                if chunk is not None:
+                    condition += f" AND program_id IN ({', '.join('?' * len(chunk))})"
+                cursor.execute(f'''
+                    UPDATE work_queue
+                    SET lease_owner = NULL, lease_expires = NULL, available_at = COALESCE(?, available_at)
+                    WHERE {condition}
+                ''', (available_at, self.owner, *(chunk or ())))
+
+        return self.db.execute_write(write, wait)
+
+    def stats(self, now=None):
+        """Стан черги: {'queued', 'ready', 'leased', 'expired', 'owners'}"""
+        now = time.time() if now is None else now
+        _, cursor = self.db.get_connection()
+        cursor.execute('''
+            SELECT COUNT(*),
+                   COALESCE(SUM(lease_owner IS NULL AND available_at <= ?), 0),
+                   COALESCE(SUM(lease_owner IS NOT NULL AND lease_expires >= ?), 0),
+                   COALESCE(SUM(lease_owner IS NOT NULL AND lease_expires < ?), 0),
+                   COUNT(DISTINCT CASE WHEN lease_expires >= ? THEN lease_owner END)
+            FROM work_queue
+        ''', (now, now, now, now))
+        queued, ready, leased, expired, owners = cursor.fetchone()
+        return {'queued': queued, 'ready': ready, 'leased': leased, 'expired': expired, 'owners': owners}
+
+
+def check_leased(queue, checker, programs, engine=None):
+    """
+    Перевірити орендовані програми, повертаючи результати в міру готовності.
+    Оренда продовжується під час перевірки; перевірена програма видаляється
+    з черги, відкладена через ліміт запитів - повертається з available_at.
+    Неперевірені (зупинка, помилка) повертаються в чергу.
+    """
+    done = set()
+    with queue.keep_alive():
+        try:
+            for result in checker.check_programs(programs, engine):
+                program_id = result['program_id']
+                if 'deferred_until' in result:
+                    queue.release([program_id], available_at=result['deferred_until'], wait=False)
+                else:
+                    queue.complete([program_id])
+                done.add(program_id)
+                yield result
+        finally:
+            rest = [program.id for program in programs if program.id not in done]
+            if rest:
+                queue.release(rest)
+            queue.db.flush()